@@ -0,0 +1,183 @@
+"""Three-stage detection pipeline running edges, matching and state updates on separate threads.
+
+Stage threads are connected by small bounded FIFO queues, so edge extraction
+of frame N+1 overlaps matching of frame N while results still come out in
+capture order. Only the final stage touches DetectorState event fields, which
+keeps event_start/exit semantics identical to `core.detector.evaluate_frame`.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+
+from core import detector as dect
+
+STAGED_PIPELINE_ENABLED = os.getenv("MONITOR_STAGED_PIPELINE", "0") == "1"
+PIPELINE_QUEUE_DEPTH = int(os.getenv("MONITOR_PIPELINE_QUEUE_DEPTH", "2"))
+PIPELINE_STAGES = ("edges", "match", "finalize")
+_STOP = object()
+
+
+class _StageStats:
+    """Busy and stall time of one stage since the last stats() call."""
+
+    def __init__(self):
+        """Start a fresh measurement window."""
+        self.busy = 0.0
+        self.stalled = 0.0
+        self.frames = 0
+
+
+class StagedDetectionPipeline:
+    """Edges → match → finalize threads fed through bounded queues."""
+
+    def __init__(
+        self,
+        profile: str,
+        selected_reference: str | None = None,
+        state: dect.DetectorState | None = None,
+        config: dect.DetectionConfig | None = None,
+        depth: int = PIPELINE_QUEUE_DEPTH,
+        sandbox_mode: bool = False,
+    ):
+        """Create the stage queues; call start() to launch the threads."""
+        self.profile = profile
+        self.selected_reference = selected_reference
+        self.state = state if state is not None else dect.new_detector_state()
+        self.config = config
+        self.sandbox_mode = sandbox_mode
+        self.depth = max(1, int(depth))
+        # inbox of each stage, then the results queue (unbounded so the consumer never stalls finalize).
+        self._queues = [queue.Queue(maxsize=self.depth) for _ in PIPELINE_STAGES] + [queue.Queue()]
+        self._stats = [_StageStats() for _ in PIPELINE_STAGES]
+        self._stats_lock = threading.Lock()
+        self._window_started = time.perf_counter()
+        self._threads: list[threading.Thread] = []
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Launch one thread per stage."""
+        stages = (self._prepare, self._match, self._finalize)
+        for index, name in enumerate(PIPELINE_STAGES):
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(index, stages[index]),
+                name=f"detect-{name}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, frame, release=None, frame_edges=None, frame_roi=None, frame_edges_small=None) -> bool:
+        """Queue a frame for detection; returns False when the first stage is full.
+
+        release, when given, is called once the frame buffer is no longer read:
+        after the edges stage, or immediately when the frame is dropped.
+        frame_edges, frame_roi and frame_edges_small behave as in evaluate_frame.
+        """
+        try:
+            self._queues[0].put_nowait((frame, frame_edges, frame_roi, frame_edges_small, release))
+        except queue.Full:
+            self.dropped += 1
+            if release is not None:
+                release()
+            return False
+        self.submitted += 1
+        return True
+
+    def poll_results(self, timeout: float = 0.0) -> list[dect.DetectionResult]:
+        """Return finished results in frame order, waiting up to timeout for the first one."""
+        results = []
+        outbox = self._queues[-1]
+        try:
+            item = outbox.get(timeout=timeout) if timeout > 0 else outbox.get_nowait()
+            while True:
+                if item is not _STOP:
+                    results.append(item)
+                item = outbox.get_nowait()
+        except queue.Empty:
+            pass
+        return results
+
+    def stats(self) -> dict:
+        """Return per-stage occupancy, stall time and queue fill since the previous call."""
+        now = time.perf_counter()
+        with self._stats_lock:
+            elapsed = max(1e-6, now - self._window_started)
+            snapshot = self._stats
+            self._stats = [_StageStats() for _ in PIPELINE_STAGES]
+            self._window_started = now
+        payload = {
+            "pipeline_submitted": self.submitted,
+            "pipeline_dropped": self.dropped,
+            "pipeline_failed": self.failed,
+        }
+        for index, name in enumerate(PIPELINE_STAGES):
+            stage = snapshot[index]
+            payload[f"pipeline_{name}_occupancy"] = min(1.0, stage.busy / elapsed)
+            payload[f"pipeline_{name}_stall_ms"] = stage.stalled * 1000.0
+            payload[f"pipeline_{name}_frames"] = stage.frames
+            payload[f"pipeline_{name}_queue"] = self._queues[index].qsize()
+        return payload
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drain queued frames through every stage and join the threads."""
+        if not self._threads:
+            return
+        try:
+            self._queues[0].put(_STOP, timeout=timeout)
+        except queue.Full:
+            logging.warning("[PIPELINE] input queue full on stop; stage threads left to exit with the process")
+            return
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def _run_stage(self, index: int, func) -> None:
+        """Stage loop: pull in order, process, and push downstream, recording busy and stall time."""
+        inbox, outbox = self._queues[index], self._queues[index + 1]
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                outbox.put(_STOP)
+                return
+            started = time.perf_counter()
+            try:
+                item = func(item)
+            except Exception:
+                logging.exception("[PIPELINE] %s stage failed; dropping frame", PIPELINE_STAGES[index])
+                self.failed += 1
+                item = None
+            finished = time.perf_counter()
+            if item is not None:
+                outbox.put(item)
+            stalled = time.perf_counter() - finished
+            with self._stats_lock:
+                stats = self._stats[index]
+                stats.busy += finished - started
+                stats.stalled += stalled
+                stats.frames += 1
+
+    def _prepare(self, item):
+        """Edges stage; prepare_frame never keeps a view of the input frame."""
+        frame, frame_edges, frame_roi, frame_edges_small, release = item
+        try:
+            return dect.prepare_frame(self.profile, frame, self.state, frame_edges, frame_roi, frame_edges_small)
+        finally:
+            if release is not None:
+                release()
+
+    def _match(self, prepared):
+        """Coarse→fine (or tracking) stage."""
+        return prepared, dect.match_prepared(prepared, self.state, self.selected_reference, self.config)
+
+    def _finalize(self, item):
+        """Event state update stage."""
+        prepared, match = item
+        return dect.finalize_frame(self.profile, prepared, match, self.state, self.sandbox_mode)
@@ -0,0 +1,335 @@
+"""Out-of-process detection worker fed through a shared-memory frame ring.
+
+The Qt process copies each frame into a `SharedFrameRing` slot and sends a
+small (seq, slot) message over a pipe; the worker process runs
+`core.detector.evaluate_frame` and replies with compact result records. The
+worker has its own GIL, so matching never competes with the UI, the FFmpeg
+reader or the stderr threads. A crashed worker is respawned on the same ring
+without touching capture.
+
+Profile revisions and the debug ledger are per-process, so the Qt side sends
+a sync message whenever its own ones change. Debug images are written by the
+worker; the UI flash frame is redrawn from the ring instead of being pickled.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core import storage
+from core.detector import DetectionResult, draw_debug_frame
+
+DETECTOR_PROCESS_ENABLED = os.getenv("MONITOR_DETECTOR_PROCESS", "0") == "1"
+DETECTOR_RING_SLOTS = int(os.getenv("MONITOR_DETECTOR_RING_SLOTS", "4"))
+_HEADER_ALIGN = 64
+
+
+class SharedFrameRing:
+    """Fixed-size ring of gray frames in shared memory with per-slot sequence locks.
+
+    A slot's sequence word is odd while the writer copies into it and
+    `2 * seq + 2` once frame `seq` is complete, so readers can detect frames
+    that were overwritten while they were being copied.
+    """
+
+    def __init__(self, slots: int, frame_shape: tuple[int, int], name: str | None = None):
+        """Create a new ring, or attach to an existing one when name is given."""
+        self.slots = max(2, int(slots))
+        self.frame_shape = tuple(frame_shape)
+        frame_bytes = int(np.prod(self.frame_shape))
+        header_bytes = -(-8 * self.slots // _HEADER_ALIGN) * _HEADER_ALIGN
+        create = name is None
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=header_bytes + frame_bytes * self.slots)
+        if not create and os.name == "posix":
+            # Attaching registers the block with this process' resource tracker,
+            # which would unlink it on exit; only the creator owns its lifetime.
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        self.owner = create
+        self.name = self._shm.name
+        self._seq = np.ndarray((self.slots,), dtype=np.uint64, buffer=self._shm.buf)
+        self._frames = np.ndarray(
+            (self.slots,) + self.frame_shape, dtype=np.uint8, buffer=self._shm.buf, offset=header_bytes
+        )
+        if create:
+            self._seq[:] = 0
+
+    def write(self, seq: int, payload) -> int:
+        """Copy frame `seq` into its slot and return the slot index."""
+        slot = seq % self.slots
+        self._seq[slot] = 2 * seq + 1
+        self._frames[slot].reshape(-1)[:] = np.frombuffer(payload, dtype=np.uint8)
+        self._seq[slot] = 2 * seq + 2
+        return slot
+
+    def read(self, seq: int, slot: int):
+        """Return a private copy of frame `seq`, or None if its slot was overwritten."""
+        expected = 2 * seq + 2
+        if int(self._seq[slot]) != expected:
+            return None
+        frame = self._frames[slot].copy()
+        if int(self._seq[slot]) != expected:
+            return None
+        return frame
+
+    def close(self) -> None:
+        """Detach from the block, unlinking it when this side created it."""
+        self._seq = None
+        self._frames = None
+        self._shm.close()
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _pack_result(seq: int, result: DetectionResult, roi=None) -> tuple:
+    """Flatten a DetectionResult into a small picklable record.
+
+    The debug frame is replaced by the plan ROI; the receiver redraws it from
+    the frame still held in the ring.
+    """
+    return (
+        "result",
+        seq,
+        result.matched,
+        result.confidence,
+        result.reference,
+        result.timestamp,
+        result.bbox,
+        result.event_start,
+        roi if result.debug_frame is not None else False,
+    )
+
+
+def _unpack_result(record: tuple, frame=None, origin: tuple[int, int] = (0, 0)) -> DetectionResult:
+    """Inverse of _pack_result; frame is the evaluated frame, used to redraw the debug frame."""
+    _, _, matched, confidence, reference, timestamp, bbox, event_start, debug_roi = record
+    debug_frame = None
+    if debug_roi is not False and frame is not None and bbox is not None:
+        debug_frame = draw_debug_frame(frame, bbox, debug_roi, origin)
+    return DetectionResult(
+        matched,
+        confidence,
+        reference,
+        timestamp,
+        bbox=bbox,
+        event_start=event_start,
+        debug_frame=debug_frame,
+    )
+
+
+def _worker_main(
+    ring_name: str,
+    slots: int,
+    frame_shape,
+    conn,
+    profile: str,
+    selected_reference: str | None,
+    frame_roi=None,
+):
+    """Detection process entry point: evaluate the newest queued frame until told to stop."""
+    from core import detector as dect
+
+    ring = SharedFrameRing(slots, frame_shape, name=ring_name)
+    state = dect.new_detector_state()
+    synced = (None, None)
+    try:
+        while True:
+            message = conn.recv()
+            # Only the newest frame matters; acknowledge the ones it supersedes.
+            while message[0] == "frame" and conn.poll():
+                newer = conn.recv()
+                conn.send(("dropped", message[1]))
+                message = newer
+            if message[0] == "stop":
+                break
+            if message[0] == "sync":
+                _, revision, ledger_generation = message
+                if revision != synced[0]:
+                    # Settings, ROI or references changed in the Qt process; recompile the plan.
+                    storage.bump_profile_revision(profile)
+                if ledger_generation != synced[1]:
+                    storage.reload_debug_ledger()
+                synced = (revision, ledger_generation)
+                continue
+            _, seq, slot = message
+            frame = ring.read(seq, slot)
+            if frame is None:
+                conn.send(("dropped", seq))
+                continue
+            result = dect.evaluate_frame(
+                profile, frame, state, selected_reference=selected_reference, frame_roi=frame_roi
+            )
+            roi = dect.get_detection_plan(profile).roi if result.debug_frame is not None else None
+            conn.send(_pack_result(seq, result, roi))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        dect.flush_debug_writes(timeout=5)
+        ring.close()
+
+
+class DetectorWorker:
+    """Qt-side handle for the detection process: ring writer, pipe, and restarts."""
+
+    def __init__(
+        self,
+        profile: str,
+        frame_shape: tuple[int, int],
+        selected_reference: str | None = None,
+        slots: int = DETECTOR_RING_SLOTS,
+        frame_roi: tuple[int, int, int, int] | None = None,
+    ):
+        """Create the shared ring; call start() to spawn the process.
+
+        frame_roi is the canonical region ROI-cropped capture frames cover, as in evaluate_frame.
+        """
+        self.profile = profile
+        self.selected_reference = selected_reference
+        self.frame_roi = frame_roi
+        self.ring = SharedFrameRing(slots, frame_shape)
+        self._context = multiprocessing.get_context("spawn")
+        self._process = None
+        self._conn = None
+        self._next_seq = 0
+        self._last_acked = -1
+        self._synced = None
+        self.restarts = 0
+        self.submitted = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        """Spawn the worker process attached to the ring."""
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(
+                self.ring.name,
+                self.ring.slots,
+                self.ring.frame_shape,
+                child_conn,
+                self.profile,
+                self.selected_reference,
+                self.frame_roi,
+            ),
+            name="detector-worker",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        # Frames queued to a previous process will never be answered.
+        self._last_acked = self._next_seq - 1
+        self._synced = None
+
+    def is_alive(self) -> bool:
+        """True while the worker process is running."""
+        return self._process is not None and self._process.is_alive()
+
+    def ensure_alive(self) -> bool:
+        """Respawn a dead worker. Returns True when a restart happened."""
+        if self.is_alive():
+            return False
+        exitcode = self._process.exitcode if self._process is not None else None
+        logging.warning("[DETECTOR_WORKER] worker exited code=%s; restarting", exitcode)
+        self._close_conn()
+        # Pick up debug entries the dead worker recorded.
+        storage.reload_debug_ledger()
+        self.restarts += 1
+        self.start()
+        return True
+
+    def in_flight(self) -> int:
+        """Frames sent to the worker and not yet answered."""
+        return self._next_seq - 1 - self._last_acked
+
+    def submit(self, payload) -> bool:
+        """Queue a frame for detection; returns False when it was dropped instead."""
+        if self._conn is None or self.in_flight() >= self.ring.slots - 1:
+            # The ring would overwrite a frame the worker has not read yet.
+            self.dropped += 1
+            return False
+        seq = self._next_seq
+        slot = self.ring.write(seq, payload)
+        try:
+            self._sync()
+            self._conn.send(("frame", seq, slot))
+        except (BrokenPipeError, EOFError, OSError):
+            self.dropped += 1
+            return False
+        self._next_seq += 1
+        self.submitted += 1
+        return True
+
+    def _sync(self) -> None:
+        """Forward profile revision and debug ledger changes of this process to the worker."""
+        token = (storage.get_profile_revision(self.profile), storage.get_debug_ledger_generation())
+        if token != self._synced:
+            self._conn.send(("sync",) + token)
+            self._synced = token
+
+    def poll_results(self, timeout: float = 0.0) -> list[DetectionResult]:
+        """Return results that arrived, waiting up to timeout for the first one."""
+        results = []
+        if self._conn is None:
+            return results
+        try:
+            ready = self._conn.poll(timeout)
+            while ready:
+                record = self._conn.recv()
+                self._last_acked = max(self._last_acked, record[1])
+                if record[0] == "result":
+                    # The slot cannot be reused before this ack, so the frame is still intact.
+                    frame = self.ring.read(record[1], record[1] % self.ring.slots) if record[8] is not False else None
+                    origin = self.frame_roi[:2] if self.frame_roi is not None else (0, 0)
+                    results.append(_unpack_result(record, frame, origin))
+                else:
+                    self.dropped += 1
+                ready = self._conn.poll()
+        except (EOFError, OSError):
+            # Worker died mid-message; ensure_alive() respawns it.
+            pass
+        return results
+
+    def stats(self) -> dict:
+        """Return worker counters for the metrics signal."""
+        return {
+            "detector_worker_alive": self.is_alive(),
+            "detector_worker_restarts": self.restarts,
+            "detector_worker_in_flight": self.in_flight(),
+            "detector_worker_dropped": self.dropped,
+        }
+
+    def _close_conn(self) -> None:
+        """Close the parent pipe end, ignoring errors from a dead peer."""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the worker to flush and exit, then release the ring."""
+        if self._conn is not None:
+            try:
+                self._conn.send(("stop",))
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join(1.0)
+        self._close_conn()
+        self._process = None
+        self.ring.close()
+        # The worker flushed its debug writes on exit; reload totals and hashes it recorded.
+        storage.reload_debug_ledger()
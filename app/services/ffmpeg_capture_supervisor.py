@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import itertools
 import logging
+import os
 import queue
 import subprocess
 import threading
@@ -12,7 +13,56 @@ from enum import Enum
 from typing import Callable
 
 from app.services.ffmpeg_tools import CaptureConfig, FfmpegNotFoundError, build_ffmpeg_capture_command
-from app.services.frame_bus import FramePacket, FrameQueue
+from app.services.frame_bus import FrameBufferPool, FramePacket, FrameQueue
+
+# Buffers beyond the queue length: one being filled plus ones held by consumers.
+FRAME_POOL_SPARE = int(os.getenv("CAPTURE_FRAME_POOL_SPARE", "3"))
+# Frames the stdout pipe should hold so ffmpeg never blocks on a 64 KB default pipe.
+CAPTURE_PIPE_FRAMES = int(os.getenv("CAPTURE_PIPE_FRAMES", "2"))
+# Stall watchdog: a live ffmpeg that stops delivering frames for this many expected
+# frame intervals (never less than CAPTURE_STALL_MIN_SEC) is restarted in place.
+CAPTURE_STALL_WATCHDOG_ENABLED = os.getenv("CAPTURE_STALL_WATCHDOG", "1") == "1"
+CAPTURE_STALL_INTERVALS = float(os.getenv("CAPTURE_STALL_INTERVALS", "10"))
+CAPTURE_STALL_MIN_SEC = float(os.getenv("CAPTURE_STALL_MIN_SEC", "1.0"))
+# Device open and input negotiation may take a while before the first frame.
+CAPTURE_STALL_STARTUP_SEC = float(os.getenv("CAPTURE_STALL_STARTUP_SEC", "5.0"))
+CAPTURE_STALL_BACKOFF_SEC = float(os.getenv("CAPTURE_STALL_BACKOFF_SEC", "0.5"))
+CAPTURE_STALL_BACKOFF_MAX_SEC = float(os.getenv("CAPTURE_STALL_BACKOFF_MAX_SEC", "8.0"))
+# Consecutive restarts without a frame before the capture gives up and reports itself dead.
+CAPTURE_STALL_MAX_RESTARTS = int(os.getenv("CAPTURE_STALL_MAX_RESTARTS", "5"))
+_F_SETPIPE_SZ = 1031  # Linux fcntl command; not exposed by the fcntl module before 3.10
+_F_GETPIPE_SZ = 1032
+
+
+def _grow_pipe(stream, size: int) -> int | None:
+    """Raise a pipe's kernel buffer to at least size bytes where the OS allows it.
+
+    Returns the resulting capacity, or None when the platform has no
+    F_SETPIPE_SZ (Windows, macOS). Unprivileged processes are capped by
+    /proc/sys/fs/pipe-max-size, so the request is clamped to it first.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    setpipe = getattr(fcntl, "F_SETPIPE_SZ", _F_SETPIPE_SZ if os.uname().sysname == "Linux" else None)
+    if setpipe is None:
+        return None
+    getpipe = getattr(fcntl, "F_GETPIPE_SZ", _F_GETPIPE_SZ)
+    try:
+        with open("/proc/sys/fs/pipe-max-size", encoding="ascii") as fh:
+            size = min(size, int(fh.read().strip()))
+    except (OSError, ValueError):
+        pass
+    fd = stream.fileno()
+    try:
+        fcntl.fcntl(fd, setpipe, size)
+    except OSError as exc:
+        logging.info("[CAM_CAPTURE] could not grow stdout pipe to %s bytes: %s", size, exc)
+    try:
+        return fcntl.fcntl(fd, getpipe)
+    except OSError:
+        return None
 
 
 class LogLevel(str, Enum):
@@ -43,11 +93,17 @@ class FfmpegCaptureSupervisor:
         allow_input_tuning: bool = True,
         pipeline: str = "monitoring",
         log_sink: Callable[[dict], None] | None = None,
+        standby: bool = False,
+        on_exit: Callable[["FfmpegCaptureSupervisor"], None] | None = None,
+        on_stall: Callable[["FfmpegCaptureSupervisor"], bool] | None = None,
     ):
-        """Execute   init  .
-        
-        Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-        the behavior without duplicating logic.
+        """Configure the capture; call start() to spawn ffmpeg.
+
+        A standby capture keeps its device streaming and its pipe drained but
+        publishes nothing until promote(). on_exit is called from the reader
+        thread when the frame stream ends without stop() being requested.
+        on_stall is called from the watchdog when frames stop arriving; when it
+        returns True the stall is handled there and ffmpeg is not restarted.
         """
         self.input_token = input_token
         self.config = config
@@ -64,8 +120,30 @@ class FfmpegCaptureSupervisor:
         self._reader_thread: threading.Thread | None = None
         self._stderr_thread: threading.Thread | None = None
         self.frames_captured = 0
+        self.buffer_pool = FrameBufferPool(
+            config.frame_bytes,
+            getattr(frame_queue, "maxlen", 1) + FRAME_POOL_SPARE,
+        )
+        self.pipe_capacity: int | None = None
+        self.bytes_read = 0
+        self.read_calls = 0
+        self._stats_window = (time.monotonic(), 0, 0, 0)
         self.log_events: "queue.Queue[FfmpegLogEvent]" = queue.Queue(maxsize=512)
         self.last_error: str | None = None
+        self.standby = standby
+        self.frames_discarded = 0
+        self.first_frame_at: float | None = None
+        self.last_frame_at: float | None = None
+        self._on_exit = on_exit
+        self._on_stall = on_stall
+        self._watchdog_thread: threading.Thread | None = None
+        self._last_arrival = 0.0  # monotonic; spawn time until the first frame arrives
+        self._arrivals = 0  # frames read from the current process, published or not
+        self._restarting = False
+        self.stalled = False
+        self.stalls = 0
+        self.stall_restarts = 0
+        self._consecutive_restarts = 0
 
     def start(self) -> None:
         """Execute start.
@@ -73,6 +151,14 @@ class FfmpegCaptureSupervisor:
         Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
         the behavior without duplicating logic.
         """
+        self._stop.clear()
+        self._spawn()
+        if CAPTURE_STALL_WATCHDOG_ENABLED and self._watchdog_thread is None:
+            self._watchdog_thread = threading.Thread(target=self._watchdog_loop, daemon=True)
+            self._watchdog_thread.start()
+
+    def _spawn(self) -> None:
+        """Launch ffmpeg plus its stdout reader and stderr threads."""
         cmd = build_ffmpeg_capture_command(
             self.input_token,
             self.config,
@@ -90,8 +176,14 @@ class FfmpegCaptureSupervisor:
             )
         except FileNotFoundError as exc:
             raise FfmpegNotFoundError(str(exc)) from exc
+        if self.process.stdout is not None:
+            self.pipe_capacity = _grow_pipe(
+                self.process.stdout,
+                self.config.frame_bytes * max(1, CAPTURE_PIPE_FRAMES),
+            )
 
-        self._stop.clear()
+        self._last_arrival = time.monotonic()
+        self._arrivals = 0
         self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
         self._stderr_thread = threading.Thread(target=self._stderr_loop, daemon=True)
         self._reader_thread.start()
@@ -105,20 +197,141 @@ class FfmpegCaptureSupervisor:
         """
         if not self.process or not self.process.stdout:
             return
-        frame_size = self.config.width * self.config.height
         try:
             while not self._stop.is_set():
-                frame = self._read_exact(self.process.stdout, frame_size)
-                if frame is None:
+                lease = self.buffer_pool.acquire()
+                reads = self._read_exact_into(self.process.stdout, lease.view)
+                if not reads:
+                    lease.release()
                     break
-                self.frame_queue.put(FramePacket(timestamp=time.time(), payload=frame))
+                self._last_arrival = time.monotonic()
+                self._arrivals += 1
+                if self.stalled:
+                    self._recovered()
+                if self.standby:
+                    # Warm standby: ffmpeg must never block on a full pipe, but nothing is published.
+                    lease.release()
+                    self.frames_discarded += 1
+                    continue
+                self.read_calls += reads
+                self.bytes_read += len(lease.view)
+                now = time.time()
+                # The queue takes over the lease's reference and releases it on drop.
+                self.frame_queue.put(
+                    FramePacket(timestamp=now, payload=lease.view.toreadonly(), lease=lease)
+                )
                 self.frames_captured += 1
+                if self.first_frame_at is None:
+                    self.first_frame_at = now
+                self.last_frame_at = now
         except Exception as exc:
             self.last_error = f"FFmpeg frame reader failed: {exc}"
             self._emit_log(LogLevel.ERROR, self.last_error)
         finally:
             if self.process and self.process.poll() is None and not self._stop.is_set():
                 self.process.terminate()
+            if self._on_exit is not None and not self._stop.is_set() and not self._restarting:
+                try:
+                    self._on_exit(self)
+                except Exception:
+                    logging.exception("[CAM_CAPTURE] id=%s exit handler failed", self.instance_id)
+
+    def stall_timeout(self) -> float:
+        """Seconds without a frame after which the capture counts as stalled."""
+        if not self._arrivals:
+            return max(CAPTURE_STALL_STARTUP_SEC, CAPTURE_STALL_MIN_SEC)
+        return max(CAPTURE_STALL_MIN_SEC, CAPTURE_STALL_INTERVALS / max(1, self.config.fps))
+
+    def _watchdog_loop(self) -> None:
+        """Compare inter-frame arrival time with the configured fps and restart ffmpeg on a stall."""
+        while not self._stop.wait(min(0.25, self.stall_timeout() / 4)):
+            if self._restarting or not self.is_alive():
+                # A process that exited is reported through is_alive()/on_exit, not restarted here.
+                continue
+            silent = time.monotonic() - self._last_arrival
+            if silent < self.stall_timeout():
+                continue
+            self._stalled(silent)
+            if self._on_stall is not None:
+                try:
+                    if self._on_stall(self):
+                        return
+                except Exception:
+                    logging.exception("[CAM_CAPTURE] id=%s stall handler failed", self.instance_id)
+            self._restart_after_stall()
+
+    def _stalled(self, silent: float) -> None:
+        """Mark the frame queue stale and report the stall."""
+        self.stalls += 1
+        self.stalled = True
+        mark_stale = getattr(self.frame_queue, "mark_stale", None)
+        if mark_stale is not None:
+            mark_stale()
+        self.last_error = f"no frames for {silent:.1f}s from a running ffmpeg"
+        self._emit_log(
+            LogLevel.WARNING,
+            f"capture stalled: {self.last_error}",
+            event="capture_stalled",
+            stall_ms=round(silent * 1000.0),
+            expected_interval_ms=round(1000.0 / max(1, self.config.fps)),
+        )
+
+    def _recovered(self) -> None:
+        """Reader-thread hook: frames flow again after a stall."""
+        self.stalled = False
+        self._consecutive_restarts = 0
+        self._emit_log(LogLevel.INFO, "capture recovered from stall", event="capture_recovered")
+
+    def _restart_after_stall(self) -> None:
+        """Kill the stalled ffmpeg and respawn it after an exponential backoff."""
+        self._consecutive_restarts += 1
+        attempt = self._consecutive_restarts
+        if attempt > CAPTURE_STALL_MAX_RESTARTS:
+            self.last_error = f"capture stalled; gave up after {CAPTURE_STALL_MAX_RESTARTS} restarts"
+            self._emit_log(LogLevel.ERROR, self.last_error, event="capture_stall_gave_up", restarts=attempt - 1)
+            # is_alive() now reports False, so the owner falls back to its own reopen path.
+            self._terminate_process()
+            return
+        backoff = min(CAPTURE_STALL_BACKOFF_MAX_SEC, CAPTURE_STALL_BACKOFF_SEC * 2 ** (attempt - 1))
+        self._emit_log(
+            LogLevel.WARNING,
+            f"restarting stalled capture in {backoff:.1f}s (attempt {attempt}/{CAPTURE_STALL_MAX_RESTARTS})",
+            event="capture_restart",
+            attempt=attempt,
+            backoff_sec=backoff,
+        )
+        self._restarting = True
+        try:
+            self._terminate_process()
+            if self._stop.wait(backoff):
+                return
+            self.stall_restarts += 1
+            self._spawn()
+        except Exception as exc:
+            self.last_error = f"stalled capture restart failed: {exc}"
+            self._emit_log(LogLevel.ERROR, self.last_error, event="capture_restart_failed", attempt=attempt)
+        finally:
+            self._restarting = False
+
+    def _terminate_process(self, timeout: float = 5.0) -> None:
+        """Stop the current ffmpeg and wait for its reader threads to drain."""
+        process = self.process
+        if process and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait(timeout=timeout)
+        for thread in (self._reader_thread, self._stderr_thread):
+            if thread is not None and thread is not threading.current_thread():
+                thread.join(timeout=timeout)
+
+    def promote(self) -> None:
+        """Start publishing frames from a standby capture."""
+        if self.standby:
+            self.standby = False
+            self._emit_log(LogLevel.WARNING, "standby capture promoted")
 
     def _stderr_loop(self) -> None:
         """Execute  stderr loop.
@@ -153,13 +366,13 @@ class FfmpegCaptureSupervisor:
             # Logging must never crash data pipelines.
             pass
 
-    def _emit_log(self, level: LogLevel, message: str) -> None:
+    def _emit_log(self, level: LogLevel, message: str, event: str | None = None, **fields) -> None:
         """Execute  emit log.
         
         Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
         the behavior without duplicating logic.
         """
-        if message == self._last_log_message and level == self._last_log_level:
+        if event is None and message == self._last_log_message and level == self._last_log_level:
             self._last_log_repeat += 1
             if self._last_log_repeat % 10 != 0:
                 return
@@ -170,7 +383,7 @@ class FfmpegCaptureSupervisor:
             self._last_log_repeat = 1
 
         now = time.time()
-        event = FfmpegLogEvent(
+        log_event = FfmpegLogEvent(
             timestamp=now,
             pipeline=self.pipeline,
             camera=self.input_token,
@@ -178,7 +391,7 @@ class FfmpegCaptureSupervisor:
             message=message,
         )
         try:
-            self.log_events.put_nowait(event)
+            self.log_events.put_nowait(log_event)
         except queue.Full:
             pass
 
@@ -189,6 +402,9 @@ class FfmpegCaptureSupervisor:
             "severity": level.value,
             "message": message,
         }
+        if event is not None:
+            # Structured watchdog events carry their own fields for log consumers.
+            payload.update(event=event, **fields)
         self._safe_emit(payload)
         try:
             getattr(logging, level.value.lower())(
@@ -215,19 +431,39 @@ class FfmpegCaptureSupervisor:
         return LogLevel.INFO
 
     @staticmethod
-    def _read_exact(stream, size: int) -> bytes | None:
-        """Execute  read exact.
-        
-        Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-        the behavior without duplicating logic.
+    def _read_exact_into(stream, view: memoryview) -> int:
+        """Fill view completely from stream with as few reads as the pipe allows.
+
+        Every call asks for the whole remainder of the frame. Returns the number
+        of read calls used, or 0 on EOF before the frame is complete.
         """
-        data = bytearray()
-        while len(data) < size:
-            chunk = stream.read(size - len(data))
-            if not chunk:
-                return None
-            data.extend(chunk)
-        return bytes(data)
+        filled = 0
+        reads = 0
+        size = len(view)
+        while filled < size:
+            count = stream.readinto(view[filled:])
+            if not count:
+                return 0
+            filled += count
+            reads += 1
+        return reads
+
+    def capture_stats(self) -> dict:
+        """Return reader throughput since the previous call plus buffer pool counters."""
+        now = time.monotonic()
+        frames, reads, nbytes = self.frames_captured, self.read_calls, self.bytes_read
+        started, last_frames, last_reads, last_bytes = self._stats_window
+        self._stats_window = (now, frames, reads, nbytes)
+        window_frames = frames - last_frames
+        return {
+            "capture_pipe_capacity": self.pipe_capacity,
+            "capture_reads_per_frame": (reads - last_reads) / window_frames if window_frames else 0.0,
+            "capture_bytes_per_sec": (nbytes - last_bytes) / max(1e-6, now - started),
+            "capture_stalled": self.stalled,
+            "capture_stalls": self.stalls,
+            "capture_stall_restarts": self.stall_restarts,
+            **self.buffer_pool.stats(),
+        }
 
     def stop(self, timeout: float = 5.0) -> None:
         """Execute stop.
@@ -236,6 +472,10 @@ class FfmpegCaptureSupervisor:
         the behavior without duplicating logic.
         """
         self._stop.set()
+        # Join the watchdog first so a stall restart cannot respawn ffmpeg behind stop().
+        if self._watchdog_thread and self._watchdog_thread is not threading.current_thread():
+            self._watchdog_thread.join(timeout=timeout)
+        self._watchdog_thread = None
         if self.process and self.process.poll() is None:
             self.process.terminate()
             try:
@@ -265,4 +505,193 @@ class FfmpegCaptureSupervisor:
         Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
         the behavior without duplicating logic.
         """
+        if self._restarting and not self._stop.is_set():
+            # A stall restart is in progress; the capture is being supervised, not dead.
+            return True
         return bool(self.process and self.process.poll() is None)
+
+
+class HotStandbyCapture:
+    """Primary capture with a pre-spawned standby promoted as soon as the primary's stream ends.
+
+    The standby runs against a secondary device or config and is kept warm:
+    its device is open and its pipe drained, but it publishes nothing. When
+    the primary's reader hits EOF the standby starts publishing into the same
+    frame queue, with no device open or cooldown on the failover path. Both
+    captures must produce frames of the same size. Exposes the supervisor
+    interface used by the monitor service. A stalled primary is failed over
+    the same way rather than restarted by its watchdog.
+    """
+
+    def __init__(
+        self,
+        input_token: str,
+        config: CaptureConfig,
+        frame_queue: FrameQueue,
+        *,
+        standby_token: str,
+        standby_config: CaptureConfig | None = None,
+        allow_input_tuning: bool = True,
+        standby_input_tuning: bool = False,
+        pipeline: str = "monitoring",
+        log_sink: Callable[[dict], None] | None = None,
+        primary: FfmpegCaptureSupervisor | None = None,
+    ):
+        """Create both supervisors; call start() to spawn them.
+
+        primary, when given, is an already running capture adopted as the
+        primary (see adopt()); input_token, config and frame_queue must be its own.
+        """
+        standby_config = standby_config or config
+        if standby_config.frame_bytes != config.frame_bytes:
+            raise ValueError("standby capture must produce frames of the primary's size")
+        self.pipeline = pipeline
+        self.frame_queue = frame_queue
+        if primary is None:
+            primary = FfmpegCaptureSupervisor(
+                input_token,
+                config,
+                frame_queue,
+                allow_input_tuning=allow_input_tuning,
+                pipeline=pipeline,
+                log_sink=log_sink,
+            )
+        primary._on_exit = self._on_primary_exit
+        primary._on_stall = self._on_primary_stall
+        self.primary = primary
+        self._standby: FfmpegCaptureSupervisor | None = FfmpegCaptureSupervisor(
+            standby_token,
+            standby_config,
+            frame_queue,
+            allow_input_tuning=standby_input_tuning,
+            pipeline=pipeline,
+            log_sink=log_sink,
+            standby=True,
+        )
+        # One event stream for callers draining log_events, whichever capture is active.
+        self._standby.log_events = self.primary.log_events
+        self.log_events = self.primary.log_events
+        self.active = self.primary
+        self._lock = threading.Lock()
+        self._stopping = False
+        self.failovers = 0
+        self._failover: tuple[float | None, FfmpegCaptureSupervisor] | None = None
+
+    @classmethod
+    def adopt(
+        cls,
+        primary: FfmpegCaptureSupervisor,
+        *,
+        standby_token: str,
+        standby_config: CaptureConfig | None = None,
+        standby_input_tuning: bool = False,
+        log_sink: Callable[[dict], None] | None = None,
+    ) -> "HotStandbyCapture":
+        """Add a warm standby to a capture that is already running; call start() to spawn the standby."""
+        return cls(
+            primary.input_token,
+            primary.config,
+            primary.frame_queue,
+            standby_token=standby_token,
+            standby_config=standby_config,
+            standby_input_tuning=standby_input_tuning,
+            pipeline=primary.pipeline,
+            log_sink=log_sink,
+            primary=primary,
+        )
+
+    @property
+    def input_token(self) -> str:
+        """Camera token of the capture currently publishing frames."""
+        return self.active.input_token
+
+    @property
+    def config(self) -> CaptureConfig:
+        """Config of the capture currently publishing frames."""
+        return self.active.config
+
+    @property
+    def last_error(self) -> str | None:
+        """Last error of the active capture, or of the failed primary."""
+        return self.active.last_error or self.primary.last_error
+
+    @property
+    def frames_captured(self) -> int:
+        """Frames published by the primary and, after failover, the standby."""
+        return self.primary.frames_captured + (self.active.frames_captured if self.active is not self.primary else 0)
+
+    def start(self) -> None:
+        """Spawn the standby first so it is warm by the time the primary could fail.
+
+        An adopted primary is already running and is left alone.
+        """
+        standby = self._standby
+        try:
+            standby.start()
+        except Exception:
+            logging.warning("[CAM_CAPTURE] standby camera=%r failed to start; running without failover", standby.input_token, exc_info=True)
+            self._standby = None
+        if self.primary.process is None:
+            self.primary.start()
+
+    def fail_over(self, reason: str) -> bool:
+        """Promote the standby now; returns False when there is none left to promote."""
+        with self._lock:
+            standby = self._standby
+            if self._stopping or self.active is not self.primary or standby is None or not standby.is_alive():
+                return False
+            self._standby = None
+            self.active = standby
+            self.failovers += 1
+            self._failover = (self.primary.last_frame_at or time.time(), standby)
+            standby.promote()
+        self.primary._emit_log(LogLevel.WARNING, f"failing over to standby camera={standby.input_token!r}: {reason}")
+        return True
+
+    def _on_primary_exit(self, primary: FfmpegCaptureSupervisor) -> None:
+        """Reader-thread callback: the primary's frame stream ended."""
+        if not self.fail_over(primary.last_error or "primary frame stream ended"):
+            logging.warning("[CAM_CAPTURE] primary camera=%r ended with no standby to promote", primary.input_token)
+
+    def _on_primary_stall(self, primary: FfmpegCaptureSupervisor) -> bool:
+        """Watchdog callback: fail over instead of restarting a stalled primary when a standby is warm."""
+        if not self.fail_over(primary.last_error or "primary capture stalled"):
+            return False
+        primary.stop()
+        return True
+
+    def failover_stats(self) -> dict:
+        """Failover count, gap between the primary's last and the standby's first frame, and frames lost in it."""
+        stats = {
+            "capture_failovers": self.failovers,
+            "capture_standby_ready": self._standby is not None and self._standby.is_alive(),
+        }
+        if self._failover is not None:
+            last_primary_at, standby = self._failover
+            first_at = standby.first_frame_at
+            if first_at is not None:
+                gap = max(0.0, first_at - last_primary_at)
+                stats["capture_failover_ms"] = gap * 1000.0
+                stats["capture_failover_frames_lost"] = max(0, round(gap * self.primary.config.fps) - 1)
+        return stats
+
+    def capture_stats(self) -> dict:
+        """Reader and pool counters of the active capture plus failover metrics."""
+        return {**self.active.capture_stats(), **self.failover_stats()}
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the primary and whichever standby is still around."""
+        with self._lock:
+            self._stopping = True
+            standby = self._standby
+        for capture in (self.primary, self.active, standby):
+            if capture is not None and not capture._stop.is_set():
+                capture.stop(timeout=timeout)
+
+    def is_alive(self) -> bool:
+        """True while frames are flowing or a warm standby is about to take over."""
+        if self.active.is_alive():
+            return True
+        standby = self._standby
+        # The primary's reader promotes the standby right after EOF; don't report that window as death.
+        return not self._stopping and standby is not None and standby.is_alive()
@@ -38,6 +38,45 @@ class CaptureConfig:
     max_height: int | None = None
     enforce_minimum: bool = False
     enforce_maximum: bool = False
+    # Append FFmpeg's edgedetect plane below the gray frame (rows height..2*height).
+    edge_plane: bool = False
+    # Crop (x, y, w, h) applied after scale, in output coordinates; frames are then ROI-sized.
+    roi: tuple[int, int, int, int] | None = None
+    # With edge_plane: also append the edge map area-scaled by FFMPEG_COARSE_SCALE (left-aligned, zero-padded rows).
+    coarse_plane: bool = False
+
+    @property
+    def planes(self) -> int:
+        """Number of output_width x output_height gray planes in each rawvideo frame."""
+        return 2 if self.edge_plane else 1
+
+    @property
+    def output_width(self) -> int:
+        """Width of each plane on the capture pipe (the ROI width when cropping)."""
+        return int(self.roi[2]) if self.roi is not None else self.width
+
+    @property
+    def output_height(self) -> int:
+        """Height of each plane on the capture pipe (the ROI height when cropping)."""
+        return int(self.roi[3]) if self.roi is not None else self.height
+
+    @property
+    def coarse_size(self) -> tuple[int, int] | None:
+        """(width, height) of the coarse edge plane, or None when it is not emitted."""
+        if not (self.coarse_plane and self.edge_plane):
+            return None
+        return coarse_plane_size(self.output_width, self.output_height)
+
+    @property
+    def frame_rows(self) -> int:
+        """Rows of output_width bytes in one rawvideo frame."""
+        coarse = self.coarse_size
+        return self.output_height * self.planes + (coarse[1] if coarse is not None else 0)
+
+    @property
+    def frame_bytes(self) -> int:
+        """Size of one rawvideo frame on the capture pipe."""
+        return self.output_width * self.frame_rows
 
     def is_equivalent_for_capture(self, other: "CaptureConfig") -> bool:
         """Execute is equivalent for capture.
@@ -52,6 +91,24 @@ class CaptureConfig:
             and self.input_width == other.input_width
             and self.input_height == other.input_height
             and self.input_fps == other.input_fps
+            and self.edge_plane == other.edge_plane
+            and self.roi == other.roi
+            and self.coarse_plane == other.coarse_plane
+        )
+
+    def can_serve(self, other: "CaptureConfig") -> bool:
+        """True when a running capture with this config delivers the frames other asks for.
+
+        Input negotiation is ignored because the device is already open, and a
+        faster stream serves a slower consumer, which rate-limits on its side.
+        """
+        return (
+            self.width == other.width
+            and self.height == other.height
+            and self.edge_plane == other.edge_plane
+            and self.roi == other.roi
+            and self.coarse_plane == other.coarse_plane
+            and self.fps >= other.fps
         )
 
 
@@ -239,6 +296,18 @@ def resolve_camera_device_token(selected_display_name: str, force_refresh: bool
     return None
 
 
+# edgedetect hysteresis thresholds as fractions of 255 (FFmpeg defaults are 20/255 and 50/255).
+FFMPEG_EDGE_LOW = float(os.getenv("FFMPEG_EDGE_LOW", str(20 / 255)))
+FFMPEG_EDGE_HIGH = float(os.getenv("FFMPEG_EDGE_HIGH", str(50 / 255)))
+# Coarse edge plane scale; reads the detector's FRAME_COARSE_SCALE so both levels line up.
+FFMPEG_COARSE_SCALE = float(os.getenv("FRAME_COARSE_SCALE", "0.5"))
+
+
+def coarse_plane_size(width: int, height: int) -> tuple[int, int]:
+    """Size of the coarse edge plane for a width x height frame, rounded like the detector's resize."""
+    return max(1, int(width * FFMPEG_COARSE_SCALE)), max(1, int(height * FFMPEG_COARSE_SCALE))
+
+
 def build_ffmpeg_capture_command(
     input_token: str,
     config: CaptureConfig,
@@ -270,6 +339,24 @@ def build_ffmpeg_capture_command(
         f"scale={width}:{height}:flags=fast_bilinear",
         "format=gray",
     ]
+    if config.roi is not None:
+        # Only the detection ROI leaves FFmpeg; the reader and detector never see the rest.
+        roi_x, roi_y, roi_w, roi_h = (int(value) for value in config.roi)
+        vf_filters.insert(2, f"crop={roi_w}:{roi_h}:{roi_x}:{roi_y}")
+    if config.edge_plane:
+        # Gray frame on top, edge map below: one rawvideo frame carries both planes.
+        edgedetect = f"edgedetect=low={FFMPEG_EDGE_LOW:.4f}:high={FFMPEG_EDGE_HIGH:.4f}:mode=wires"
+        coarse = config.coarse_size
+        if coarse is None:
+            vf_filters.append(f"split[gray][edge];[edge]{edgedetect}[edges];[gray][edges]vstack")
+        else:
+            # vstack needs equal widths, so the coarse edge map is padded out to the frame width.
+            coarse_w, coarse_h = coarse
+            vf_filters.append(
+                f"split[gray][edge];[edge]{edgedetect},split[edges][coarse_src];"
+                f"[coarse_src]scale={coarse_w}:{coarse_h}:flags=area,pad={config.output_width}:{coarse_h}:0:0[coarse];"
+                "[gray][edges][coarse]vstack=inputs=3"
+            )
     cmd = [
         resolve_ffmpeg_path(),
         "-hide_banner",
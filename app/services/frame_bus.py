@@ -13,14 +13,171 @@ class OverflowPolicy(str, Enum):
     LAST_ONLY = "last_only"
 
 
+class FrameLease:
+    """Reference-counted claim on one pooled frame buffer.
+
+    The buffer goes back to its pool when the last holder calls release().
+    """
+
+    __slots__ = ("_pool", "buffer", "view", "_refs", "recycled")
+
+    def __init__(self, pool: "FrameBufferPool | None", buffer: bytearray):
+        """Wrap buffer with a single reference owned by the caller."""
+        self._pool = pool
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        self._refs = 1
+        # Set once the buffer went back to the pool; it never flips back, so a
+        # reader that sees False after copying knows the copy was not torn.
+        self.recycled = False
+
+    def retain(self) -> None:
+        """Add a reference for another holder."""
+        if self._pool is None:
+            self._refs += 1
+            return
+        with self._pool._lock:
+            self._refs += 1
+
+    def release(self) -> None:
+        """Drop one reference, recycling the buffer when none remain."""
+        if self._pool is None:
+            self._refs -= 1
+            return
+        self._pool._release(self)
+
+
+class FrameBufferPool:
+    """Fixed set of preallocated frame buffers recycled through FrameLease handles.
+
+    acquire() never blocks the capture reader: when every buffer is still held
+    downstream a one-off buffer is allocated and counted in `misses`.
+    """
+
+    def __init__(self, frame_size: int, count: int):
+        """Preallocate count buffers of frame_size bytes."""
+        self.frame_size = int(frame_size)
+        self.count = max(1, int(count))
+        self._lock = threading.Lock()
+        self._free: list[bytearray] = [bytearray(self.frame_size) for _ in range(self.count)]
+        self.misses = 0
+
+    def acquire(self) -> FrameLease:
+        """Return a lease on a free buffer, allocating a transient one if the pool is drained."""
+        with self._lock:
+            if self._free:
+                return FrameLease(self, self._free.pop())
+            self.misses += 1
+        return FrameLease(None, bytearray(self.frame_size))
+
+    def _release(self, lease: FrameLease) -> None:
+        """Drop a reference held on lease and recycle its buffer on the last one."""
+        with self._lock:
+            lease._refs -= 1
+            if lease._refs == 0:
+                lease.recycled = True
+                self._free.append(lease.buffer)
+            elif lease._refs < 0:
+                raise RuntimeError("frame buffer released more times than retained")
+
+    def stats(self) -> dict:
+        """Return pool occupancy counters for metrics."""
+        with self._lock:
+            return {
+                "frame_pool_size": self.count,
+                "frame_pool_free": len(self._free),
+                "frame_pool_misses": self.misses,
+            }
+
+
 @dataclass(frozen=True)
 class FramePacket:
     timestamp: float
-    payload: bytes
+    payload: bytes | memoryview
     stale: bool = False
+    lease: FrameLease | None = None
+
+    def retain(self) -> "FramePacket":
+        """Take another reference on a pooled payload; no-op for owned bytes."""
+        if self.lease is not None:
+            self.lease.retain()
+        return self
+
+    def release(self) -> None:
+        """Give back one reference on a pooled payload; no-op for owned bytes."""
+        if self.lease is not None:
+            self.lease.release()
+
+    def detached(self, limit: int | None = None) -> "FramePacket":
+        """Return a copy whose payload is owned bytes, safe to keep after release().
+
+        limit, when given, copies only the first limit bytes (e.g. the gray plane).
+        """
+        payload = self.payload if limit is None else self.payload[:limit]
+        return FramePacket(timestamp=self.timestamp, payload=bytes(payload), stale=self.stale)
+
+    @property
+    def recycled(self) -> bool:
+        """True once a pooled payload buffer has been handed back for reuse."""
+        return self.lease is not None and self.lease.recycled
+
+
+class LatestFrameSlot:
+    """Newest published packet, readable without any lock.
+
+    The producer swaps a single reference (atomic under the GIL) and holds
+    its own reference on the packet in the slot. Readers copy the payload and
+    then validate, seqlock-style, that the buffer was not recycled meanwhile,
+    retrying on the rare torn copy. Readers never block the capture thread.
+    """
+
+    RETRIES = 3
+
+    def __init__(self):
+        """Start empty."""
+        self._packet = None
+        self.version = 0
+        self.torn_reads = 0
+
+    def publish(self, packet) -> None:
+        """Make packet the latest frame. Single producer only."""
+        _retain(packet)
+        previous = self._packet
+        self._packet = packet
+        self.version += 1
+        if previous is not None:
+            _release(previous)
+
+    def clear(self) -> None:
+        """Drop the latest frame."""
+        previous = self._packet
+        self._packet = None
+        if previous is not None:
+            _release(previous)
+
+    def sample(self):
+        """Return the latest packet as-is; a pooled payload may be recycled at any time."""
+        return self._packet
+
+    def latest_copy(self, limit: int | None = None) -> FramePacket | None:
+        """Return the latest packet with an owned, untorn copy of its payload (first limit bytes)."""
+        for _ in range(self.RETRIES):
+            packet = self._packet
+            if packet is None or not hasattr(packet, "detached"):
+                return packet
+            copy = packet.detached(limit)
+            if not packet.recycled:
+                return copy
+            self.torn_reads += 1
+        return None
 
 
 class FrameQueue:
+    """Bounded packet queue. It owns one reference on every packet it holds:
+    packets it drops are released here, and get() hands that reference to the
+    caller, who must release() the packet when done with its payload.
+    """
+
     def __init__(self, maxlen: int = 3, policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST):
         """Execute   init  .
         
@@ -34,6 +191,7 @@ class FrameQueue:
         self.dropped_frames = 0
         self.dropped = 0  # backward-compatible alias
         self.stale = False
+        self.latest = LatestFrameSlot()
 
     def put(self, packet: FramePacket) -> None:
         """Execute put.
@@ -44,14 +202,16 @@ class FrameQueue:
         with self._cv:
             if self.policy == OverflowPolicy.LAST_ONLY:
                 dropped_now = len(self._queue)
-                self._queue.clear()
+                _release_all(self._queue)
                 self.dropped_frames += dropped_now
                 self.dropped += dropped_now
             elif len(self._queue) >= self.maxlen:
-                self._queue.popleft()
+                _release(self._queue.popleft())
                 self.dropped_frames += 1
                 self.dropped += 1
             self._queue.append(packet)
+            self.latest.publish(packet)
+            self.stale = False
             self._cv.notify_all()
 
     def get(self, timeout: float | None = None) -> FramePacket | None:
@@ -67,14 +227,23 @@ class FrameQueue:
                 return None
             return self._queue.popleft()
 
-    def peek_latest(self) -> FramePacket | None:
-        """Execute peek latest.
-        
-        Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-        the behavior without duplicating logic.
+    def peek_latest(self, retain: bool = False) -> FramePacket | None:
+        """Return the newest packet without removing it.
+
+        A pooled payload may be recycled as soon as the queue drops the packet;
+        pass retain=True to hold a reference and release() it when done.
         """
         with self._cv:
-            return self._queue[-1] if self._queue else None
+            if not self._queue:
+                return None
+            packet = self._queue[-1]
+            if retain and hasattr(packet, "retain"):
+                packet.retain()
+            return packet
+
+    def latest_copy(self, limit: int | None = None) -> FramePacket | None:
+        """Return the newest packet with an owned copy of its payload (first limit bytes), without locking."""
+        return self.latest.latest_copy(limit)
 
     def clear(self, stale: bool = True) -> None:
         """Execute clear.
@@ -83,9 +252,15 @@ class FrameQueue:
         the behavior without duplicating logic.
         """
         with self._cv:
-            self._queue.clear()
+            _release_all(self._queue)
+            self.latest.clear()
             self.stale = stale
 
+    def mark_stale(self) -> None:
+        """Flag the held frames as stale without dropping them; the next put() clears the flag."""
+        with self._cv:
+            self.stale = True
+
     def size(self) -> int:
         """Execute size.
         
@@ -94,3 +269,210 @@ class FrameQueue:
         """
         with self._cv:
             return len(self._queue)
+
+
+def _retain(packet) -> None:
+    """Retain a packet; tolerate plain objects queued by tests and callers."""
+    retain = getattr(packet, "retain", None)
+    if retain is not None:
+        retain()
+
+
+def _release(packet) -> None:
+    """Release a dropped packet; tolerate plain objects queued by tests and callers."""
+    release = getattr(packet, "release", None)
+    if release is not None:
+        release()
+
+
+def _release_all(packets: Deque) -> None:
+    """Empty packets, releasing each one."""
+    while packets:
+        _release(packets.popleft())
+
+
+class FrameBus:
+    """Single-producer ring of recent packets fanned out to any number of subscribers.
+
+    Every subscriber keeps its own read cursor, overflow policy and drop
+    counter, so a slow consumer never steals or drops frames from another one.
+    Packets are shared, not copied: the bus owns one reference per ring slot
+    and get() hands each subscriber its own reference to release().
+    """
+
+    def __init__(self, capacity: int = 8):
+        """Allocate a ring of capacity slots."""
+        self.capacity = max(2, int(capacity))
+        self.maxlen = self.capacity
+        self._ring: list = [None] * self.capacity
+        self._head = 0  # sequence number the next put() writes
+        self._cv = threading.Condition()
+        self._subscribers: list[FrameSubscription] = []
+        self.stale = False
+        self.latest = LatestFrameSlot()
+
+    def put(self, packet: FramePacket) -> None:
+        """Publish a packet, taking over the caller's reference."""
+        with self._cv:
+            slot = self._head % self.capacity
+            previous = self._ring[slot]
+            self._ring[slot] = packet
+            self._head += 1
+            self.latest.publish(packet)
+            if previous is not None:
+                _release(previous)
+            self.stale = False
+            for subscription in self._subscribers:
+                subscription.stale = False
+            self._cv.notify_all()
+
+    def subscribe(
+        self,
+        name: str,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        maxlen: int = 3,
+    ) -> "FrameSubscription":
+        """Register a consumer whose cursor starts at the next published packet."""
+        subscription = FrameSubscription(self, name, policy, maxlen)
+        with self._cv:
+            subscription._cursor = self._head
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: "FrameSubscription") -> None:
+        """Stop tracking a subscriber; pending packets stay owned by the ring."""
+        with self._cv:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+            self._cv.notify_all()
+
+    def peek_latest(self, retain: bool = False) -> FramePacket | None:
+        """Return the newest packet without moving any cursor."""
+        with self._cv:
+            if self._head == 0:
+                return None
+            packet = self._ring[(self._head - 1) % self.capacity]
+            if packet is not None and retain and hasattr(packet, "retain"):
+                packet.retain()
+            return packet
+
+    def latest_copy(self, limit: int | None = None) -> FramePacket | None:
+        """Return the newest packet with an owned copy of its payload (first limit bytes), without locking."""
+        return self.latest.latest_copy(limit)
+
+    def clear(self, stale: bool = True) -> None:
+        """Release every buffered packet and move all cursors to the head."""
+        with self._cv:
+            self.latest.clear()
+            for slot, packet in enumerate(self._ring):
+                if packet is not None:
+                    _release(packet)
+                    self._ring[slot] = None
+            for subscription in self._subscribers:
+                subscription._cursor = self._head
+                subscription.stale = stale
+            self.stale = stale
+            self._cv.notify_all()
+
+    def mark_stale(self) -> None:
+        """Flag the bus and every subscriber as stale without dropping frames; the next put() clears it."""
+        with self._cv:
+            self.stale = True
+            for subscription in self._subscribers:
+                subscription.stale = True
+
+    def size(self) -> int:
+        """Packets currently held in the ring."""
+        with self._cv:
+            return sum(packet is not None for packet in self._ring)
+
+    def subscriber_stats(self) -> dict:
+        """Return {name: {"dropped": n, "pending": n}} for every subscriber.
+
+        dropped includes packets a subscriber has already fallen behind on but
+        not yet skipped, so a stalled consumer shows its losses before it reads.
+        """
+        with self._cv:
+            return {
+                subscription.name: {
+                    "dropped": subscription.dropped_frames + subscription._overflow_locked(),
+                    "pending": subscription._pending_locked(),
+                }
+                for subscription in self._subscribers
+            }
+
+
+class FrameSubscription:
+    """One consumer's view of a FrameBus, with the FrameQueue consumer API.
+
+    DROP_OLDEST keeps up to maxlen unread packets; LAST_ONLY always jumps to
+    the newest. Packets a consumer skips, or that the ring overwrote before it
+    read them, count toward its own dropped_frames.
+    """
+
+    def __init__(self, bus: FrameBus, name: str, policy: OverflowPolicy, maxlen: int):
+        """Use FrameBus.subscribe() instead of constructing directly."""
+        self._bus = bus
+        self.name = name
+        self.policy = policy
+        self.maxlen = min(bus.capacity, max(1, int(maxlen)))
+        self._cursor = 0
+        self.dropped_frames = 0
+        self.dropped = 0  # backward-compatible alias
+        self.stale = False
+
+    def _limit(self) -> int:
+        """Unread packets this subscriber may keep."""
+        return 1 if self.policy == OverflowPolicy.LAST_ONLY else self.maxlen
+
+    def _overflow_locked(self) -> int:
+        """Published packets this subscriber will skip on its next read; caller holds the bus lock."""
+        return max(0, self._bus._head - self._cursor - self._limit())
+
+    def _pending_locked(self) -> int:
+        """Unread packets still to be delivered; caller holds the bus lock."""
+        return min(self._bus._head - self._cursor, self._limit())
+
+    def get(self, timeout: float | None = None) -> FramePacket | None:
+        """Return this subscriber's next packet with a reference the caller must release()."""
+        bus = self._bus
+        with bus._cv:
+            if bus._head <= self._cursor:
+                bus._cv.wait(timeout=timeout)
+            if bus._head <= self._cursor:
+                return None
+            skipped = self._overflow_locked()
+            if skipped:
+                self.dropped_frames += skipped
+                self.dropped += skipped
+                self._cursor += skipped
+            packet = bus._ring[self._cursor % bus.capacity]
+            self._cursor += 1
+            if packet is None:
+                return None
+            if hasattr(packet, "retain"):
+                packet.retain()
+            return packet
+
+    def peek_latest(self, retain: bool = False) -> FramePacket | None:
+        """Return the bus's newest packet without moving this cursor."""
+        return self._bus.peek_latest(retain=retain)
+
+    def latest_copy(self, limit: int | None = None) -> FramePacket | None:
+        """Return the bus's newest packet with an owned payload copy (first limit bytes)."""
+        return self._bus.latest_copy(limit)
+
+    def clear(self, stale: bool = True) -> None:
+        """Skip everything published so far, for this subscriber only."""
+        with self._bus._cv:
+            self._cursor = self._bus._head
+            self.stale = stale
+
+    def size(self) -> int:
+        """Unread packets this subscriber would still receive."""
+        with self._bus._cv:
+            return self._pending_locked()
+
+    def close(self) -> None:
+        """Unsubscribe from the bus."""
+        self._bus.unsubscribe(self)
@@ -1,12 +1,23 @@
 """Frame consumer interfaces for preview, detection, snapshot, and metrics."""
 from __future__ import annotations
 
+import os
 import threading
 import time
 from abc import ABC, abstractmethod
 
+import cv2
+import numpy as np
+
 from app.services.frame_bus import FramePacket, FrameQueue
 
+# Frames whose thumbnails differ by at most FRAME_GATE_PIXEL_DELTA gray levels in
+# every cell reuse the previous detection result, for at most FRAME_GATE_MAX_STALE_SEC.
+FRAME_GATE_ENABLED = os.getenv("MONITOR_FRAME_GATE", "1") == "1"
+FRAME_GATE_PIXEL_DELTA = int(os.getenv("MONITOR_FRAME_GATE_DELTA", "6"))
+FRAME_GATE_MAX_STALE_SEC = float(os.getenv("MONITOR_FRAME_GATE_MAX_STALE_SEC", "2.0"))
+FRAME_GATE_THUMBNAIL_SIZE = (120, 68)
+
 
 class FrameConsumer(ABC):
     @abstractmethod
@@ -36,10 +47,43 @@ class SnapshotConsumer:
         Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
         the behavior without duplicating logic.
         """
-        packet = self._queue.peek_latest()
-        if not packet:
-            return None
-        return FramePacket(timestamp=packet.timestamp, payload=bytes(packet.payload), stale=packet.stale)
+        return self._queue.latest_copy()
+
+
+class PreviewConsumer:
+    """Decimated gray-plane branch of a shared capture for the live preview.
+
+    Samples the bus's latest-frame slot at most fps times per second and
+    copies only the top width x height gray plane, at the capture's
+    resolution, so the preview never holds capture buffers, never takes a
+    subscriber cursor and never copies the edge or coarse planes stacked
+    below it. Callers must check that the capture's frames have the
+    preview's geometry (not ROI-cropped, same size).
+    """
+
+    def __init__(self, bus, width: int, height: int, fps: float):
+        """Sample width x height gray frames from bus at up to fps."""
+        self._bus = bus
+        self.plane_bytes = int(width) * int(height)
+        self.interval = 1.0 / max(1e-3, float(fps))
+        self._cached: FramePacket | None = None
+        self._sampled_at = 0.0
+
+    def latest_copy(self) -> FramePacket | None:
+        """Return the newest gray frame, reusing the previous copy within one interval."""
+        now = time.monotonic()
+        if self._cached is not None and now - self._sampled_at < self.interval:
+            return self._cached
+        packet = self._bus.latest_copy(self.plane_bytes)
+        if packet is None or len(packet.payload) < self.plane_bytes:
+            return self._cached
+        self._cached = packet
+        self._sampled_at = now
+        return self._cached
+
+    def clear(self, stale: bool = True) -> None:
+        """Forget the cached frame; the shared bus is left to its other users."""
+        self._cached = None
 
 
 class DetectionConsumer:
@@ -101,3 +145,80 @@ class MetricsConsumer:
             self.capture_fps = self.frames / delta
             self.frames = 0
             self.last_ts = now
+
+
+class FrameChangeGate:
+    """Skip detection on frames that match the last evaluated frame's thumbnail.
+
+    While a detection event may still be open, results are reused for at most
+    exit_timeout, so a static screen cannot postpone the detector's exit path
+    and swallow the event_start of the next dialogue.
+    """
+
+    def __init__(
+        self,
+        pixel_delta: int = FRAME_GATE_PIXEL_DELTA,
+        max_stale_sec: float = FRAME_GATE_MAX_STALE_SEC,
+        enabled: bool = FRAME_GATE_ENABLED,
+        exit_timeout: float | None = None,
+    ):
+        """Configure the change threshold and the maximum time a result may be reused."""
+        self.pixel_delta = int(pixel_delta)
+        self.max_stale_sec = float(max_stale_sec)
+        self.enabled = enabled
+        self.exit_timeout = exit_timeout
+        self._event_open = False
+        self._last_match_at = 0.0
+        self.evaluated = 0
+        self.skipped = 0
+        self._reference = None
+        self._reference_at = 0.0
+        self._scratch = None
+
+    def should_evaluate(self, frame, now: float | None = None) -> bool:
+        """Return True when detection must run on frame, updating the counters."""
+        now = time.monotonic() if now is None else now
+        thumbnail = cv2.resize(frame, FRAME_GATE_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        if (
+            self.enabled
+            and self._reference is not None
+            and self._reference.shape == thumbnail.shape
+            and now - self._reference_at < self._stale_limit()
+        ):
+            if self._scratch is None or self._scratch.shape != thumbnail.shape:
+                self._scratch = np.empty_like(thumbnail)
+            cv2.absdiff(thumbnail, self._reference, dst=self._scratch)
+            if int(self._scratch.max()) <= self.pixel_delta:
+                self.skipped += 1
+                return False
+        self._reference = thumbnail
+        self._reference_at = now
+        self.evaluated += 1
+        return True
+
+    def observe(self, result) -> None:
+        """Track whether the detector may still hold an event open, mirroring its exit timeout."""
+        if self.exit_timeout is None:
+            return
+        if result.matched:
+            self._event_open = True
+            self._last_match_at = result.timestamp
+        elif self._event_open and result.timestamp - self._last_match_at > self.exit_timeout:
+            self._event_open = False
+
+    def _stale_limit(self) -> float:
+        """Seconds the last result may be reused for."""
+        if self._event_open:
+            return min(self.max_stale_sec, self.exit_timeout)
+        return self.max_stale_sec
+
+    def reset(self) -> None:
+        """Forget the reference frame so the next frame is always evaluated."""
+        self._reference = None
+
+    def take_counts(self) -> tuple[int, int]:
+        """Return and clear (evaluated, skipped) counts since the last call."""
+        counts = (self.evaluated, self.skipped)
+        self.evaluated = 0
+        self.skipped = 0
+        return counts
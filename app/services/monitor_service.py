@@ -2,22 +2,32 @@
 from __future__ import annotations
 
 import logging
+import os
 import threading
 import time
+from dataclasses import replace
 
 import numpy as np
 from PyQt6.QtCore import QThread, pyqtSignal
 
 from app.app_state import app_state
-from app.services.ffmpeg_capture_supervisor import LogLevel
+from app.services.detection_pipeline import STAGED_PIPELINE_ENABLED, StagedDetectionPipeline
+from app.services.detector_worker import DETECTOR_PROCESS_ENABLED, DetectorWorker
+from app.services.ffmpeg_capture_supervisor import HotStandbyCapture, LogLevel
 from app.services.ffmpeg_tools import (
     CaptureConfig,
     FfmpegNotFoundError,
     build_capture_input_candidates,
     capture_single_frame_by_token,
 )
-from app.services.frame_bus import FrameQueue
-from app.services.frame_consumers import DetectionConsumer, MetricsConsumer, SnapshotConsumer
+from app.services.frame_bus import FrameBus, FrameQueue
+from app.services.frame_consumers import (
+    DetectionConsumer,
+    FrameChangeGate,
+    MetricsConsumer,
+    PreviewConsumer,
+    SnapshotConsumer,
+)
 from app.services.monitor_state_machine import InvalidTransition, MonitoringState, MonitoringStateMachine
 from app.services.monitor_pipeline import FfmpegCapture
 from app.services.capture_constants import CANONICAL_FPS, CANONICAL_HEIGHT, CANONICAL_WIDTH
@@ -31,7 +41,7 @@ from core.profiles import (
 
 _GLOBAL_LOCK = threading.Lock()
 _GLOBAL_CAPTURE: FfmpegCapture | None = None
-_GLOBAL_QUEUE: FrameQueue | None = None
+_GLOBAL_QUEUE: FrameBus | None = None
 _GLOBAL_USERS = 0
 _GLOBAL_INPUT_TOKEN: str | None = None
 _GLOBAL_CONFIG: CaptureConfig | None = None
@@ -41,6 +51,7 @@ _PREVIEW_CAPTURE: FfmpegCapture | None = None
 _PREVIEW_QUEUE: FrameQueue | None = None
 _PREVIEW_INPUT_TOKEN: str | None = None
 _PREVIEW_CONFIG: CaptureConfig | None = None
+_PREVIEW_INPUT_TUNING = False
 _PREVIEW_PAUSED_FOR_MONITORING = False
 _PREVIEW_LAST_RESTART_AT = 0.0
 _PREVIEW_RESTART_DEBOUNCE_SEC = 1.5
@@ -49,9 +60,18 @@ _PREVIEW_STATIC_FRAME: tuple[float, np.ndarray] | None = None
 _PREVIEW_LIVE_ENABLED = False
 _CAMERA_REOPEN_COOLDOWN_SEC = 0.4
 
-_CAMERA_OWNER_LOCK = threading.Lock()
-_ACTIVE_OWNER_PIPELINE: str | None = None
-_ACTIVE_CAMERA_TOKEN: str | None = None
+# Opt-in: FFmpeg appends an edgedetect plane to each frame so detection skips Canny.
+FFMPEG_EDGE_PLANE_ENABLED = os.getenv("MONITOR_FFMPEG_EDGES", "0") == "1"
+# Edge pixels a frame needs before it is used to calibrate template edges against FFmpeg.
+_EDGE_CALIBRATION_MIN_PIXELS = 2000
+# Opt-in, with the edge plane: FFmpeg also emits the coarse edge level so detection skips that resize.
+FFMPEG_COARSE_PLANE_ENABLED = os.getenv("MONITOR_FFMPEG_COARSE", "0") == "1"
+# Opt-in: FFmpeg crops monitoring frames to the profile's detection ROI.
+FFMPEG_ROI_CROP_ENABLED = os.getenv("MONITOR_FFMPEG_ROI", "0") == "1"
+# Opt-in: camera display name kept warm as a hot standby for monitoring (e.g. a virtual camera).
+STANDBY_CAMERA = os.getenv("MONITOR_STANDBY_CAMERA", "").strip()
+
+_CAMERA_RELEASE_LOCK = threading.Lock()
 _LAST_CAMERA_RELEASE_AT = 0.0
 
 
@@ -77,34 +97,16 @@ def _emit_capture_event(payload: dict) -> None:
         pass
 
 
-def _acquire_camera_owner(pipeline: str, input_token: str) -> tuple[bool, str | None]:
-    """Allow only one FFmpeg owner (preview OR monitoring) per camera at a time."""
-    global _ACTIVE_OWNER_PIPELINE, _ACTIVE_CAMERA_TOKEN
-    with _CAMERA_OWNER_LOCK:
-        if _ACTIVE_OWNER_PIPELINE and (_ACTIVE_OWNER_PIPELINE != pipeline or _ACTIVE_CAMERA_TOKEN != input_token):
-            return False, f"Camera is currently owned by {_ACTIVE_OWNER_PIPELINE}"
-        _ACTIVE_OWNER_PIPELINE = pipeline
-        _ACTIVE_CAMERA_TOKEN = input_token
-        return True, None
-
-
-def _release_camera_owner(pipeline: str, input_token: str) -> None:
-    """Execute  release camera owner.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
-    """
-    global _ACTIVE_OWNER_PIPELINE, _ACTIVE_CAMERA_TOKEN, _LAST_CAMERA_RELEASE_AT
-    with _CAMERA_OWNER_LOCK:
-        if _ACTIVE_OWNER_PIPELINE == pipeline and _ACTIVE_CAMERA_TOKEN == input_token:
-            _ACTIVE_OWNER_PIPELINE = None
-            _ACTIVE_CAMERA_TOKEN = None
-            _LAST_CAMERA_RELEASE_AT = time.time()
+def _note_camera_released() -> None:
+    """Record when an FFmpeg process last closed the camera, for the reopen cooldown."""
+    global _LAST_CAMERA_RELEASE_AT
+    with _CAMERA_RELEASE_LOCK:
+        _LAST_CAMERA_RELEASE_AT = time.time()
 
 
 def _wait_camera_reopen_cooldown(stop_event: threading.Event | None = None) -> bool:
     """Small deterministic cooldown avoids DirectShow thrash on rapid close/open."""
-    with _CAMERA_OWNER_LOCK:
+    with _CAMERA_RELEASE_LOCK:
         remaining = _CAMERA_REOPEN_COOLDOWN_SEC - (time.time() - _LAST_CAMERA_RELEASE_AT)
     if remaining <= 0:
         return True
@@ -113,14 +115,23 @@ def _wait_camera_reopen_cooldown(stop_event: threading.Event | None = None) -> b
     time.sleep(remaining)
     return True
 
-def _build_monitoring_config_ladder(width: int, height: int, fps: int, *, is_virtual: bool) -> list[CaptureConfig]:
+def _build_monitoring_config_ladder(
+    width: int,
+    height: int,
+    fps: int,
+    *,
+    is_virtual: bool,
+    edge_plane: bool = False,
+    roi: tuple[int, int, int, int] | None = None,
+    coarse_plane: bool = False,
+) -> list[CaptureConfig]:
     """Execute  build monitoring config ladder.
     
     Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
     the behavior without duplicating logic.
     """
-    requested = CaptureConfig(width=width, height=height, fps=fps, input_width=width, input_height=height, input_fps=fps, label="requested")
-    implicit = CaptureConfig(width=width, height=height, fps=fps, input_width=None, input_height=None, input_fps=None, label="implicit-default")
+    requested = CaptureConfig(width=width, height=height, fps=fps, input_width=width, input_height=height, input_fps=fps, label="requested", edge_plane=edge_plane, roi=roi, coarse_plane=coarse_plane)
+    implicit = CaptureConfig(width=width, height=height, fps=fps, input_width=None, input_height=None, input_fps=None, label="implicit-default", edge_plane=edge_plane, roi=roi, coarse_plane=coarse_plane)
     # Virtual cameras (OBS/Broadcast/etc.) are unstable when forced at input open time.
     # Keep DirectShow input negotiation implicit and only scale/rate-limit on output.
     if is_virtual:
@@ -132,53 +143,74 @@ def _ensure_global_capture(
     input_token: str,
     config: CaptureConfig,
     *,
-    allow_input_tuning: bool,
-) -> tuple[FfmpegCapture, FrameQueue]:
-    """Execute  ensure global capture.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
+    allow_input_tuning: bool = True,
+    pipeline: str = "monitoring",
+    attach_any: bool = False,
+    standby=None,
+) -> tuple[FfmpegCapture, FrameBus]:
+    """Take a reference on the shared capture of input_token, opening the camera only when needed.
+
+    Preview and monitoring share one long-lived FFmpeg process per camera. A
+    running capture is reused whenever it can serve config (attach_any reuses
+    any live capture of the camera, for passengers such as the preview).
+    Otherwise the camera is reopened once with config; existing users keep
+    their reference and the same FrameBus, which is cleared as stale.
+    standby, a capture input candidate, is kept warm next to the capture as a
+    HotStandbyCapture, whether this call opens the camera or attaches to it.
     """
     global _GLOBAL_CAPTURE, _GLOBAL_QUEUE, _GLOBAL_USERS, _GLOBAL_INPUT_TOKEN, _GLOBAL_CONFIG
     with _GLOBAL_LOCK:
-        if _GLOBAL_CAPTURE and _GLOBAL_CAPTURE.is_alive():
-            same_token = _GLOBAL_INPUT_TOKEN == input_token
-            same_config = _GLOBAL_CONFIG.is_equivalent_for_capture(config)
-            if same_token and same_config:
+        if _GLOBAL_CAPTURE and _GLOBAL_CAPTURE.is_alive() and _GLOBAL_INPUT_TOKEN == input_token:
+            if attach_any or _GLOBAL_CONFIG.can_serve(config):
+                if standby is not None and standby.token != input_token and isinstance(_GLOBAL_CAPTURE, FfmpegCapture):
+                    _attach_standby_locked(standby)
                 _GLOBAL_USERS += 1
                 return _GLOBAL_CAPTURE, _GLOBAL_QUEUE
+        users = 0
+        if _GLOBAL_CAPTURE:
+            # A dead or incompatible capture is replaced under its current users.
+            users = _GLOBAL_USERS
             _GLOBAL_CAPTURE.stop()
-            if _GLOBAL_QUEUE:
-                _GLOBAL_QUEUE.clear(stale=True)
+            _note_camera_released()
             _GLOBAL_CAPTURE = None
-            _GLOBAL_QUEUE = None
-            _GLOBAL_USERS = 0
+        if _GLOBAL_QUEUE:
+            _GLOBAL_QUEUE.clear(stale=True)
 
-        acquired, reason = _acquire_camera_owner("monitoring", input_token)
-        if not acquired:
-            raise RuntimeError(reason or "camera ownership conflict")
         if not _wait_camera_reopen_cooldown():
-            _release_camera_owner("monitoring", input_token)
             raise RuntimeError("camera reopen cooldown interrupted")
 
-        _GLOBAL_QUEUE = FrameQueue(maxlen=3)
+        if _GLOBAL_QUEUE is None:
+            _GLOBAL_QUEUE = FrameBus()
         try:
-            _GLOBAL_CAPTURE = FfmpegCapture(
-                input_token=input_token,
-                config=config,
-                frame_queue=_GLOBAL_QUEUE,
-                allow_input_tuning=allow_input_tuning,
-                pipeline="monitoring",
-                log_sink=_emit_capture_event,
-            )
+            if standby is not None and standby.token != input_token:
+                _GLOBAL_CAPTURE = HotStandbyCapture(
+                    input_token,
+                    config,
+                    _GLOBAL_QUEUE,
+                    standby_token=standby.token,
+                    standby_config=_standby_config(config),
+                    allow_input_tuning=allow_input_tuning,
+                    pipeline=pipeline,
+                    log_sink=_emit_capture_event,
+                )
+            else:
+                _GLOBAL_CAPTURE = FfmpegCapture(
+                    input_token=input_token,
+                    config=config,
+                    frame_queue=_GLOBAL_QUEUE,
+                    allow_input_tuning=allow_input_tuning,
+                    pipeline=pipeline,
+                    log_sink=_emit_capture_event,
+                )
             _GLOBAL_CAPTURE.start()
             _GLOBAL_INPUT_TOKEN = input_token
             _GLOBAL_CONFIG = config
-            _GLOBAL_USERS = 1
+            _GLOBAL_USERS = users + 1
             return _GLOBAL_CAPTURE, _GLOBAL_QUEUE
         except Exception:
             if _GLOBAL_CAPTURE:
                 _GLOBAL_CAPTURE.stop()
+                _note_camera_released()
             _GLOBAL_CAPTURE = None
             if _GLOBAL_QUEUE:
                 _GLOBAL_QUEUE.clear(stale=True)
@@ -186,16 +218,33 @@ def _ensure_global_capture(
             _GLOBAL_USERS = 0
             _GLOBAL_INPUT_TOKEN = None
             _GLOBAL_CONFIG = None
-            _release_camera_owner("monitoring", input_token)
             raise
 
 
+def _standby_config(config: CaptureConfig) -> CaptureConfig:
+    """Standby capture config: same output frames, input negotiation left implicit as for virtual cameras."""
+    return replace(config, input_width=None, input_height=None, input_fps=None, label="standby")
+
+
+def _attach_standby_locked(standby) -> None:
+    """Upgrade the running shared capture to a HotStandbyCapture; caller holds _GLOBAL_LOCK."""
+    global _GLOBAL_CAPTURE, _PREVIEW_CAPTURE
+    plain = _GLOBAL_CAPTURE
+    upgraded = HotStandbyCapture.adopt(
+        plain,
+        standby_token=standby.token,
+        standby_config=_standby_config(plain.config),
+        log_sink=_emit_capture_event,
+    )
+    upgraded.start()
+    _GLOBAL_CAPTURE = upgraded
+    # Plain reference swap: taking _PREVIEW_LOCK here would invert the preview → global lock order.
+    if _PREVIEW_CAPTURE is plain:
+        _PREVIEW_CAPTURE = upgraded
+
+
 def _release_global_capture(clear_queue: bool = False) -> None:
-    """Execute  release global capture.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
-    """
+    """Drop one reference on the shared capture; the last user closes the camera."""
     global _GLOBAL_CAPTURE, _GLOBAL_QUEUE, _GLOBAL_USERS, _GLOBAL_INPUT_TOKEN, _GLOBAL_CONFIG
     with _GLOBAL_LOCK:
         if _GLOBAL_USERS <= 0:
@@ -205,7 +254,7 @@ def _release_global_capture(clear_queue: bool = False) -> None:
             return
         if _GLOBAL_CAPTURE:
             _GLOBAL_CAPTURE.stop()
-            _release_camera_owner("monitoring", _GLOBAL_INPUT_TOKEN or "")
+            _note_camera_released()
         if _GLOBAL_QUEUE and clear_queue:
             _GLOBAL_QUEUE.clear(stale=True)
         _GLOBAL_CAPTURE = None
@@ -214,18 +263,23 @@ def _release_global_capture(clear_queue: bool = False) -> None:
         _GLOBAL_CONFIG = None
 
 
-def _ensure_preview_capture(input_token: str, config: CaptureConfig, *, allow_input_tuning: bool) -> tuple[bool, str | None]:
-    """Execute  ensure preview capture.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
+def _ensure_preview_capture(
+    input_token: str,
+    config: CaptureConfig,
+    *,
+    allow_input_tuning: bool,
+    fps: float | None = None,
+) -> tuple[bool, str | None]:
+    """Attach the live preview to the camera's shared capture.
+
+    The preview is a passenger: it rides any live capture of the camera
+    (including monitoring's) and samples a decimated gray branch at fps.
     """
     global _PREVIEW_CAPTURE, _PREVIEW_QUEUE, _PREVIEW_INPUT_TOKEN, _PREVIEW_CONFIG, _PREVIEW_LAST_RESTART_AT
+    global _PREVIEW_INPUT_TUNING
     with _PREVIEW_LOCK:
         if _PREVIEW_PAUSED_FOR_MONITORING:
             return False, "Preview paused while monitoring is active"
-        if _ACTIVE_OWNER_PIPELINE == "monitoring":
-            return False, "Camera is currently owned by monitoring"
 
         if _PREVIEW_CAPTURE and _PREVIEW_CAPTURE.is_alive() and _PREVIEW_INPUT_TOKEN == input_token and _PREVIEW_CONFIG is not None and _PREVIEW_CONFIG.is_equivalent_for_capture(config):
             return True, None
@@ -235,46 +289,34 @@ def _ensure_preview_capture(input_token: str, config: CaptureConfig, *, allow_in
             return False, "Preview restart debounced"
 
         if _PREVIEW_CAPTURE:
-            _PREVIEW_CAPTURE.stop()
-            _release_camera_owner("preview", _PREVIEW_INPUT_TOKEN or "")
+            _release_global_capture()
         if _PREVIEW_QUEUE:
             _PREVIEW_QUEUE.clear(stale=True)
-
-        acquired, reason = _acquire_camera_owner("preview", input_token)
-        if not acquired:
-            return False, reason
+        _PREVIEW_CAPTURE = None
+        _PREVIEW_QUEUE = None
 
         _PREVIEW_LAST_RESTART_AT = now
-        if not _wait_camera_reopen_cooldown():
-            _release_camera_owner("preview", input_token)
-            return False, "Preview cooldown interrupted"
-
-        _PREVIEW_QUEUE = FrameQueue(maxlen=3)
-        _PREVIEW_CAPTURE = FfmpegCapture(
-            input_token=input_token,
-            config=config,
-            frame_queue=_PREVIEW_QUEUE,
+        capture, bus = _ensure_global_capture(
+            input_token,
+            config,
             allow_input_tuning=allow_input_tuning,
             pipeline="preview",
-            log_sink=_emit_capture_event,
+            attach_any=True,
         )
-        _PREVIEW_CAPTURE.start()
+        _PREVIEW_CAPTURE = capture
+        _PREVIEW_QUEUE = PreviewConsumer(bus, config.width, config.height, fps or config.fps)
         _PREVIEW_INPUT_TOKEN = input_token
         _PREVIEW_CONFIG = config
+        _PREVIEW_INPUT_TUNING = allow_input_tuning
         return True, None
 
 
 def release_preview_capture() -> None:
-    """Execute release preview capture.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
-    """
+    """Drop the preview's reference on the shared capture."""
     global _PREVIEW_CAPTURE, _PREVIEW_QUEUE, _PREVIEW_INPUT_TOKEN, _PREVIEW_CONFIG, _PREVIEW_LAST_RESTART_AT
     with _PREVIEW_LOCK:
         if _PREVIEW_CAPTURE:
-            _PREVIEW_CAPTURE.stop()
-            _release_camera_owner("preview", _PREVIEW_INPUT_TOKEN or "")
+            _release_global_capture()
         if _PREVIEW_QUEUE:
             _PREVIEW_QUEUE.clear(stale=True)
         _PREVIEW_CAPTURE = None
@@ -285,43 +327,70 @@ def release_preview_capture() -> None:
 
 
 def pause_preview_for_monitoring() -> None:
-    """Execute pause preview for monitoring.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
+    """Stop live preview updates while monitoring runs.
+
+    The preview keeps its reference on the shared capture, so monitoring
+    attaches to the already-open camera and stopping monitoring hands it back
+    without a reopen.
     """
     global _PREVIEW_LIVE_ENABLED, _PREVIEW_PAUSED_FOR_MONITORING, _PREVIEW_STATIC_FRAME
     with _PREVIEW_LOCK:
         _PREVIEW_PAUSED_FOR_MONITORING = True
         _PREVIEW_LIVE_ENABLED = False
-        if _PREVIEW_QUEUE:
-            packet = _PREVIEW_QUEUE.peek_latest()
-            if packet is not None and _PREVIEW_CONFIG:
+        if _PREVIEW_QUEUE and _PREVIEW_CONFIG:
+            packet = _PREVIEW_QUEUE.latest_copy()
+            if packet is not None:
                 arr = np.frombuffer(packet.payload, dtype=np.uint8)
-                expected = _PREVIEW_CONFIG.width * _PREVIEW_CONFIG.height
-                if arr.size == expected:
+                if arr.size == _PREVIEW_CONFIG.width * _PREVIEW_CONFIG.height:
                     _PREVIEW_STATIC_FRAME = (
                         packet.timestamp,
                         arr.reshape((_PREVIEW_CONFIG.height, _PREVIEW_CONFIG.width)).copy(),
                     )
     logging.info("[CAM_PREVIEW] pause for monitoring")
-    release_preview_capture()
 
 
 def resume_preview_after_monitoring() -> None:
-    """Execute resume preview after monitoring.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
+    """Allow preview updates again, restoring the preview's geometry on the shared capture.
+
+    Monitoring may have reopened the camera ROI-cropped or at another size;
+    once it released its reference the preview's own config is reopened.
     """
-    global _PREVIEW_PAUSED_FOR_MONITORING
+    global _PREVIEW_PAUSED_FOR_MONITORING, _PREVIEW_CAPTURE
     with _PREVIEW_LOCK:
         _PREVIEW_PAUSED_FOR_MONITORING = False
+        if _PREVIEW_CAPTURE is not None and _PREVIEW_CONFIG is not None and not _preview_geometry_matches():
+            try:
+                capture, _ = _ensure_global_capture(
+                    _PREVIEW_INPUT_TOKEN,
+                    _PREVIEW_CONFIG,
+                    allow_input_tuning=_PREVIEW_INPUT_TUNING,
+                    pipeline="preview",
+                )
+            except Exception as exc:
+                logging.warning("[CAM_PREVIEW] could not restore preview geometry: %s", exc)
+            else:
+                # Reopening kept the preview's reference; drop the one taken here.
+                _release_global_capture()
+                _PREVIEW_CAPTURE = capture
     logging.info("[CAM_PREVIEW] resume allowed")
 
 
+def _shared_full_frame(input_token: str, width: int, height: int):
+    """Return (timestamp, gray frame) from the live shared capture of input_token, if it has one."""
+    capture, bus, config = _GLOBAL_CAPTURE, _GLOBAL_QUEUE, _GLOBAL_CONFIG
+    if capture is None or bus is None or config is None or _GLOBAL_INPUT_TOKEN != input_token:
+        return None
+    if not capture.is_alive() or config.roi is not None or (config.width, config.height) != (width, height):
+        return None
+    packet = bus.latest_copy()
+    if packet is None or len(packet.payload) < width * height:
+        return None
+    arr = np.frombuffer(packet.payload, dtype=np.uint8, count=width * height)
+    return packet.timestamp, arr.reshape((height, width)).copy()
+
+
 def capture_preview_snapshot(selected_display_name: str, width: int, height: int) -> tuple[bool, str | None]:
-    """Capture one frame for default preview and release camera ownership immediately."""
+    """Capture one frame for default preview, from the shared capture when the camera is already open."""
     global _PREVIEW_STATIC_FRAME, _PREVIEW_CONFIG
     candidates = build_capture_input_candidates(selected_display_name)
     if not candidates:
@@ -339,10 +408,15 @@ def capture_preview_snapshot(selected_display_name: str, width: int, height: int
     height = CANONICAL_HEIGHT
     attempts = _PREVIEW_MAX_RETRIES
     last_reason = "Camera preview unavailable"
+    shared = _shared_full_frame(candidate.token, width, height)
+    if shared is not None:
+        # The camera is already streaming; reopening it for one frame would stall its users.
+        with _PREVIEW_LOCK:
+            _PREVIEW_STATIC_FRAME = shared
+            _PREVIEW_CONFIG = CaptureConfig(width=width, height=height, fps=1, label="snapshot")
+        return True, None
+
     for attempt in range(1, attempts + 1):
-        acquired, reason = _acquire_camera_owner("preview", candidate.token)
-        if not acquired:
-            return False, reason or "Camera preview unavailable"
         try:
             if not _wait_camera_reopen_cooldown():
                 last_reason = "Camera preview unavailable"
@@ -364,7 +438,7 @@ def capture_preview_snapshot(selected_display_name: str, width: int, height: int
             logging.warning("[CAM_PREVIEW] snapshot failed", exc_info=True)
             last_reason = "Camera preview unavailable"
         finally:
-            _release_camera_owner("preview", candidate.token)
+            _note_camera_released()
 
         if attempt < attempts:
             time.sleep(_CAMERA_REOPEN_COOLDOWN_SEC)
@@ -396,6 +470,7 @@ def start_preview_for_selected_camera(selected_display_name: str, width: int, he
         return False, "Preview failed: selected camera not found"
 
     candidate = candidates[0]
+    # Opened with the planes monitoring will ask for, so starting monitoring attaches instead of reopening.
     config = CaptureConfig(
         width=CANONICAL_WIDTH,
         height=CANONICAL_HEIGHT,
@@ -403,12 +478,14 @@ def start_preview_for_selected_camera(selected_display_name: str, width: int, he
         input_width=None,
         input_height=None,
         input_fps=None,
+        edge_plane=FFMPEG_EDGE_PLANE_ENABLED,
+        coarse_plane=FFMPEG_COARSE_PLANE_ENABLED,
     )
     try:
-        started, skip_reason = _ensure_preview_capture(candidate.token, config, allow_input_tuning=False)
+        started, skip_reason = _ensure_preview_capture(candidate.token, config, allow_input_tuning=False, fps=fps)
         if (not started and candidate.is_virtual and skip_reason and "busy" in skip_reason.lower()):
             time.sleep(_CAMERA_REOPEN_COOLDOWN_SEC)
-            started, skip_reason = _ensure_preview_capture(candidate.token, config, allow_input_tuning=False)
+            started, skip_reason = _ensure_preview_capture(candidate.token, config, allow_input_tuning=False, fps=fps)
     except FfmpegNotFoundError as exc:
         return False, f"Preview failed: FFmpeg not found ({exc})"
     except Exception as exc:
@@ -441,8 +518,8 @@ def get_latest_preview_frame():
                 _PREVIEW_LIVE_ENABLED = False
                 should_release = True
                 static_frame = _PREVIEW_STATIC_FRAME
-            elif _PREVIEW_QUEUE:
-                packet = _PREVIEW_QUEUE.peek_latest()
+            elif _PREVIEW_QUEUE and _preview_geometry_matches():
+                packet = _PREVIEW_QUEUE.latest_copy()
                 if packet is not None:
                     return (packet.timestamp, packet.payload)
                 static_frame = _PREVIEW_STATIC_FRAME
@@ -468,19 +545,35 @@ def get_preview_frame_shape() -> tuple[int, int] | None:
     return None
 
 
+def _global_frames_are_full() -> bool:
+    """False while the shared capture delivers ROI-cropped frames that previews cannot show."""
+    config = _GLOBAL_CONFIG
+    return config is None or config.roi is None
+
+
+def _preview_geometry_matches() -> bool:
+    """True when the shared capture's frames have the preview's geometry: uncropped and the same size."""
+    current, preview = _GLOBAL_CONFIG, _PREVIEW_CONFIG
+    if current is None or preview is None:
+        return True
+    return current.roi is None and (current.width, current.height) == (preview.width, preview.height)
+
+
 def get_latest_global_frame():
     """Execute get latest global frame.
     
     Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
     the behavior without duplicating logic.
     """
-    with _GLOBAL_LOCK:
-        if not _GLOBAL_QUEUE:
-            return None
-        packet = _GLOBAL_QUEUE.peek_latest()
-        if packet is None:
-            return None
-        return (packet.timestamp, packet.payload)
+    # Sampled without _GLOBAL_LOCK, which is held across capture (re)starts; the
+    # latest-frame slot never blocks the reader thread either.
+    bus = _GLOBAL_QUEUE
+    if not bus or not _global_frames_are_full():
+        return None
+    packet = bus.latest_copy()
+    if packet is None:
+        return None
+    return (packet.timestamp, packet.payload)
 
 
 def freeze_latest_global_frame():
@@ -493,7 +586,7 @@ def freeze_latest_global_frame():
     if frame is not None:
         return frame
     with _GLOBAL_LOCK:
-        if not _GLOBAL_QUEUE:
+        if not _GLOBAL_QUEUE or not _global_frames_are_full():
             return None
         snap = SnapshotConsumer(_GLOBAL_QUEUE).capture_snapshot()
         if not snap:
@@ -593,11 +686,21 @@ class MonitorService(QThread):
                 return
 
             candidate = input_candidates[0]
+            standby = self._resolve_standby_candidate(candidate)
             width, height = CANONICAL_WIDTH, CANONICAL_HEIGHT
             fps = min(CANONICAL_FPS, max(1, get_profile_fps(profile)))
             self._monitor_fps = fps
 
-            configs = _build_monitoring_config_ladder(width, height, fps, is_virtual=candidate.is_virtual)
+            roi = dect.get_detection_plan(profile).roi if FFMPEG_ROI_CROP_ENABLED else None
+            configs = _build_monitoring_config_ladder(
+                width,
+                height,
+                fps,
+                is_virtual=candidate.is_virtual,
+                edge_plane=FFMPEG_EDGE_PLANE_ENABLED,
+                roi=roi,
+                coarse_plane=FFMPEG_COARSE_PLANE_ENABLED,
+            )
             max_retries = 2
             queue = None
             failure_reason = "unknown capture failure"
@@ -617,6 +720,7 @@ class MonitorService(QThread):
                     candidate.token,
                     config,
                     allow_input_tuning=not candidate.is_virtual,
+                    standby=standby,
                 )
                 self._capture = cap
                 self._capture_acquired = True
@@ -645,7 +749,7 @@ class MonitorService(QThread):
 
                 self._processing_thread = threading.Thread(
                     target=self._processing_loop,
-                    args=(profile, queue, width, height),
+                    args=(profile, queue, width, height, config.edge_plane, config.roi, config.coarse_size),
                     daemon=True,
                 )
                 self._processing_thread.start()
@@ -691,6 +795,16 @@ class MonitorService(QThread):
             self.stop(clear_queue=failed, emit_status=not failed)
             resume_preview_after_monitoring()
 
+    def _resolve_standby_candidate(self, primary):
+        """Return the MONITOR_STANDBY_CAMERA input candidate, or None when unset, missing or the primary itself."""
+        if not STANDBY_CAMERA:
+            return None
+        candidates = build_capture_input_candidates(STANDBY_CAMERA)
+        if not candidates or candidates[0].token == primary.token:
+            logging.warning("[CAM_CAPTURE] standby camera %r unavailable; monitoring without failover", STANDBY_CAMERA)
+            return None
+        return candidates[0]
+
     def _drain_ffmpeg_logs(self):
         """Execute  drain ffmpeg logs.
         
@@ -708,7 +822,16 @@ class MonitorService(QThread):
             if event.level == LogLevel.ERROR:
                 self.status.emit(f"FFmpeg error: {event.message}")
 
-    def _processing_loop(self, profile, queue: FrameQueue, width: int, height: int):
+    def _processing_loop(
+        self,
+        profile,
+        queue: FrameBus | FrameQueue,
+        width: int,
+        height: int,
+        edge_plane: bool = False,
+        frame_roi: tuple[int, int, int, int] | None = None,
+        coarse_size: tuple[int, int] | None = None,
+    ):
         """Execute  processing loop.
         
         Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
@@ -721,63 +844,185 @@ class MonitorService(QThread):
         last_detection_time = None
         target_frame_time = 1.0 / max(1, self._monitor_fps)
         last_processed_at = 0.0
+        change_gate = FrameChangeGate(exit_timeout=dect.EXIT_TIMEOUT)
+        last_result = None
+        feed = queue
+        if isinstance(queue, FrameBus):
+            # Own cursor on the shared capture: preview peeks never race the detector for frames.
+            feed = queue.subscribe("detector", maxlen=3)
+        planes = 2 if edge_plane else 1
+        if frame_roi is not None:
+            # FFmpeg already cropped to the ROI; the detector translates bboxes back to canonical.
+            width, height = frame_roi[2], frame_roi[3]
+        # Coarse edge plane rows follow the full planes, padded to the frame width.
+        coarse_rows = coarse_size[1] if edge_plane and coarse_size is not None else 0
+        # Template edges are recalibrated to FFmpeg's operator before its edge plane is trusted.
+        edges_calibrated = False
+        worker = None
+        pipeline = None
+        if DETECTOR_PROCESS_ENABLED:
+            worker = DetectorWorker(profile, (height, width), selected_reference=selected_reference, frame_roi=frame_roi)
+            worker.start()
+        elif STAGED_PIPELINE_ENABLED:
+            pipeline = StagedDetectionPipeline(profile, selected_reference=selected_reference, state=self.detector_state)
+            pipeline.start()
 
-        while not self._stop_event.is_set():
-            pkt = queue.get(timeout=0.5)
-            if pkt is None:
-                continue
-
-            now = time.time()
-            if last_processed_at:
-                delta = now - last_processed_at
-                if delta < target_frame_time:
+        try:
+            while not self._stop_event.is_set():
+                pkt = feed.get(timeout=0.5)
+                if worker is not None:
+                    if worker.ensure_alive():
+                        self.status.emit("Detector worker restarted")
+                    for result in worker.poll_results():
+                        last_result = result
+                        change_gate.observe(result)
+                        last_confidence, last_detection_time = self._publish_result(
+                            result, last_confidence, last_detection_time
+                        )
+                if pipeline is not None:
+                    for result in pipeline.poll_results():
+                        last_result = result
+                        change_gate.observe(result)
+                        last_confidence, last_detection_time = self._publish_result(
+                            result, last_confidence, last_detection_time
+                        )
+                if pkt is None:
                     continue
-            last_processed_at = now
 
-            if not hasattr(pkt, "payload"):
-                continue
+                result = None
+                try:
+                    now = time.time()
+                    if last_processed_at:
+                        delta = now - last_processed_at
+                        if delta < target_frame_time:
+                            continue
+                    last_processed_at = now
 
-            self._metrics.on_frame()
-            raw = pkt.payload
-            frame = np.frombuffer(raw, dtype=np.uint8)
-            expected = width * height
-            if frame.size != expected:
-                continue
-            if self._detection_consumer.is_paused():
-                continue
+                    if not hasattr(pkt, "payload"):
+                        continue
 
-            frame = frame.reshape((height, width))
-            result = dect.evaluate_frame(
-                profile,
-                frame,
-                self.detector_state,
-                selected_reference=selected_reference,
-            )
-            last_confidence = result.confidence
-            if result.matched:
-                self.status.emit("Dialogue detected!")
-                last_detection_time = result.timestamp
-                if result.debug_frame is not None:
-                    self.match_debug_frame.emit(result.debug_frame)
-                if result.event_start:
-                    self.play_alert_sound.emit()
-
-            processed += 1
-            if now - start >= 5:
-                self.metrics.emit(
-                    {
-                        "capture_fps": self._metrics.capture_fps,
-                        "process_fps": processed / max(0.001, now - start),
-                        "dropped": queue.dropped_frames,
-                        "queue_fill": (queue.size() / max(1, queue.maxlen)) * 100,
-                        "profile": profile,
-                        "monitoring": True,
-                        "last_detection_time": last_detection_time,
-                        "confidence": last_confidence,
-                    }
-                )
-                processed = 0
-                start = now
+                    self._metrics.on_frame()
+                    raw = pkt.payload
+                    frame = np.frombuffer(raw, dtype=np.uint8)
+                    expected = width * (height * planes + coarse_rows)
+                    if frame.size != expected:
+                        continue
+                    if self._detection_consumer.is_paused():
+                        change_gate.reset()
+                        continue
+
+                    stacked = frame.reshape((height * planes + coarse_rows, width))
+                    frame = stacked[:height]
+                    frame_edges = frame_edges_small = None
+                    if edge_plane:
+                        frame_edges = stacked[height:2 * height]
+                        if coarse_rows:
+                            frame_edges_small = stacked[2 * height:, :coarse_size[0]]
+                        if worker is not None:
+                            # The detection process runs its own Canny on the gray plane.
+                            frame_edges = frame_edges_small = None
+                        elif not edges_calibrated:
+                            edges_calibrated = self._calibrate_ffmpeg_edges(frame, frame_edges)
+                            if not edges_calibrated:
+                                frame_edges = frame_edges_small = None
+                    if not change_gate.should_evaluate(frame) and last_result is not None:
+                        # Unchanged scene: repeat the last verdict without re-firing event side effects.
+                        result = replace(last_result, timestamp=now, event_start=False, debug_frame=None)
+                    elif worker is not None:
+                        # Result arrives asynchronously and is published from the top of the loop.
+                        worker.submit(frame)
+                    elif pipeline is not None:
+                        # The pipeline holds its own reference until the edges stage has read the frame.
+                        pipeline.submit(
+                            frame,
+                            release=pkt.retain().release,
+                            frame_edges=frame_edges,
+                            frame_roi=frame_roi,
+                            frame_edges_small=frame_edges_small,
+                        )
+                    else:
+                        result = dect.evaluate_frame(
+                            profile,
+                            frame,
+                            self.detector_state,
+                            selected_reference=selected_reference,
+                            frame_edges=frame_edges,
+                            frame_roi=frame_roi,
+                            frame_edges_small=frame_edges_small,
+                        )
+                        last_result = result
+                        change_gate.observe(result)
+                finally:
+                    # Pooled capture buffers are recycled once every holder has released them.
+                    release = getattr(pkt, "release", None)
+                    if release is not None:
+                        release()
+                if result is not None:
+                    last_confidence, last_detection_time = self._publish_result(
+                        result, last_confidence, last_detection_time
+                    )
+
+                processed += 1
+                if now - start >= 5:
+                    evaluated, skipped = change_gate.take_counts()
+                    self.metrics.emit(
+                        {
+                            "capture_fps": self._metrics.capture_fps,
+                            "process_fps": processed / max(0.001, now - start),
+                            "dropped": feed.dropped_frames,
+                            "queue_fill": (feed.size() / max(1, feed.maxlen)) * 100,
+                            "profile": profile,
+                            "monitoring": True,
+                            "last_detection_time": last_detection_time,
+                            "confidence": last_confidence,
+                            "frames_evaluated": evaluated,
+                            "frames_skipped": skipped,
+                            **(worker.stats() if worker is not None else dect.debug_writer_stats()),
+                            **(pipeline.stats() if pipeline is not None else {}),
+                            **self._capture_stats(),
+                            # Per-consumer drops on the shared capture (detector, preview, ...).
+                            "subscribers": queue.subscriber_stats() if isinstance(queue, FrameBus) else {},
+                        }
+                    )
+                    processed = 0
+                    start = now
+        finally:
+            if worker is not None:
+                worker.stop()
+            if pipeline is not None:
+                pipeline.stop()
+            if feed is not queue:
+                feed.close()
+            if edges_calibrated:
+                dect.set_template_edge_operator(None)
+
+    def _calibrate_ffmpeg_edges(self, frame, frame_edges) -> bool:
+        """Fit template edge extraction to FFmpeg's edgedetect output; False until a frame has enough edges."""
+        if np.count_nonzero(frame_edges) < _EDGE_CALIBRATION_MIN_PIXELS:
+            return False
+        operator, agreement = dect.calibrate_edge_operator([frame], [frame_edges])
+        dect.set_template_edge_operator(operator)
+        logging.info("[MONITOR] FFmpeg edge calibration operator=%s agreement=%.3f", operator, agreement)
+        return True
+
+    def _capture_stats(self) -> dict:
+        """Return reader/pipe counters of the active capture, if it exposes them."""
+        capture_stats = getattr(self._capture, "capture_stats", None)
+        if capture_stats is None:
+            return {}
+        return capture_stats()
+
+    def _publish_result(self, result, last_confidence: float, last_detection_time):
+        """Emit UI signals for one detection result; returns updated (confidence, detection time)."""
+        last_confidence = result.confidence
+        if result.matched:
+            self.status.emit("Dialogue detected!")
+            last_detection_time = result.timestamp
+            if result.debug_frame is not None:
+                self.match_debug_frame.emit(result.debug_frame)
+            if result.event_start:
+                self.play_alert_sound.emit()
+        return last_confidence, last_detection_time
 
     def stop(self, clear_queue: bool = False, *, emit_status: bool = True):
         """Execute stop.
@@ -798,6 +1043,8 @@ class MonitorService(QThread):
         if self._processing_thread and self._processing_thread.is_alive():
             self._processing_thread.join(timeout=5)
         self._processing_thread = None
+        if not dect.flush_debug_writes(timeout=5):
+            logging.warning("[MONITOR] timed out flushing debug images on stop")
 
         if self._capture and self._capture_acquired:
             _release_global_capture(clear_queue=clear_queue)
@@ -361,7 +361,7 @@ class DashboardPanel(QWidget):
             self.status_label.setText("Select a reference first")
             return
         self._frozen_frame = None
-        self._set_live_preview_enabled(False)
+        # Live preview keeps its shared capture open, so monitoring attaches without reopening the camera.
         pause_preview_for_monitoring()
         self.preview_timer.stop()
         self.refresh_camera_devices()
@@ -838,8 +838,6 @@ class DashboardPanel(QWidget):
             self._preview_failure_reason = message or "Camera preview unavailable"
             self.camera_preview.setPixmap(QPixmap())
             self.camera_preview.setText(self._preview_failure_reason)
-            if enabled and message and "owned by" in message:
-                self._set_live_preview_enabled(False)
             return
 
         self._preview_failure_reason = ""
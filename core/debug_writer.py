@@ -0,0 +1,152 @@
+"""Background writer for detector debug images.
+
+Encoding, file I/O, debug metadata inserts and pruning run on one worker
+thread fed by a bounded drop-oldest queue, so detection never waits on disk.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import cv2
+
+from core import storage
+
+DEBUG_WRITER_QUEUE_SIZE = int(os.getenv("DEBUG_WRITER_QUEUE_SIZE", "8"))
+# The worker re-syncs the storage ledger with disk this often, busy or idle.
+DEBUG_LEDGER_RECONCILE_SEC = float(os.getenv("DEBUG_LEDGER_RECONCILE_SEC", "300"))
+
+
+@dataclass(frozen=True)
+class DebugWriteJob:
+    path: str
+    image: object
+    profile_name: str | None
+    reference_name: str
+    state: object = None
+    phash: int | None = None
+
+
+class DebugImageWriter:
+    """Single worker thread that persists debug images in submission order."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_count: int,
+        maxsize: int = DEBUG_WRITER_QUEUE_SIZE,
+        reconcile_interval: float = DEBUG_LEDGER_RECONCILE_SEC,
+    ):
+        """Configure pruning bounds, queue size and the ledger reconcile interval."""
+        self.max_bytes = max_bytes
+        self.max_count = max_count
+        self.maxsize = max(1, int(maxsize))
+        self.reconcile_interval = reconcile_interval
+        self._queue: deque[DebugWriteJob] = deque()
+        self._cv = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._busy = False
+        self._stopping = False
+        self._last_reconcile = time.monotonic()
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, job: DebugWriteJob) -> None:
+        """Queue a job, evicting the oldest pending one when the queue is full."""
+        with self._cv:
+            if len(self._queue) >= self.maxsize:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(job)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="debug-image-writer", daemon=True)
+                self._thread.start()
+            self._cv.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every queued job has been written. Returns False on timeout."""
+        with self._cv:
+            return self._cv.wait_for(lambda: not self._queue and not self._busy, timeout=timeout)
+
+    def stop(self, timeout: float | None = None) -> bool:
+        """Flush pending jobs and stop the worker thread."""
+        flushed = self.flush(timeout)
+        with self._cv:
+            self._stopping = True
+            self._cv.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return flushed
+
+    def stats(self) -> dict:
+        """Return queue depth and write counters for metrics."""
+        with self._cv:
+            return {
+                "debug_queue_depth": len(self._queue) + (1 if self._busy else 0),
+                "debug_writes_dropped": self.dropped,
+                "debug_writes_failed": self.failed,
+                "debug_writes": self.written,
+            }
+
+    def _run(self) -> None:
+        """Worker loop: pop jobs until stopped, reconciling the ledger every reconcile_interval."""
+        while True:
+            with self._cv:
+                remaining = self.reconcile_interval - (time.monotonic() - self._last_reconcile)
+                self._cv.wait_for(lambda: self._queue or self._stopping, timeout=max(0.0, remaining))
+                # Checked before popping so a queue that never drains cannot postpone reconciling.
+                if time.monotonic() - self._last_reconcile >= self.reconcile_interval:
+                    job = None
+                elif self._queue:
+                    job = self._queue.popleft()
+                    self._busy = True
+                elif self._stopping:
+                    return
+                else:
+                    continue
+            if job is None:
+                try:
+                    storage.reconcile_debug_ledger()
+                except Exception:
+                    logging.warning("Failed to reconcile debug storage ledger", exc_info=True)
+                self._last_reconcile = time.monotonic()
+                continue
+            try:
+                ok = self._write(job)
+            except Exception:
+                logging.warning("Failed to write debug image; continuing monitoring.", exc_info=True)
+                ok = False
+            with self._cv:
+                self._busy = False
+                if ok:
+                    self.written += 1
+                else:
+                    self.failed += 1
+                self._cv.notify_all()
+
+    def _write(self, job: DebugWriteJob) -> bool:
+        """Encode one image, record it, and enforce the global storage bounds."""
+        if not cv2.imwrite(job.path, job.image):
+            logging.warning("Failed to write debug image; continuing monitoring.")
+            return False
+        try:
+            size_bytes = os.path.getsize(job.path)
+        except Exception:
+            size_bytes = 0
+        storage.add_debug_entry(job.profile_name, job.reference_name, job.path, size_bytes, job.phash)
+        if job.phash is not None:
+            # Only captures that reached disk suppress near-duplicates; dropped jobs never do.
+            storage.remember_debug_hash(job.profile_name, job.phash)
+        for path in storage.prune_debug_entries(self.max_bytes, self.max_count):
+            try:
+                os.remove(path)
+            except Exception:
+                logging.warning("Failed to prune debug image %s", path, exc_info=True)
+        if job.state is not None:
+            job.state.total_debug_storage_bytes = storage.get_debug_ledger()[1]
+        return True
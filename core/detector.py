@@ -8,26 +8,72 @@ global bounded storage enforcement.
 import cv2
 import logging
 import os
+import threading
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
 
+import numpy as np
 from app.services.capture_constants import CANONICAL_HEIGHT, CANONICAL_WIDTH
 from core.profiles import (
-    DEBUG_EXTENSIONS,
     get_profile_dirs,
     get_debug_dir,
     profile_path,
     get_detection_threshold,
 )
 from core import storage
+from core.debug_writer import DebugImageWriter, DebugWriteJob
 
 EXIT_TIMEOUT = 0.6  # seconds dialogue must disappear to reset
 DEBUG_STORAGE_LIMIT_BYTES = 1_073_741_824  # 1 GB
 DEBUG_STORAGE_LIMIT_COUNT = 2000
+# Debug captures whose dHash is within this many bits of one of the profile's last
+# storage.DEBUG_HASH_HISTORY captures are treated as duplicates and not saved.
+DEBUG_HASH_MAX_DISTANCE = int(os.getenv("DEBUG_HASH_MAX_DISTANCE", "5"))
 FRAME_COARSE_SCALE = float(os.getenv("FRAME_COARSE_SCALE", "0.5"))
 COARSE_THRESHOLD_FACTOR = 0.75
 COARSE_THRESHOLD_FLOOR = 0.45
+# Pyramid depth: level 0 is full resolution, level 1 the FRAME_COARSE_SCALE frame,
+# deeper levels halve again with pyrDown. A template only gets a level while its
+# shorter side there stays >= PYRAMID_MIN_TEMPLATE_SIDE pixels. Opt-in (> 2):
+# deeper templates bypass the FFT/NCC/atlas coarse engines and use relaxed
+# per-level thresholds.
+PYRAMID_MAX_LEVELS = max(2, int(os.getenv("DETECTOR_PYRAMID_LEVELS", "2")))
+PYRAMID_MIN_TEMPLATE_SIDE = int(os.getenv("DETECTOR_PYRAMID_MIN_SIDE", "16"))
+PYRAMID_THRESHOLD_STEP = 0.05  # coarse threshold relaxation per level below level 1
+PYRAMID_REFINE_MARGIN = 4  # pixels searched around a candidate propagated one level down
 DEFAULT_MATCH_METHOD = os.getenv("DETECTOR_MATCH_METHOD", "TM_CCOEFF_NORMED")
+# "auto" picks shared-integral NCC when enough references are checked; "spatial",
+# "ncc" and "fft" force one engine. Only TM_CCOEFF_NORMED has non-spatial engines.
+# FFT correlation is opt-in: cv2.matchTemplate already correlates large templates
+# via DFT, so per-template FFT shows no per-frame gain by default
+# (see tools/benchmarks/bench_fft_coarse.py).
+MATCH_ENGINE = os.getenv("DETECTOR_MATCH_ENGINE", "auto").strip().lower()
+# Window statistics are only shared between templates of one (height, width), so
+# "auto" uses coarse NCC for a size class once this many checked references share
+# it; below that the per-template OpenCV normalization is cheaper than building
+# shared integral images (see tools/benchmarks/bench_ncc_shared.py).
+NCC_MIN_REFERENCES = int(os.getenv("DETECTOR_NCC_MIN_REFS", "12"))
+# Same-sized reference groups at least this large share one frame spectrum in the
+# coarse pass; smaller groups use the per-template engines. Group scoring broke even
+# at 2 references in tools/benchmarks/bench_atlas_groups.py; 4 leaves headroom.
+ATLAS_MIN_GROUP_SIZE = int(os.getenv("DETECTOR_ATLAS_MIN_GROUP", "4"))
+# Tracking re-checks the last matched bbox of each reference in a small window
+# before falling back to the full coarse/fine search. Opt-in: a tracked hit skips
+# the full search, so an untracked reference that overlaps it and would score
+# higher is not seen until the tracked one drops below threshold.
+ENABLE_TRACKING = os.getenv("DETECTOR_TRACKING", "0") == "1"
+TRACKING_MARGIN = int(os.getenv("DETECTOR_TRACKING_MARGIN", "16"))
+# "incremental" keeps the previous edge maps and recomputes Canny only for tiles
+# whose pixels changed (plus a one-tile halo); "full" recomputes every frame.
+EDGE_MODE = os.getenv("DETECTOR_EDGE_MODE", "full").strip().lower()
+EDGE_TILE_SIZE = int(os.getenv("DETECTOR_EDGE_TILE", "64"))
+# Opt-in: >1 shards the per-frame reference list across this many threads.
+# matchTemplate releases the GIL, so shards run on otherwise idle cores while
+# each OpenCV call itself stays single-threaded (see cv2.setNumThreads below).
+MATCH_WORKERS = max(1, int(os.getenv("DETECTOR_MATCH_WORKERS", "1")))
 ENABLE_DEBUG_LOGGING = os.getenv("ENABLE_DEBUG_LOGGING", "0") == "1"
 
 
@@ -48,6 +94,36 @@ class _TemplateCacheEntry:
     height: int
     small_width: int
     small_height: int
+    mean: float = field(default=0.0, compare=False, repr=False)
+    norm: float = field(default=0.0, compare=False, repr=False)
+    small_mean: float = field(default=0.0, compare=False, repr=False)
+    small_norm: float = field(default=0.0, compare=False, repr=False)
+    # Edge templates for pyramid levels 2.. (levels 0/1 are edge/small_edge).
+    pyramid: tuple = field(default=(), compare=False, repr=False)
+    # Coarse template spectra keyed by DFT shape: (spectrum, zero-mean norm).
+    coarse_spectra: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def top_level(self) -> int:
+        """Deepest pyramid level this template is searched at."""
+        return 1 + len(self.pyramid)
+
+    def level_edge(self, level: int):
+        """Return the edge template for a pyramid level."""
+        if level == 0:
+            return self.edge
+        if level == 1:
+            return self.small_edge
+        return self.pyramid[level - 2]
+
+    def __post_init__(self):
+        """Precompute template statistics used by the NCC and FFT engines."""
+        mean, norm = _template_stats(self.edge)
+        small_mean, small_norm = _template_stats(self.small_edge)
+        object.__setattr__(self, "mean", mean)
+        object.__setattr__(self, "norm", norm)
+        object.__setattr__(self, "small_mean", small_mean)
+        object.__setattr__(self, "small_norm", small_norm)
 
 
 @dataclass
@@ -56,9 +132,62 @@ class _ProfileTemplateCache:
     templates: list[_TemplateCacheEntry]
     by_name: dict[str, _TemplateCacheEntry]
     signature: tuple[tuple[str, int, int], ...]
+    groups: tuple["_TemplateGroup", ...] = ()
+    edge_operator: object = None
+
+
+@dataclass(frozen=True)
+class _TemplateGroup:
+    """Same-sized references whose coarse pass shares one frame spectrum and window statistics."""
+    height: int
+    width: int
+    small_height: int
+    small_width: int
+    entries: tuple[_TemplateCacheEntry, ...]
+
+
+@dataclass(frozen=True)
+class DetectionPlan:
+    """Immutable per-profile detection inputs compiled once per profile revision.
+
+    Built from SQLite (threshold, ROI keys) and the references directory, then
+    reused for every frame until `storage.bump_profile_revision` invalidates it.
+    """
+    profile_name: str
+    revision: tuple[int, int]
+    profile_valid: bool
+    roi: tuple[int, int, int, int] | None
+    threshold: float
+    coarse_threshold: float
+    coarse_scale: float
+    templates: tuple[_TemplateCacheEntry, ...]
+    by_name: Mapping[str, _TemplateCacheEntry]
+    atlas_groups: tuple[_TemplateGroup, ...] = ()
+    # Number of references per (height, width), from the template groups.
+    size_classes: Mapping[tuple[int, int], int] = field(default_factory=dict)
+
+    def templates_for(self, selected_reference: str | None = None) -> tuple[_TemplateCacheEntry, ...]:
+        """Return templates to match, restricted to the selected reference when set."""
+        if not selected_reference:
+            return self.templates
+        selected = self.by_name.get(selected_reference)
+        return (selected,) if selected is not None else ()
+
+    def thresholds(self, threshold_override: float | None = None) -> tuple[float, float]:
+        """Return (fine, coarse) thresholds, honoring a runtime override."""
+        if threshold_override is None:
+            return self.threshold, self.coarse_threshold
+        threshold = float(threshold_override)
+        return threshold, _coarse_threshold_for(threshold)
+
+    def level_thresholds(self, threshold_override: float | None = None) -> tuple[float, ...]:
+        """Return per-pyramid-level thresholds, index 0 being the fine threshold."""
+        threshold, coarse_threshold = self.thresholds(threshold_override)
+        return _level_thresholds(threshold, coarse_threshold)
 
 
 _TEMPLATE_CACHE_BY_PROFILE: dict[str, _ProfileTemplateCache] = {}
+_DETECTION_PLANS: dict[str, DetectionPlan] = {}
 _MATCH_METHOD = getattr(cv2, DEFAULT_MATCH_METHOD, cv2.TM_CCOEFF_NORMED)
 LOGGER = logging.getLogger(__name__)
 
@@ -72,11 +201,16 @@ class DetectorState:
     active_dialogue: str | None = None
     event_active: bool = False
     last_seen_time: float = 0.0
-    last_debug_frame: object = None
     debug_counter: int = 0
     debug_limit_warning_emitted: bool = False
     total_debug_storage_bytes: int = 0
     last_match_time_ms: float = 0.0
+    # Last bbox per reference in processed-frame (ROI) coordinates, valid for tracked_revision.
+    tracked_bboxes: dict = field(default_factory=dict)
+    tracked_revision: object = None
+    last_match_tracked: bool = False
+    edge_cache: object = None
+    workspace: object = None
 
 
 @dataclass(frozen=True)
@@ -99,34 +233,10 @@ class DetectionConfig:
 # Debug storage accounting
 # =========================
 
-def _compute_initial_debug_storage_bytes():
-    """Execute  compute initial debug storage bytes.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
-    """
-    debug_dir = get_debug_dir()
-    total = 0
-    try:
-        names = os.listdir(debug_dir)
-    except Exception:
-        return 0
-    for name in names:
-        if not name.lower().endswith(DEBUG_EXTENSIONS):
-            continue
-        path = os.path.join(debug_dir, name)
-        try:
-            if os.path.isfile(path):
-                total += os.path.getsize(path)
-        except Exception:
-            continue
-    return total
-
-
 def initialize_debug_storage_tracking(state: DetectorState):
     """Initialize debug storage accounting at startup."""
     try:
-        state.total_debug_storage_bytes = _compute_initial_debug_storage_bytes()
+        state.total_debug_storage_bytes = storage.get_debug_ledger()[1]
     except Exception:
         logging.warning(
             "Failed to initialize debug storage accounting; disabling debug writes.",
@@ -146,61 +256,56 @@ def _emit_debug_limit_warning_once(state: DetectorState):
     state.debug_limit_warning_emitted = True
 
 
-def _save_debug_image_if_allowed(debug_dir, debug_image, state: DetectorState, profile_name: str, reference_name: str):
-    """Persist debug image and enforce global bounds."""
+def _save_debug_image_if_allowed(
+    debug_dir,
+    debug_image,
+    state: DetectorState,
+    profile_name: str,
+    reference_name: str,
+    phash: int | None = None,
+):
+    """Queue a debug image for the background writer, which enforces global bounds."""
     try:
-        storage.prune_missing_debug_entries()
         state.debug_counter += 1
-        debug_path = os.path.join(
+        # Resolve now: the writer thread may run after the working directory changes.
+        debug_path = os.path.abspath(os.path.join(
             debug_dir,
             f"match_{time.time_ns()}_{state.debug_counter:04d}.png"
-        )
-
-        if not cv2.imwrite(debug_path, debug_image):
-            logging.warning("Failed to write debug image; continuing monitoring.")
-            return
-
-        try:
-            size_bytes = os.path.getsize(debug_path)
-        except Exception:
-            size_bytes = 0
-        storage.add_debug_entry(profile_name, reference_name, debug_path, size_bytes)
-        for path in storage.prune_debug_entries(DEBUG_STORAGE_LIMIT_BYTES, DEBUG_STORAGE_LIMIT_COUNT):
-            try:
-                os.remove(path)
-            except Exception:
-                logging.warning("Failed to prune debug image %s", path, exc_info=True)
-        state.total_debug_storage_bytes = _compute_initial_debug_storage_bytes()
-
-        state.last_debug_frame = debug_image.copy()
+        ))
+        # The writer owns the image from here on; evaluate_frame never mutates it again.
+        _debug_writer.submit(DebugWriteJob(debug_path, debug_image, profile_name, reference_name, state, phash))
 
     except Exception:
         logging.warning(
-            "Failed to write debug image; continuing monitoring.",
+            "Failed to queue debug image; continuing monitoring.",
             exc_info=True,
         )
 
 
-def _debug_images_similar(img1, img2, threshold=0.97):
-    """Execute  debug images similar.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
-    """
-    if img1 is None or img2 is None:
-        return False
+def flush_debug_writes(timeout: float | None = 5.0) -> bool:
+    """Wait for queued debug images to reach disk. Returns False on timeout."""
+    return _debug_writer.flush(timeout)
+
+
+def debug_writer_stats() -> dict:
+    """Return debug writer queue depth and dropped/failed write counters."""
+    return _debug_writer.stats()
+
 
-    if img1.ndim == 3:
-        img1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
-    if img2.ndim == 3:
-        img2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
+_debug_writer = DebugImageWriter(DEBUG_STORAGE_LIMIT_BYTES, DEBUG_STORAGE_LIMIT_COUNT)
 
-    if img1.shape != img2.shape:
-        img2 = cv2.resize(img2, (img1.shape[1], img1.shape[0]), interpolation=cv2.INTER_AREA)
 
-    result = cv2.matchTemplate(img1, img2, cv2.TM_CCOEFF_NORMED)
-    similarity = float(result[0][0])
-    return similarity >= threshold
+def _debug_hash(frame_gray) -> int:
+    """Return the 64-bit difference hash (dHash) of a grayscale frame."""
+    thumb = cv2.resize(frame_gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (thumb[:, 1:] > thumb[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _is_duplicate_debug_capture(profile_name: str | None, phash: int) -> bool:
+    """True when phash is within DEBUG_HASH_MAX_DISTANCE bits of a recent debug capture of the profile."""
+    distance = storage.nearest_debug_hash_distance(profile_name, phash)
+    return distance is not None and distance <= DEBUG_HASH_MAX_DISTANCE
 
 
 # =========================
@@ -273,38 +378,590 @@ def reference_selector(profile_name):
 
 
 # =========================
-# Detection core
+# Shared-statistics matching
 # =========================
 
-def _find_best_match(
-    profile_name,
-    frame_gray,
-    selected_reference: str | None = None,
-    threshold_override: float | None = None,
+def _template_stats(edge) -> tuple[float, float]:
+    """Return the mean and zero-mean L2 norm of an edge template."""
+    values = edge.astype(np.float64).ravel()
+    mean = float(values.mean())
+    centered = values - mean
+    return mean, float(np.sqrt(np.dot(centered, centered)))
+
+
+def _coarse_engine(class_size: int) -> str:
+    """Pick "spatial", "ncc" or "fft" for one template's coarse pass.
+
+    class_size is the number of checked references with the template's
+    (height, width), i.e. how many templates share its window statistics.
+    """
+    if _MATCH_METHOD != cv2.TM_CCOEFF_NORMED or MATCH_ENGINE == "spatial":
+        return "spatial"
+    if MATCH_ENGINE in ("fft", "ncc"):
+        return MATCH_ENGINE
+    return "ncc" if class_size >= NCC_MIN_REFERENCES else "spatial"
+
+
+def _atlas_enabled() -> bool:
+    """Return True when same-sized reference groups may be scored in batched passes."""
+    return _MATCH_METHOD == cv2.TM_CCOEFF_NORMED and MATCH_ENGINE != "spatial"
+
+
+def _fine_engine() -> str:
+    """Pick "spatial" or "ncc" for fine windows (FFT has no shared spectrum there).
+
+    Fine windows sit at per-reference offsets, so their statistics are never
+    shared and "auto" keeps OpenCV's normalization; only forced engines use NCC.
+    """
+    if _MATCH_METHOD != cv2.TM_CCOEFF_NORMED or MATCH_ENGINE in ("spatial", "auto"):
+        return "spatial"
+    return "ncc"
+
+
+class _FrameStats:
+    """Integral and squared-integral tables of one edge image for a single frame.
+
+    TM_CCOEFF_NORMED needs the sum and standard deviation of every frame
+    window; those only depend on the template size, so they are computed once
+    per size class here instead of inside every cv2.matchTemplate call.
+    """
+
+    def __init__(self, image):
+        """Build the integral tables used for all window statistics of this image."""
+        self.image = image
+        # int32 sums are exact for 8-bit images up to 8M pixels and far cheaper than float64.
+        self.sum, self.sqsum = cv2.integral2(image, sdepth=cv2.CV_32S, sqdepth=cv2.CV_64F)
+        self._stats_by_size: dict[tuple[int, int], tuple[object, object]] = {}
+
+    def _compute_window_stats(self, th: int, tw: int, y0: int, x0: int, out_h: int, out_w: int):
+        """Compute (sum, 1/std) for windows whose top-left lies in the output rectangle."""
+        s, sq = self.sum, self.sqsum
+        y1, x1 = y0 + out_h, x0 + out_w
+        window_sum = (s[y0 + th:y1 + th, x0 + tw:x1 + tw] - s[y0:y1, x0 + tw:x1 + tw] - s[y0 + th:y1 + th, x0:x1] + s[y0:y1, x0:x1]).astype(np.float64)
+        window_sqsum = sq[y0 + th:y1 + th, x0 + tw:x1 + tw] - sq[y0:y1, x0 + tw:x1 + tw] - sq[y0 + th:y1 + th, x0:x1] + sq[y0:y1, x0:x1]
+        variance = np.maximum(window_sqsum - window_sum * window_sum / float(th * tw), 0.0)
+        # Same flat-window cutoff as OpenCV's normalization: such windows score 0.
+        valid = variance > np.minimum(0.5, 10 * np.finfo(np.float32).eps * window_sqsum)
+        inv_std = np.zeros((out_h, out_w), dtype=np.float32)
+        np.divide(1.0, np.sqrt(variance), out=inv_std, where=valid, casting="unsafe")
+        return window_sum.astype(np.float32), inv_std
+
+    def window_stats(self, th: int, tw: int, y0: int = 0, x0: int = 0, out_h: int | None = None, out_w: int | None = None):
+        """Return (window sum, 1/std) maps for a template size; full maps are cached per size."""
+        full_h = self.image.shape[0] - th + 1
+        full_w = self.image.shape[1] - tw + 1
+        out_h = full_h - y0 if out_h is None else out_h
+        out_w = full_w - x0 if out_w is None else out_w
+        key = (th, tw)
+        cached = self._stats_by_size.get(key)
+        if cached is None and (y0, x0, out_h, out_w) == (0, 0, full_h, full_w):
+            cached = self._compute_window_stats(th, tw, 0, 0, full_h, full_w)
+            self._stats_by_size[key] = cached
+        if cached is not None:
+            window_sum, inv_std = cached
+            return window_sum[y0:y0 + out_h, x0:x0 + out_w], inv_std[y0:y0 + out_h, x0:x0 + out_w]
+        return self._compute_window_stats(th, tw, y0, x0, out_h, out_w)
+
+    def normalize(self, correlation, mean: float, norm: float, th: int, tw: int, y0: int = 0, x0: int = 0):
+        """Turn a cross-correlation map into TM_CCOEFF_NORMED scores in place.
+
+        `mean` is the template mean when `correlation` was computed against the
+        raw template, or 0.0 when the template was already zero-mean.
+        """
+        out_h, out_w = correlation.shape[:2]
+        if norm < np.finfo(np.float64).eps:
+            # Mirrors OpenCV: a flat template correlates perfectly everywhere.
+            correlation[...] = 1.0
+            return correlation
+        window_sum, inv_std = self.window_stats(th, tw, y0, x0, out_h, out_w)
+        if mean:
+            cv2.scaleAdd(window_sum, -mean, correlation, dst=correlation)
+        cv2.multiply(correlation, inv_std, dst=correlation, scale=1.0 / norm)
+        np.clip(correlation, -1.0, 1.0, out=correlation)
+        return correlation
+
+
+def _ncc_scores(stats: _FrameStats, template, mean: float, norm: float, y0: int = 0, y1: int | None = None, x0: int = 0, x1: int | None = None):
+    """TM_CCOEFF_NORMED over stats.image[y0:y1, x0:x1] using shared window statistics."""
+    th, tw = template.shape[:2]
+    correlation = cv2.matchTemplate(stats.image[y0:y1, x0:x1], template, cv2.TM_CCORR)
+    return stats.normalize(correlation, mean, norm, th, tw, y0, x0)
+
+
+class _FftCorrelator:
+    """TM_CCOEFF_NORMED via DFT for one image, sharing its spectrum across templates.
+
+    The image is zero-padded to an optimal DFT size no smaller than itself, so
+    circular correlation equals linear correlation at every valid offset and
+    the frame spectrum does not depend on template size.
+    """
+
+    def __init__(self, stats: _FrameStats):
+        """Transform the image once; normalization reuses the frame statistics."""
+        self.stats = stats
+        h, w = stats.image.shape[:2]
+        self.height = h
+        self.width = w
+        self.dft_shape = (cv2.getOptimalDFTSize(h), cv2.getOptimalDFTSize(w))
+        padded = np.zeros(self.dft_shape, dtype=np.float32)
+        padded[:h, :w] = stats.image
+        self.spectrum = cv2.dft(padded)
+
+    def _template_spectrum(self, ref_entry: _TemplateCacheEntry):
+        """Return the cached (spectrum, norm) of the zero-mean coarse template."""
+        cached = ref_entry.coarse_spectra.get(self.dft_shape)
+        if cached is not None:
+            return cached
+        template = ref_entry.small_edge
+        padded = np.zeros(self.dft_shape, dtype=np.float32)
+        padded[:template.shape[0], :template.shape[1]] = template
+        padded[:template.shape[0], :template.shape[1]] -= ref_entry.small_mean
+        cached = (cv2.dft(padded), ref_entry.small_norm)
+        ref_entry.coarse_spectra[self.dft_shape] = cached
+        return cached
+
+    def match_group(
+        self,
+        group: _TemplateGroup,
+        workspace: "_Workspace | None" = None,
+    ) -> dict[str, tuple[float, tuple[int, int]]]:
+        """Score every template of a group against the shared frame spectrum.
+
+        Returns {reference name: (max score, (x, y))}, equivalent to running
+        cv2.minMaxLoc on each template's TM_CCOEFF_NORMED map. Everything stays
+        float32 and each template is correlated into the same two DFT-sized
+        buffers, so a group costs no per-template allocations.
+        """
+        th, tw = group.small_height, group.small_width
+        out_h, out_w = self.height - th + 1, self.width - tw + 1
+        workspace = workspace if workspace is not None else _Workspace()
+        product = workspace.get("atlas_product", self.dft_shape)
+        correlation = workspace.get("atlas_correlation", self.dft_shape)
+        scores = correlation[:out_h, :out_w]
+        _, inv_std = self.stats.window_stats(th, tw)
+        maxima = {}
+        for entry in group.entries:
+            spectrum, norm = self._template_spectrum(entry)
+            if norm < np.finfo(np.float32).eps:
+                # Mirrors OpenCV: a flat template correlates perfectly everywhere.
+                maxima[entry.name] = (1.0, (0, 0))
+                continue
+            cv2.mulSpectrums(self.spectrum, spectrum, 0, product, True)
+            cv2.idft(product, dst=correlation, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)
+            cv2.multiply(scores, inv_std, dst=scores, scale=1.0 / norm)
+            _, max_val, _, max_loc = cv2.minMaxLoc(scores)
+            maxima[entry.name] = (min(float(max_val), 1.0), max_loc)
+        return maxima
+
+    def match(self, ref_entry: _TemplateCacheEntry):
+        """Return a TM_CCOEFF_NORMED-equivalent float32 score map for the coarse template."""
+        th, tw = ref_entry.small_height, ref_entry.small_width
+        out_h, out_w = self.height - th + 1, self.width - tw + 1
+        spectrum, norm = self._template_spectrum(ref_entry)
+        product = cv2.mulSpectrums(self.spectrum, spectrum, 0, conjB=True)
+        numerator = cv2.idft(product, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)[:out_h, :out_w].copy()
+        return self.stats.normalize(numerator, 0.0, norm, th, tw)
+
+
+# =========================
+# Buffer workspace
+# =========================
+
+class _Workspace:
+    """Reusable OpenCV output buffers keyed by (tag, shape, dtype).
+
+    Every buffer is consumed before the same tag/shape is requested again within
+    a frame, so one buffer per key is enough. Results handed to callers outside
+    the detector (debug images, returned bboxes) never live here.
+    """
+
+    MAX_BUFFERS = 256
+
+    def __init__(self):
+        """Start with no buffers; they are created on first use of each shape."""
+        self._buffers: dict = {}
+
+    def get(self, tag: str, shape: tuple, dtype=np.float32):
+        """Return the buffer for tag/shape/dtype, allocating it once."""
+        key = (tag, shape, dtype)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            if len(self._buffers) >= self.MAX_BUFFERS:
+                self._buffers.clear()  # window shapes near borders vary; keep the cache bounded
+            buffer = self._buffers[key] = np.empty(shape, dtype=dtype)
+        return buffer
+
+
+def _match(image, template, workspace: _Workspace | None = None, tag: str = "match"):
+    """cv2.matchTemplate with _MATCH_METHOD, writing into a workspace buffer when given."""
+    if workspace is None:
+        return cv2.matchTemplate(image, template, _MATCH_METHOD)
+    shape = (image.shape[0] - template.shape[0] + 1, image.shape[1] - template.shape[1] + 1)
+    return cv2.matchTemplate(image, template, _MATCH_METHOD, result=workspace.get(tag, shape))
+
+
+def _canny(image, workspace: _Workspace | None = None, tag: str = "edges"):
+    """Frame Canny with the detector thresholds, into a workspace buffer when given."""
+    if workspace is None:
+        return cv2.Canny(image, 80, 160)
+    return cv2.Canny(image, 80, 160, edges=workspace.get(tag, image.shape[:2], np.uint8))
+
+
+def _resize_area(image, size: tuple[int, int], workspace: _Workspace | None = None, tag: str = "resize"):
+    """INTER_AREA resize to (width, height), into a workspace buffer when given."""
+    if workspace is None:
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    dst = workspace.get(tag, (size[1], size[0]) + image.shape[2:], image.dtype)
+    return cv2.resize(image, size, dst=dst, interpolation=cv2.INTER_AREA)
+
+
+# =========================
+# Template edge operator
+# =========================
+
+@dataclass(frozen=True)
+class EdgeOperator:
+    """Edge extraction applied to reference templates: optional Gaussian blur, then Canny."""
+    blur: int = 0
+    low: int = 80
+    high: int = 160
+
+    def apply(self, gray):
+        """Return the edge map of a gray image."""
+        if self.blur:
+            gray = cv2.GaussianBlur(gray, (self.blur, self.blur), 0)
+        return cv2.Canny(gray, self.low, self.high)
+
+
+DEFAULT_EDGE_OPERATOR = EdgeOperator()
+_TEMPLATE_EDGE_OPERATOR = DEFAULT_EDGE_OPERATOR
+# Candidate operators tried against FFmpeg's edgedetect (5x5 Gaussian + Sobel + hysteresis).
+_CALIBRATION_BLURS = (0, 3, 5)
+_CALIBRATION_LOWS = (10, 20, 30, 40, 60, 80)
+_CALIBRATION_RATIOS = (2.0, 2.5, 3.0)
+
+
+def _edge_agreement(candidate, reference) -> float:
+    """F1 score of two binary edge maps, allowing one pixel of positional slack."""
+    candidate = candidate > 0
+    reference = reference > 0
+    total = int(candidate.sum()) + int(reference.sum())
+    if total == 0:
+        return 1.0
+    kernel = np.ones((3, 3), np.uint8)
+    near_reference = cv2.dilate(reference.view(np.uint8), kernel) > 0
+    near_candidate = cv2.dilate(candidate.view(np.uint8), kernel) > 0
+    precision_hits = int(np.count_nonzero(candidate & near_reference))
+    recall_hits = int(np.count_nonzero(reference & near_candidate))
+    return (precision_hits + recall_hits) / total
+
+
+def calibrate_edge_operator(gray_frames, edge_frames) -> tuple[EdgeOperator, float]:
+    """Find the OpenCV operator that best reproduces externally computed edge maps.
+
+    gray_frames and edge_frames are paired canonical frames, e.g. the gray and
+    edgedetect planes of one FFmpeg capture. Returns (operator, mean F1).
+    """
+    pairs = list(zip(gray_frames, edge_frames))
+    if not pairs:
+        return DEFAULT_EDGE_OPERATOR, 0.0
+    best, best_score = DEFAULT_EDGE_OPERATOR, -1.0
+    for blur in _CALIBRATION_BLURS:
+        blurred = [cv2.GaussianBlur(gray, (blur, blur), 0) if blur else gray for gray, _ in pairs]
+        for low in _CALIBRATION_LOWS:
+            for ratio in _CALIBRATION_RATIOS:
+                high = int(round(low * ratio))
+                score = sum(
+                    _edge_agreement(cv2.Canny(gray, low, high), edges)
+                    for gray, (_, edges) in zip(blurred, pairs)
+                ) / len(pairs)
+                if score > best_score:
+                    best, best_score = EdgeOperator(blur, low, high), score
+    return best, best_score
+
+
+def get_template_edge_operator() -> EdgeOperator:
+    """Return the operator reference templates are currently extracted with."""
+    return _TEMPLATE_EDGE_OPERATOR
+
+
+def set_template_edge_operator(operator: EdgeOperator | None) -> None:
+    """Extract template edges with operator (None restores the default) and recompile plans."""
+    global _TEMPLATE_EDGE_OPERATOR
+    operator = operator or DEFAULT_EDGE_OPERATOR
+    if operator == _TEMPLATE_EDGE_OPERATOR:
+        return
+    _TEMPLATE_EDGE_OPERATOR = operator
+    invalidate_detection_plan()
+
+
+# =========================
+# Incremental edge maps
+# =========================
+
+_CANNY_PAD = 4  # context pixels around a recomputed region so Sobel/NMS see real neighbours
+
+
+class _EdgeCache:
+    """Previous frame and edge maps, updated tile by tile where pixels changed."""
+
+    def __init__(self, tile_size: int = EDGE_TILE_SIZE):
+        """Start empty; the first frame is always a full recompute."""
+        self.tile_size = max(8, int(tile_size))
+        self.gray = None
+        self.edges = None
+        self.small = None
+        self.coarse_scale = None
+
+    def _full(self, frame_gray, coarse_scale):
+        """Recompute both edge maps for the whole frame."""
+        self.gray = frame_gray.copy()
+        self.edges = cv2.Canny(frame_gray, 80, 160)
+        small_w = max(1, int(self.edges.shape[1] * coarse_scale))
+        small_h = max(1, int(self.edges.shape[0] * coarse_scale))
+        self.small = cv2.resize(self.edges, (small_w, small_h), interpolation=cv2.INTER_AREA)
+        self.coarse_scale = coarse_scale
+
+    def _dirty_rects(self, frame_gray):
+        """Return tile-aligned (x0, y0, x1, y1) boxes of changed tile clusters, halo included."""
+        tile = self.tile_size
+        h, w = frame_gray.shape[:2]
+        diff = cv2.absdiff(frame_gray, self.gray)
+        row_starts = np.arange(0, h, tile)
+        col_starts = np.arange(0, w, tile)
+        tile_max = np.maximum.reduceat(np.maximum.reduceat(diff, row_starts, axis=0), col_starts, axis=1)
+        dirty = (tile_max > 0).astype(np.uint8)
+        if not dirty.any():
+            return []
+        dirty = cv2.dilate(dirty, np.ones((3, 3), np.uint8))
+        count, _, boxes, _ = cv2.connectedComponentsWithStats(dirty, connectivity=8)
+        rects = []
+        for left, top, box_w, box_h, _ in boxes[1:count]:
+            rects.append(
+                (
+                    int(left) * tile,
+                    int(top) * tile,
+                    min(w, int(left + box_w) * tile),
+                    min(h, int(top + box_h) * tile),
+                )
+            )
+        return rects
+
+    def _coarse_rect_exact(self, rect, shape) -> bool:
+        """True when INTER_AREA of rect equals the matching slice of the full coarse resize."""
+        factor = round(1.0 / self.coarse_scale)
+        if factor < 1 or abs(factor * self.coarse_scale - 1.0) > 1e-9:
+            return False
+        h, w = shape[:2]
+        return all(value % factor == 0 for value in rect) and w % factor == 0 and h % factor == 0
+
+    def update(self, frame_gray, coarse_scale: float):
+        """Bring the edge maps up to date for frame_gray.
+
+        Returns (frame_e, frame_small, dirty) where dirty is None after a full
+        recompute, otherwise the (possibly empty) list of recomputed rects.
+        """
+        if (
+            self.gray is None
+            or self.gray.shape != frame_gray.shape
+            or self.coarse_scale != coarse_scale
+        ):
+            self._full(frame_gray, coarse_scale)
+            return self.edges, self.small, None
+
+        rects = self._dirty_rects(frame_gray)
+        h, w = frame_gray.shape[:2]
+        dirty_area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+        if dirty_area >= h * w:
+            self._full(frame_gray, coarse_scale)
+            return self.edges, self.small, None
+
+        coarse_exact = True
+        for x0, y0, x1, y1 in rects:
+            px0, py0 = max(0, x0 - _CANNY_PAD), max(0, y0 - _CANNY_PAD)
+            px1, py1 = min(w, x1 + _CANNY_PAD), min(h, y1 + _CANNY_PAD)
+            region = cv2.Canny(frame_gray[py0:py1, px0:px1], 80, 160)
+            self.edges[y0:y1, x0:x1] = region[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+            self.gray[y0:y1, x0:x1] = frame_gray[y0:y1, x0:x1]
+            coarse_exact = coarse_exact and self._coarse_rect_exact((x0, y0, x1, y1), frame_gray.shape)
+        if rects:
+            if coarse_exact:
+                for x0, y0, x1, y1 in rects:
+                    sx0, sy0 = int(x0 * coarse_scale), int(y0 * coarse_scale)
+                    sx1, sy1 = int(x1 * coarse_scale), int(y1 * coarse_scale)
+                    cv2.resize(
+                        self.edges[y0:y1, x0:x1],
+                        (sx1 - sx0, sy1 - sy0),
+                        dst=self.small[sy0:sy1, sx0:sx1],
+                        interpolation=cv2.INTER_AREA,
+                    )
+            else:
+                cv2.resize(self.edges, self.small.shape[1::-1], dst=self.small, interpolation=cv2.INTER_AREA)
+        return self.edges, self.small, rects
+
+
+def _dirty_windows(rects, scale: float, tw: int, th: int, width: int, height: int):
+    """Yield (x0, y0, x1, y1) search windows, at scale, of placements overlapping each dirty rect."""
+    for x0, y0, x1, y1 in rects:
+        yield (
+            max(0, int((x0 - tw) * scale)),
+            max(0, int((y0 - th) * scale)),
+            min(width, int((x1 + tw) * scale) + 1),
+            min(height, int((y1 + th) * scale) + 1),
+        )
+
+
+# =========================
+# Pyramid search
+# =========================
+
+class _FramePyramid:
+    """Per-frame edge pyramid; levels below the coarse frame are built on demand."""
+
+    def __init__(self, frame_e, frame_small, workspace: _Workspace | None = None):
+        """Seed levels 0 and 1 with the full-resolution and coarse edge maps."""
+        self._levels = [frame_e, frame_small]
+        self.workspace = workspace
+        self._lock = threading.Lock()
+
+    def level(self, index: int):
+        """Return the edge map for a pyramid level, running pyrDown as needed."""
+        if index < len(self._levels):
+            return self._levels[index]
+        with self._lock:
+            return self._build_to(index)
+
+    def _build_to(self, index: int):
+        """Extend the level list up to index; caller holds the lock."""
+        while len(self._levels) <= index:
+            src = self._levels[-1]
+            if self.workspace is None:
+                self._levels.append(cv2.pyrDown(src))
+            else:
+                shape = ((src.shape[0] + 1) // 2, (src.shape[1] + 1) // 2)
+                dst = self.workspace.get(f"pyramid{len(self._levels)}", shape, np.uint8)
+                self._levels.append(cv2.pyrDown(src, dst=dst))
+        return self._levels[index]
+
+
+def _pyramid_coarse_search(
+    ref_entry: _TemplateCacheEntry,
+    pyramid: _FramePyramid,
+    level_thresholds,
+    workspace: _Workspace | None = None,
 ):
-    """Return best matching reference and confidence score for a frame.
+    """Search from the template's top level down to level 1.
 
-    Coarse→fine strategy:
-    1) Run template matching on downscaled edge maps to quickly reject negatives.
-    2) Only for coarse candidates, run full-resolution matching in a local window.
+    Returns (score, location at level 1), with location None when the
+    candidate was rejected by a level threshold.
     """
-    edges_started = time.perf_counter()
-    # Compute frame edges once per frame for all templates.
-    frame_e = cv2.Canny(frame_gray, 80, 160)
-    small_w = max(1, int(frame_e.shape[1] * FRAME_COARSE_SCALE))
-    small_h = max(1, int(frame_e.shape[0] * FRAME_COARSE_SCALE))
-    frame_small = cv2.resize(frame_e, (small_w, small_h), interpolation=cv2.INTER_AREA)
-    refs_to_check = _get_profile_templates(profile_name, selected_reference)
+    top = ref_entry.top_level
+    frame_top = pyramid.level(top)
+    template = ref_entry.level_edge(top)
+    if template.shape[0] > frame_top.shape[0] or template.shape[1] > frame_top.shape[1]:
+        return 0.0, None
+    _, max_val, _, max_loc = cv2.minMaxLoc(_match(frame_top, template, workspace))
+    if max_val < level_thresholds[top]:
+        return max_val, None
+
+    for level in range(top - 1, 0, -1):
+        frame = pyramid.level(level)
+        template = ref_entry.level_edge(level)
+        th, tw = template.shape[:2]
+        x, y = max_loc[0] * 2, max_loc[1] * 2
+        x0 = max(0, x - PYRAMID_REFINE_MARGIN)
+        y0 = max(0, y - PYRAMID_REFINE_MARGIN)
+        x1 = min(frame.shape[1], x + tw + PYRAMID_REFINE_MARGIN)
+        y1 = min(frame.shape[0], y + th + PYRAMID_REFINE_MARGIN)
+        if (x1 - x0) < tw or (y1 - y0) < th:
+            return max_val, None
+        result = _match(frame[y0:y1, x0:x1], template, workspace)
+        _, max_val, _, local_loc = cv2.minMaxLoc(result)
+        max_loc = (x0 + local_loc[0], y0 + local_loc[1])
+        if max_val < level_thresholds[level]:
+            return max_val, None
+    return max_val, max_loc
+
+
+# =========================
+# Detection core
+# =========================
 
+class _FrameMatchContext:
+    """Per-frame inputs and lazily built shared matching state for one _find_best_match call."""
+
+    def __init__(self, plan: DetectionPlan, frame_e, frame_small, level_thresholds, size_classes,
+                 dirty_rects, active_reference, workspace):
+        """Capture the frame edge maps and thresholds shared by every reference."""
+        self.plan = plan
+        self.frame_e = frame_e
+        self.frame_small = frame_small
+        self.level_thresholds = level_thresholds
+        self.threshold, self.coarse_threshold = level_thresholds[0], level_thresholds[1]
+        self.size_classes = size_classes
+        self.fine_engine = _fine_engine()
+        self.dirty_rects = dirty_rects
+        self.active_reference = active_reference
+        self.workspace = workspace
+        self.coarse_maxima: dict[str, tuple[float, tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+        self._coarse_stats = None
+        self._coarse_fft = None
+        self._fine_stats = None
+        self._pyramid = None
+
+    def class_size(self, ref_entry: _TemplateCacheEntry) -> int:
+        """Number of checked references sharing this template's size."""
+        return self.size_classes.get((ref_entry.height, ref_entry.width), 1)
+
+    def coarse_stats(self) -> _FrameStats:
+        """Integral images of the coarse edge map."""
+        with self._lock:
+            if self._coarse_stats is None:
+                self._coarse_stats = _FrameStats(self.frame_small)
+            return self._coarse_stats
+
+    def coarse_fft(self) -> _FftCorrelator:
+        """FFT correlator over the coarse edge map."""
+        stats = self.coarse_stats()
+        with self._lock:
+            if self._coarse_fft is None:
+                self._coarse_fft = _FftCorrelator(stats)
+            return self._coarse_fft
+
+    def fine_stats(self) -> _FrameStats:
+        """Integral images of the full-resolution edge map."""
+        with self._lock:
+            if self._fine_stats is None:
+                self._fine_stats = _FrameStats(self.frame_e)
+            return self._fine_stats
+
+    def pyramid(self) -> _FramePyramid:
+        """Edge pyramid for templates searched below the coarse level."""
+        with self._lock:
+            if self._pyramid is None:
+                self._pyramid = _FramePyramid(self.frame_e, self.frame_small, self.workspace)
+            return self._pyramid
+
+
+def _match_shard(ctx: _FrameMatchContext, indexed_refs, workspace: _Workspace | None, early_return: bool = False):
+    """Run coarse→fine matching for (index, template) pairs.
+
+    Returns (best_index, best_ref, best_bbox, best_score, coarse_ms, fine_ms).
+    Ties keep the lowest index so sharded results merge like a serial pass.
+    With early_return, the first reference reaching the threshold wins.
+    """
+    frame_e, frame_small = ctx.frame_e, ctx.frame_small
+    coarse_scale = ctx.plan.coarse_scale
+    threshold, coarse_threshold = ctx.threshold, ctx.coarse_threshold
+    fw, fh = frame_e.shape[1], frame_e.shape[0]
+    best_index = None
     best_ref = None
     best_bbox = None
     best_score = 0.0
-    threshold = float(threshold_override) if threshold_override is not None else get_detection_threshold(profile_name)
-    coarse_threshold = max(COARSE_THRESHOLD_FLOOR, threshold * COARSE_THRESHOLD_FACTOR)
-    fw, fh = frame_e.shape[1], frame_e.shape[0]
     coarse_time_ms = 0.0
     fine_time_ms = 0.0
-    for ref_entry in refs_to_check:
+    for index, ref_entry in indexed_refs:
         tw, th = ref_entry.width, ref_entry.height
         if tw > fw or th > fh:
             continue
@@ -312,15 +969,50 @@ def _find_best_match(
         if ref_entry.small_width > frame_small.shape[1] or ref_entry.small_height > frame_small.shape[0]:
             continue
         coarse_started = time.perf_counter()
-        coarse_result = cv2.matchTemplate(frame_small, ref_entry.small_edge, _MATCH_METHOD)
-        coarse_time_ms += (time.perf_counter() - coarse_started) * 1000.0
-        _, coarse_max_val, _, coarse_max_loc = cv2.minMaxLoc(coarse_result)
+        coarse_engine = _coarse_engine(ctx.class_size(ref_entry))
+        if ctx.dirty_rects is not None and ref_entry.name != ctx.active_reference:
+            # Unchanged tiles cannot produce a new match for an inactive reference.
+            coarse_max_val, coarse_max_loc = -1.0, None
+            for sx0, sy0, sx1, sy1 in _dirty_windows(
+                ctx.dirty_rects, coarse_scale, tw, th, frame_small.shape[1], frame_small.shape[0]
+            ):
+                if (sx1 - sx0) < ref_entry.small_width or (sy1 - sy0) < ref_entry.small_height:
+                    continue
+                window_result = _match(frame_small[sy0:sy1, sx0:sx1], ref_entry.small_edge, workspace)
+                _, window_val, _, window_loc = cv2.minMaxLoc(window_result)
+                if window_val > coarse_max_val:
+                    coarse_max_val = window_val
+                    coarse_max_loc = (sx0 + window_loc[0], sy0 + window_loc[1])
+            coarse_time_ms += (time.perf_counter() - coarse_started) * 1000.0
+            if coarse_max_loc is None:
+                continue
+            coarse_result = None
+        elif ref_entry.top_level > 1:
+            coarse_max_val, coarse_max_loc = _pyramid_coarse_search(
+                ref_entry, ctx.pyramid(), ctx.level_thresholds, workspace
+            )
+            coarse_time_ms += (time.perf_counter() - coarse_started) * 1000.0
+            if coarse_max_loc is None:
+                continue
+            coarse_result = None
+        elif ref_entry.name in ctx.coarse_maxima:
+            coarse_max_val, coarse_max_loc = ctx.coarse_maxima[ref_entry.name]
+            coarse_result = None
+        elif coarse_engine == "spatial":
+            coarse_result = _match(frame_small, ref_entry.small_edge, workspace)
+        elif coarse_engine == "fft":
+            coarse_result = ctx.coarse_fft().match(ref_entry)
+        else:
+            coarse_result = _ncc_scores(ctx.coarse_stats(), ref_entry.small_edge, ref_entry.small_mean, ref_entry.small_norm)
+        if coarse_result is not None:
+            _, coarse_max_val, _, coarse_max_loc = cv2.minMaxLoc(coarse_result)
+            coarse_time_ms += (time.perf_counter() - coarse_started) * 1000.0
         if coarse_max_val < coarse_threshold:
             continue
 
         coarse_x, coarse_y = coarse_max_loc
-        full_x = int(coarse_x / FRAME_COARSE_SCALE)
-        full_y = int(coarse_y / FRAME_COARSE_SCALE)
+        full_x = int(coarse_x / coarse_scale)
+        full_y = int(coarse_y / coarse_scale)
         margin_x = max(8, tw // 2)
         margin_y = max(8, th // 2)
         roi_x0 = max(0, full_x - margin_x)
@@ -330,19 +1022,22 @@ def _find_best_match(
         if (roi_x1 - roi_x0) < tw or (roi_y1 - roi_y0) < th:
             continue
 
-        search_region = frame_e[roi_y0:roi_y1, roi_x0:roi_x1]
         fine_started = time.perf_counter()
-        result = cv2.matchTemplate(search_region, ref_entry.edge, _MATCH_METHOD)
+        if ctx.fine_engine == "ncc":
+            result = _ncc_scores(ctx.fine_stats(), ref_entry.edge, ref_entry.mean, ref_entry.norm, roi_y0, roi_y1, roi_x0, roi_x1)
+        else:
+            search_region = frame_e[roi_y0:roi_y1, roi_x0:roi_x1]
+            result = _match(search_region, ref_entry.edge, workspace)
         fine_time_ms += (time.perf_counter() - fine_started) * 1000.0
         _, max_val, _, max_loc = cv2.minMaxLoc(result)
-        if selected_reference and max_val >= threshold:
+        if early_return and max_val >= threshold:
             x = roi_x0 + max_loc[0]
             y = roi_y0 + max_loc[1]
             h, w = ref_entry.height, ref_entry.width
             GRID = 8
             x = (x // GRID) * GRID
             y = (y // GRID) * GRID
-            return ref_entry.name, (x, y, w, h), max_val
+            return index, ref_entry.name, (x, y, w, h), max_val, coarse_time_ms, fine_time_ms
 
         if max_val > best_score:
             x = roi_x0 + max_loc[0]
@@ -351,92 +1046,406 @@ def _find_best_match(
             GRID = 8
             x = (x // GRID) * GRID
             y = (y // GRID) * GRID
+            best_index = index
             best_ref = ref_entry.name
             best_bbox = (x, y, w, h)
             best_score = max_val
 
+    return best_index, best_ref, best_bbox, best_score, coarse_time_ms, fine_time_ms
+
+
+def _thread_workspace() -> _Workspace:
+    """Return the calling pool thread's private workspace."""
+    workspace = getattr(_MATCH_THREAD_STATE, "workspace", None)
+    if workspace is None:
+        workspace = _MATCH_THREAD_STATE.workspace = _Workspace()
+    return workspace
+
+
+def _match_shard_in_pool(ctx: _FrameMatchContext, indexed_refs):
+    """Pool entry point: match a shard with a thread-local workspace."""
+    return _match_shard(ctx, indexed_refs, _thread_workspace())
+
+
+def _match_pool() -> ThreadPoolExecutor:
+    """Return the shared reference-matching pool, created on first use."""
+    global _MATCH_POOL
+    with _MATCH_POOL_LOCK:
+        if _MATCH_POOL is None:
+            _MATCH_POOL = ThreadPoolExecutor(max_workers=MATCH_WORKERS, thread_name_prefix="detector-match")
+        return _MATCH_POOL
+
+
+_MATCH_POOL: ThreadPoolExecutor | None = None
+_MATCH_POOL_LOCK = threading.Lock()
+_MATCH_THREAD_STATE = threading.local()
+
+
+def _frame_edges(plan: DetectionPlan, frame_gray, edge_cache: _EdgeCache | None, workspace: _Workspace | None):
+    """Return (frame_e, frame_small, dirty_rects); dirty_rects is None unless edges were patched."""
+    coarse_scale = plan.coarse_scale
+    if edge_cache is not None:
+        return edge_cache.update(frame_gray, coarse_scale)
+    frame_e = _canny(frame_gray, workspace)
+    small_w = max(1, int(frame_e.shape[1] * coarse_scale))
+    small_h = max(1, int(frame_e.shape[0] * coarse_scale))
+    return frame_e, _resize_area(frame_e, (small_w, small_h), workspace, "edges_small"), None
+
+
+def _find_best_match(
+    plan: DetectionPlan,
+    frame_gray,
+    selected_reference: str | None = None,
+    threshold_override: float | None = None,
+    edge_cache: _EdgeCache | None = None,
+    active_reference: str | None = None,
+    workspace: _Workspace | None = None,
+    edges: tuple | None = None,
+):
+    """Return best matching reference and confidence score for a frame.
+
+    Coarse→fine strategy:
+    1) Run template matching on downscaled edge maps to quickly reject negatives.
+    2) Only for coarse candidates, run full-resolution matching in a local window.
+
+    With an edge_cache, edges are updated incrementally and references other than
+    active_reference are only searched where they would overlap changed tiles.
+    With DETECTOR_MATCH_WORKERS > 1, references are sharded across a thread pool.
+    Precomputed edges, as returned by _frame_edges, skip edge extraction.
+    """
+    edges_started = time.perf_counter()
+    # Compute frame edges once per frame for all templates.
+    if edges is None:
+        edges = _frame_edges(plan, frame_gray, edge_cache, workspace)
+    frame_e, frame_small, dirty_rects = edges
+    refs_to_check = plan.templates_for(selected_reference)
+
+    ctx = _FrameMatchContext(
+        plan,
+        frame_e,
+        frame_small,
+        plan.level_thresholds(threshold_override),
+        # A selected reference is checked alone, so it shares its size with nothing.
+        {} if selected_reference else plan.size_classes,
+        dirty_rects,
+        active_reference,
+        workspace,
+    )
+    coarse_time_ms = 0.0
+    if dirty_rects is None and not selected_reference and plan.atlas_groups and _atlas_enabled():
+        coarse_started = time.perf_counter()
+        for group in plan.atlas_groups:
+            if group.small_width > frame_small.shape[1] or group.small_height > frame_small.shape[0]:
+                continue
+            ctx.coarse_maxima.update(ctx.coarse_fft().match_group(group, workspace))
+        coarse_time_ms += (time.perf_counter() - coarse_started) * 1000.0
+
+    indexed_refs = list(enumerate(refs_to_check))
+    workers = min(MATCH_WORKERS, len(indexed_refs))
+    if selected_reference or workers <= 1:
+        shard_results = [_match_shard(ctx, indexed_refs, workspace, early_return=bool(selected_reference))]
+    else:
+        # Round-robin shards balance reference sizes; merge below is order-independent.
+        shards = [indexed_refs[offset::workers] for offset in range(workers)]
+        shard_results = list(_match_pool().map(lambda shard: _match_shard_in_pool(ctx, shard), shards))
+
+    best_index = None
+    best_ref = None
+    best_bbox = None
+    best_score = 0.0
+    fine_time_ms = 0.0
+    for index, ref_name, bbox, score, shard_coarse_ms, shard_fine_ms in shard_results:
+        coarse_time_ms += shard_coarse_ms
+        fine_time_ms += shard_fine_ms
+        if ref_name is None:
+            best_score = max(best_score, score)
+            continue
+        if score > best_score or (score == best_score and (best_index is None or index < best_index)):
+            best_index, best_ref, best_bbox, best_score = index, ref_name, bbox, score
+
     if ENABLE_DEBUG_LOGGING and LOGGER.isEnabledFor(logging.DEBUG):
         LOGGER.debug(
-            "Detector coarse/fine timings: total=%.2fms coarse=%.2fms fine=%.2fms refs=%d",
+            "Detector coarse/fine timings: total=%.2fms coarse=%.2fms fine=%.2fms refs=%d workers=%d",
             (time.perf_counter() - edges_started) * 1000.0,
             coarse_time_ms,
             fine_time_ms,
             len(refs_to_check),
+            max(1, workers),
         )
 
-    if best_ref and best_score >= threshold:
+    if best_ref and best_score >= ctx.threshold:
         return best_ref, best_bbox, best_score
 
     return None, None, best_score
 
 
-def evaluate_frame(
-    profile_name,
-    frame,
+def _track_last_match(
+    plan: DetectionPlan,
+    frame_gray,
     state: DetectorState,
-    selected_reference: str | None = None,
-    config: DetectionConfig | None = None,
-    sandbox_mode: bool = False,
+    selected_reference,
+    threshold,
+    frame_e=None,
 ):
-    """Evaluate a frame deterministically and return match metadata."""
-    if not profile_name or frame is None:
-        return DetectionResult(False, 0.0, None, time.time())
+    """Re-match tracked references in a window around their last bbox.
 
-    profile_valid = os.path.isdir(profile_path(profile_name))
+    Returns (ref_name, bbox, score) for the tracked reference with the best
+    local score at or above threshold (the active one wins ties), or None when
+    a full search is needed. When the frame's edge map is already known,
+    windows are sliced from frame_e.
+    """
+    if state.tracked_revision != plan.revision:
+        state.tracked_bboxes.clear()
+        state.tracked_revision = plan.revision
+        return None
+    if not state.tracked_bboxes:
+        return None
+
+    names = list(state.tracked_bboxes)
+    active = state.active_dialogue
+    if active in names:
+        names.remove(active)
+        names.insert(0, active)
+    fh, fw = frame_gray.shape[:2]
+    best = None
+    for name in names:
+        if selected_reference and name != selected_reference:
+            continue
+        ref_entry = plan.by_name.get(name)
+        if ref_entry is None:
+            state.tracked_bboxes.pop(name, None)
+            continue
+        bbox = state.tracked_bboxes.get(name)
+        if bbox is None:
+            # Cleared by the event-exit path, which may run on another pipeline stage.
+            continue
+        x, y, w, h = bbox
+        x0 = max(0, x - TRACKING_MARGIN)
+        y0 = max(0, y - TRACKING_MARGIN)
+        x1 = min(fw, x + w + TRACKING_MARGIN)
+        y1 = min(fh, y + h + TRACKING_MARGIN)
+        if (x1 - x0) < ref_entry.width or (y1 - y0) < ref_entry.height:
+            continue
+        if frame_e is not None:
+            window_e = frame_e[y0:y1, x0:x1]
+        else:
+            # Canny on a slightly padded crop so window edges match the full-frame edge map.
+            px0, py0 = max(0, x0 - 2), max(0, y0 - 2)
+            px1, py1 = min(fw, x1 + 2), min(fh, y1 + 2)
+            window_e = _canny(frame_gray[py0:py1, px0:px1], state.workspace, "tracking_edges")
+            window_e = window_e[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+        result = _match(window_e, ref_entry.edge, state.workspace)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val >= threshold and (best is None or max_val > best[2]):
+            GRID = 8
+            match_x = ((x0 + max_loc[0]) // GRID) * GRID
+            match_y = ((y0 + max_loc[1]) // GRID) * GRID
+            best = (name, (match_x, match_y, ref_entry.width, ref_entry.height), max_val)
+    return best
+
+
+@dataclass(frozen=True)
+class _FrameLayout:
+    """Where a prepared gray frame sits in canonical coordinates.
+
+    origin is the canonical position of the frame's top-left pixel (non-zero
+    when the capture already cropped to an ROI); crop is the (x, y, w, h)
+    region of the frame that is matched, or None for the whole frame.
+    """
+    origin: tuple[int, int] = (0, 0)
+    crop: tuple[int, int, int, int] | None = None
+
+    @property
+    def processed_origin(self) -> tuple[int, int]:
+        """Canonical position of the matched region's top-left pixel."""
+        if self.crop is None:
+            return self.origin
+        return self.origin[0] + self.crop[0], self.origin[1] + self.crop[1]
+
+    def processed(self, image):
+        """Return the matched region of image (a view)."""
+        if self.crop is None:
+            return image
+        x, y, w, h = self.crop
+        return image[y:y + h, x:x + w]
 
+
+_FULL_FRAME = _FrameLayout()
+
+
+@dataclass(frozen=True)
+class PreparedFrame:
+    """Output of the first pipeline stage: canonical gray frame, ROI view and edge maps."""
+    plan: DetectionPlan
+    frame_gray: object
+    processed: object
+    timestamp: float
+    edges: tuple | None = None
+    layout: _FrameLayout = _FULL_FRAME
+
+
+def _frame_layout(roi, region: tuple[int, int, int, int]) -> _FrameLayout:
+    """Layout matching roi inside a frame covering region, both in canonical coordinates."""
+    fx, fy, fw, fh = region
+    if roi is None:
+        return _FrameLayout((fx, fy))
+    rx, ry, rw, rh = roi
+    x0, y0 = max(rx, fx), max(ry, fy)
+    x1, y1 = min(rx + rw, fx + fw), min(ry + rh, fy + fh)
+    if x1 <= x0 or y1 <= y0:
+        # Profile ROI changed away from the captured region; search what was captured.
+        return _FrameLayout((fx, fy))
+    if (x0, y0, x1, y1) == (fx, fy, fx + fw, fy + fh):
+        return _FrameLayout((fx, fy))
+    return _FrameLayout((fx, fy), (x0 - fx, y0 - fy, x1 - x0, y1 - y0))
+
+
+def _frame_region(frame_roi) -> tuple[int, int, int, int]:
+    """Canonical region a capture frame covers: frame_roi, or the whole canonical frame."""
+    if frame_roi is None:
+        return 0, 0, CANONICAL_WIDTH, CANONICAL_HEIGHT
+    return tuple(int(value) for value in frame_roi)
+
+
+def _prepare_frame(plan: DetectionPlan, frame, workspace: _Workspace | None, frame_roi=None):
+    """Return (gray frame, processed ROI view, layout) for a capture frame.
+
+    frame_roi, when given, is the canonical (x, y, w, h) region the capture
+    already cropped the frame to (FFmpeg-side ROI crop).
+    """
     frame_gray = (
-        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        cv2.cvtColor(
+            frame,
+            cv2.COLOR_BGR2GRAY,
+            dst=workspace.get("gray", frame.shape[:2], np.uint8) if workspace is not None else None,
+        )
         if frame.ndim == 3 else frame
     )
 
-    now = time.time()
-    expected_h, expected_w = CANONICAL_HEIGHT, CANONICAL_WIDTH
+    region = _frame_region(frame_roi)
+    expected_w, expected_h = region[2], region[3]
     if frame_gray.shape[:2] != (expected_h, expected_w):
-        frame_gray = cv2.resize(frame_gray, (expected_w, expected_h), interpolation=cv2.INTER_AREA)
+        frame_gray = _resize_area(frame_gray, (expected_w, expected_h), workspace, "canonical")
 
     # ROI HOOK — crop here after canonical resize if ROI is configured
-    roi = None
-    try:
-        roi_x = storage.get_app_state(f"{profile_name}:roi_x")
-        roi_y = storage.get_app_state(f"{profile_name}:roi_y")
-        roi_w = storage.get_app_state(f"{profile_name}:roi_w")
-        roi_h = storage.get_app_state(f"{profile_name}:roi_h")
-        if None not in (roi_x, roi_y, roi_w, roi_h):
-            roi_x = int(roi_x)
-            roi_y = int(roi_y)
-            roi_w = int(roi_w)
-            roi_h = int(roi_h)
-            if roi_w >= 10 and roi_h >= 10:
-                x0 = max(0, min(roi_x, CANONICAL_WIDTH - 1))
-                y0 = max(0, min(roi_y, CANONICAL_HEIGHT - 1))
-                x1 = max(x0 + 1, min(roi_x + roi_w, CANONICAL_WIDTH))
-                y1 = max(y0 + 1, min(roi_y + roi_h, CANONICAL_HEIGHT))
-                clamped_w = x1 - x0
-                clamped_h = y1 - y0
-                if clamped_w >= 10 and clamped_h >= 10:
-                    roi = (x0, y0, clamped_w, clamped_h)
-    except Exception:
-        roi = None
-
-    processed_frame = frame_gray
-    if roi is not None:
-        roi_x, roi_y, roi_w, roi_h = roi
-        processed_frame = frame_gray[roi_y:roi_y + roi_h, roi_x:roi_x + roi_w]
-
+    layout = _frame_layout(plan.roi, region)
+    return frame_gray, layout.processed(frame_gray), layout
+
+
+def _precomputed_edges(
+    plan: DetectionPlan,
+    frame_edges,
+    frame_shape,
+    layout: _FrameLayout,
+    workspace: _Workspace | None,
+    frame_edges_small=None,
+) -> tuple:
+    """Crop an external edge map of the capture frame to the ROI and add its coarse level.
+
+    frame_edges_small, an external coarse level of the same edge map, replaces
+    the resize when it covers exactly the matched region at plan.coarse_scale.
+    """
+    if frame_edges.shape[:2] != tuple(frame_shape[:2]):
+        frame_edges = _resize_area(frame_edges, (frame_shape[1], frame_shape[0]), workspace, "canonical_edges")
+        frame_edges_small = None
+    if layout.crop is not None:
+        # A crop of the coarse plane is not the coarse level of the crop unless offsets align.
+        frame_edges_small = None
+    frame_edges = layout.processed(frame_edges)
+    small_w = max(1, int(frame_edges.shape[1] * plan.coarse_scale))
+    small_h = max(1, int(frame_edges.shape[0] * plan.coarse_scale))
+    if frame_edges_small is not None and frame_edges_small.shape[:2] == (small_h, small_w):
+        return frame_edges, frame_edges_small, None
+    return frame_edges, _resize_area(frame_edges, (small_w, small_h), workspace, "edges_small"), None
+
+
+def _state_edge_cache(state: DetectorState) -> _EdgeCache | None:
+    """Return the state's incremental edge cache, or None in full edge mode."""
+    if EDGE_MODE != "incremental":
+        return None
+    if state.edge_cache is None:
+        state.edge_cache = _EdgeCache()
+    return state.edge_cache
+
+
+def _match_frame(
+    plan: DetectionPlan,
+    processed_frame,
+    state: DetectorState,
+    selected_reference: str | None,
+    config: DetectionConfig | None,
+    edges: tuple | None = None,
+):
+    """Track or search the processed frame; returns (ref, bbox in ROI coordinates, score)."""
     match_started = time.perf_counter()
-    matched_ref, match_bbox, confidence = _find_best_match(
-        profile_name,
-        processed_frame,
-        selected_reference,
-        threshold_override=config.detection_threshold if config else None,
-    )
+    threshold_override = config.detection_threshold if config else None
+    tracked = None
+    if ENABLE_TRACKING:
+        tracked = _track_last_match(
+            plan,
+            processed_frame,
+            state,
+            selected_reference,
+            plan.thresholds(threshold_override)[0],
+            frame_e=edges[0] if edges is not None else None,
+        )
+    state.last_match_tracked = tracked is not None
+    if tracked is not None:
+        matched_ref, match_bbox, confidence = tracked
+    else:
+        matched_ref, match_bbox, confidence = _find_best_match(
+            plan,
+            processed_frame,
+            selected_reference,
+            threshold_override=threshold_override,
+            edge_cache=_state_edge_cache(state) if edges is None else None,
+            active_reference=state.active_dialogue,
+            workspace=state.workspace,
+            edges=edges,
+        )
+    if matched_ref is not None:
+        state.tracked_bboxes[matched_ref] = match_bbox
     state.last_match_time_ms = (time.perf_counter() - match_started) * 1000.0
     if ENABLE_DEBUG_LOGGING and LOGGER.isEnabledFor(logging.DEBUG):
         LOGGER.debug("Detector match time: %.2f ms", state.last_match_time_ms)
-    if match_bbox is not None and roi is not None:
-        roi_x, roi_y, _, _ = roi
+    return matched_ref, match_bbox, confidence
+
+
+def draw_debug_frame(frame_gray, bbox, roi=None, origin: tuple[int, int] = (0, 0)):
+    """Return a BGR copy of frame_gray with the ROI and the matched bbox drawn on it.
+
+    bbox and roi are canonical; origin is the canonical position of the
+    frame's top-left pixel (non-zero for ROI-cropped captures).
+    """
+    debug = cv2.cvtColor(frame_gray, cv2.COLOR_GRAY2BGR)
+    origin_x, origin_y = origin
+    if roi is not None:
+        roi_x, roi_y, roi_w, roi_h = roi
+        roi_x, roi_y = roi_x - origin_x, roi_y - origin_y
+        cv2.rectangle(debug, (roi_x, roi_y), (roi_x + roi_w, roi_y + roi_h), (96, 96, 96), 1)
+    x, y, w, h = bbox
+    x, y = x - origin_x, y - origin_y
+    cv2.rectangle(debug, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    return debug
+
+
+def _apply_match(
+    profile_name,
+    plan: DetectionPlan,
+    state: DetectorState,
+    frame_gray,
+    layout: _FrameLayout,
+    now: float,
+    match: tuple,
+    sandbox_mode: bool,
+):
+    """Update event state for one match outcome and build its DetectionResult."""
+    matched_ref, match_bbox, confidence = match
+    roi = plan.roi
+    if match_bbox is not None:
+        offset_x, offset_y = layout.processed_origin
         x, y, w, h = match_bbox
-        match_bbox = (x + roi_x, y + roi_y, w, h)
+        match_bbox = (x + offset_x, y + offset_y, w, h)
 
     if matched_ref is not None:
         state.last_seen_time = now
@@ -451,22 +1460,20 @@ def evaluate_frame(
         should_save_debug = False
         debug = None
         if event_start:
-            debug = cv2.cvtColor(frame_gray, cv2.COLOR_GRAY2BGR)
-            if roi is not None:
-                roi_x, roi_y, roi_w, roi_h = roi
-                cv2.rectangle(debug, (roi_x, roi_y), (roi_x + roi_w, roi_y + roi_h), (96, 96, 96), 1)
-            x, y, w, h = match_bbox
-            cv2.rectangle(debug, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-            if (not sandbox_mode) and (state.last_debug_frame is None or not _debug_images_similar(debug, state.last_debug_frame)):
+            debug = draw_debug_frame(frame_gray, match_bbox, roi, layout.origin)
+
+            debug_hash = None if sandbox_mode else _debug_hash(frame_gray)
+            debug_profile = profile_name if plan.profile_valid else None
+            if debug_hash is not None and not _is_duplicate_debug_capture(debug_profile, debug_hash):
                 debug_dir = get_debug_dir()
                 if debug_dir:
                     _save_debug_image_if_allowed(
                         debug_dir,
                         debug,
                         state,
-                        profile_name if profile_valid else None,
+                        debug_profile,
                         matched_ref,
+                        debug_hash,
                     )
                     should_save_debug = True
 
@@ -486,11 +1493,130 @@ def evaluate_frame(
     if state.active_dialogue and now - state.last_seen_time > EXIT_TIMEOUT:
         state.active_dialogue = None
         state.event_active = False
-        state.last_debug_frame = None
+        state.tracked_bboxes.clear()
 
     return DetectionResult(False, float(confidence), None, now)
 
 
+def evaluate_frame(
+    profile_name,
+    frame,
+    state: DetectorState,
+    selected_reference: str | None = None,
+    config: DetectionConfig | None = None,
+    sandbox_mode: bool = False,
+    frame_edges=None,
+    frame_roi=None,
+    frame_edges_small=None,
+):
+    """Evaluate a frame deterministically and return match metadata.
+
+    frame_edges, when given, is an edge map of the same frame computed
+    elsewhere (FFmpeg's edgedetect plane) and replaces the Canny pass;
+    frame_edges_small, its FRAME_COARSE_SCALE level, also replaces the
+    coarse resize.
+    frame_roi, when given, is the canonical (x, y, w, h) region the capture
+    already cropped the frame to; bboxes are still reported in canonical
+    coordinates.
+    """
+    if not profile_name or frame is None:
+        return DetectionResult(False, 0.0, None, time.time())
+
+    plan = get_detection_plan(profile_name)
+    if state.workspace is None:
+        state.workspace = _Workspace()
+    frame_gray, processed_frame, layout = _prepare_frame(plan, frame, state.workspace, frame_roi)
+    now = time.time()
+    edges = None
+    if frame_edges is not None:
+        edges = _precomputed_edges(
+            plan, frame_edges, frame_gray.shape, layout, state.workspace, frame_edges_small
+        )
+    match = _match_frame(plan, processed_frame, state, selected_reference, config, edges=edges)
+    return _apply_match(profile_name, plan, state, frame_gray, layout, now, match, sandbox_mode)
+
+
+# =========================
+# Staged evaluation
+# =========================
+#
+# evaluate_frame split into three calls so a pipeline can run them on separate
+# threads: prepare_frame (edges) for frame N+1 overlaps match_prepared for
+# frame N. Each stage must see frames in order, and only finalize_frame
+# touches the event fields of DetectorState.
+
+def prepare_frame(
+    profile_name,
+    frame,
+    state: DetectorState,
+    frame_edges=None,
+    frame_roi=None,
+    frame_edges_small=None,
+) -> PreparedFrame | None:
+    """Stage one: gray conversion, canonical resize, ROI crop and edge maps.
+
+    Outputs are freshly allocated because they outlive this call while the
+    next frame is being prepared. frame_edges, frame_roi and
+    frame_edges_small behave as in evaluate_frame.
+    """
+    if not profile_name or frame is None:
+        return None
+    plan = get_detection_plan(profile_name)
+    region = _frame_region(frame_roi)
+    if frame.ndim == 2 and frame.shape == (region[3], region[2]):
+        # The gray frame is used as-is and callers may recycle its buffer once this stage returns.
+        frame = frame.copy()
+    frame_gray, processed_frame, layout = _prepare_frame(plan, frame, None, frame_roi)
+    timestamp = time.time()
+    if frame_edges is not None:
+        frame_e, frame_small, dirty_rects = _precomputed_edges(
+            plan, frame_edges, frame_gray.shape, layout, None, frame_edges_small
+        )
+        # The edge planes share the caller's frame buffer.
+        frame_e = frame_e.copy()
+        if frame_small is frame_edges_small:
+            frame_small = frame_small.copy()
+    else:
+        edge_cache = _state_edge_cache(state)
+        frame_e, frame_small, dirty_rects = _frame_edges(plan, processed_frame, edge_cache, None)
+        if edge_cache is not None:
+            # Cached maps are patched in place by the next update.
+            frame_e, frame_small = frame_e.copy(), frame_small.copy()
+    return PreparedFrame(plan, frame_gray, processed_frame, timestamp, (frame_e, frame_small, dirty_rects), layout)
+
+
+def match_prepared(
+    prepared: PreparedFrame,
+    state: DetectorState,
+    selected_reference: str | None = None,
+    config: DetectionConfig | None = None,
+) -> tuple:
+    """Stage two: tracking or coarse→fine search on precomputed edges."""
+    if state.workspace is None:
+        state.workspace = _Workspace()
+    return _match_frame(prepared.plan, prepared.processed, state, selected_reference, config, edges=prepared.edges)
+
+
+def finalize_frame(
+    profile_name,
+    prepared: PreparedFrame,
+    match: tuple,
+    state: DetectorState,
+    sandbox_mode: bool = False,
+) -> DetectionResult:
+    """Stage three: event state update, debug capture and the DetectionResult."""
+    return _apply_match(
+        profile_name,
+        prepared.plan,
+        state,
+        prepared.frame_gray,
+        prepared.layout,
+        prepared.timestamp,
+        match,
+        sandbox_mode,
+    )
+
+
 def frame_comp_from_array(
     profile_name,
     frame,
@@ -537,10 +1663,10 @@ def frame_comp(profile_name, state=None):
 
 
 def _get_profile_templates(profile_name: str, selected_reference: str | None = None) -> list[_TemplateCacheEntry]:
-    """Execute  get profile templates.
-    
-    Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-    the behavior without duplicating logic.
+    """Load (or reuse) edge templates for a profile's references.
+
+    Scans the references directory, so it is only called when a detection plan
+    is compiled, never per frame.
     """
     references_dir = get_profile_dirs(profile_name)["references"]
     cache = _TEMPLATE_CACHE_BY_PROFILE.get(profile_name)
@@ -557,14 +1683,20 @@ def _get_profile_templates(profile_name: str, selected_reference: str | None = N
         signature.append((name, stat.st_size, stat.st_mtime_ns))
     signature_t = tuple(sorted(signature))
 
-    if cache is None or cache.references_dir != references_dir or cache.signature != signature_t:
+    edge_operator = _TEMPLATE_EDGE_OPERATOR
+    if (
+        cache is None
+        or cache.references_dir != references_dir
+        or cache.signature != signature_t
+        or cache.edge_operator != edge_operator
+    ):
         templates: list[_TemplateCacheEntry] = []
         for name, _, _ in signature_t:
             ref_path = os.path.join(references_dir, name)
             template = cv2.imread(ref_path, cv2.IMREAD_GRAYSCALE)
             if template is None:
                 continue
-            edge = cv2.Canny(template, 80, 160)
+            edge = edge_operator.apply(template)
             h, w = edge.shape[:2]
             small_w = max(1, int(w * FRAME_COARSE_SCALE))
             small_h = max(1, int(h * FRAME_COARSE_SCALE))
@@ -578,6 +1710,7 @@ def _get_profile_templates(profile_name: str, selected_reference: str | None = N
                     height=h,
                     small_width=small_w,
                     small_height=small_h,
+                    pyramid=_build_template_pyramid(small_edge),
                 )
             )
         cache = _ProfileTemplateCache(
@@ -585,6 +1718,8 @@ def _get_profile_templates(profile_name: str, selected_reference: str | None = N
             templates=templates,
             by_name={entry.name: entry for entry in templates},
             signature=signature_t,
+            groups=_group_templates(templates),
+            edge_operator=edge_operator,
         )
         _TEMPLATE_CACHE_BY_PROFILE[profile_name] = cache
 
@@ -594,3 +1729,122 @@ def _get_profile_templates(profile_name: str, selected_reference: str | None = N
             return []
         return [selected]
     return cache.templates
+
+
+def _build_template_pyramid(small_edge) -> tuple:
+    """Precompute pyrDown levels below the coarse template while it stays large enough."""
+    levels = []
+    current = small_edge
+    for _ in range(2, PYRAMID_MAX_LEVELS):
+        h, w = current.shape[:2]
+        if min((h + 1) // 2, (w + 1) // 2) < PYRAMID_MIN_TEMPLATE_SIDE:
+            break
+        current = cv2.pyrDown(current)
+        levels.append(current)
+    return tuple(levels)
+
+
+def _group_templates(templates: list[_TemplateCacheEntry]) -> tuple[_TemplateGroup, ...]:
+    """Bucket templates by (height, width), keeping reference order inside each bucket."""
+    buckets: dict[tuple[int, int], list[_TemplateCacheEntry]] = {}
+    for entry in templates:
+        buckets.setdefault((entry.height, entry.width), []).append(entry)
+    return tuple(
+        _TemplateGroup(
+            height=height,
+            width=width,
+            small_height=entries[0].small_height,
+            small_width=entries[0].small_width,
+            entries=tuple(entries),
+        )
+        for (height, width), entries in buckets.items()
+    )
+
+
+# =========================
+# Detection plans
+# =========================
+
+def _coarse_threshold_for(threshold: float) -> float:
+    """Derive the coarse-stage rejection threshold from the fine threshold."""
+    return max(COARSE_THRESHOLD_FLOOR, threshold * COARSE_THRESHOLD_FACTOR)
+
+
+def _level_thresholds(threshold: float, coarse_threshold: float) -> tuple[float, ...]:
+    """Relax the coarse threshold by PYRAMID_THRESHOLD_STEP for every level below 1."""
+    deeper = tuple(
+        max(0.0, coarse_threshold - PYRAMID_THRESHOLD_STEP * (level - 1))
+        for level in range(2, PYRAMID_MAX_LEVELS)
+    )
+    return (threshold, coarse_threshold) + deeper
+
+
+def _read_profile_roi(profile_name: str) -> tuple[int, int, int, int] | None:
+    """Read and clamp the profile ROI from app state; None when unset or invalid."""
+    try:
+        roi_x = storage.get_app_state(f"{profile_name}:roi_x")
+        roi_y = storage.get_app_state(f"{profile_name}:roi_y")
+        roi_w = storage.get_app_state(f"{profile_name}:roi_w")
+        roi_h = storage.get_app_state(f"{profile_name}:roi_h")
+        if None in (roi_x, roi_y, roi_w, roi_h):
+            return None
+        roi_x = int(roi_x)
+        roi_y = int(roi_y)
+        roi_w = int(roi_w)
+        roi_h = int(roi_h)
+        if roi_w < 10 or roi_h < 10:
+            return None
+        x0 = max(0, min(roi_x, CANONICAL_WIDTH - 1))
+        y0 = max(0, min(roi_y, CANONICAL_HEIGHT - 1))
+        x1 = max(x0 + 1, min(roi_x + roi_w, CANONICAL_WIDTH))
+        y1 = max(y0 + 1, min(roi_y + roi_h, CANONICAL_HEIGHT))
+        clamped_w = x1 - x0
+        clamped_h = y1 - y0
+        if clamped_w >= 10 and clamped_h >= 10:
+            return (x0, y0, clamped_w, clamped_h)
+    except Exception:
+        return None
+    return None
+
+
+def _compile_detection_plan(profile_name: str, revision: tuple[int, int]) -> DetectionPlan:
+    """Gather all SQLite/filesystem metadata needed for matching into one plan."""
+    # Checked before template loading: get_profile_dirs() creates the profile tree.
+    profile_valid = os.path.isdir(profile_path(profile_name))
+    threshold = get_detection_threshold(profile_name)
+    templates = tuple(_get_profile_templates(profile_name))
+    template_cache = _TEMPLATE_CACHE_BY_PROFILE.get(profile_name)
+    groups = template_cache.groups if template_cache is not None else ()
+    return DetectionPlan(
+        profile_name=profile_name,
+        revision=revision,
+        profile_valid=profile_valid,
+        roi=_read_profile_roi(profile_name),
+        threshold=threshold,
+        coarse_threshold=_coarse_threshold_for(threshold),
+        coarse_scale=FRAME_COARSE_SCALE,
+        templates=templates,
+        by_name=MappingProxyType({entry.name: entry for entry in templates}),
+        # Deeper-pyramid templates start below level 1, where the atlas does not apply.
+        atlas_groups=tuple(
+            group for group in groups
+            if len(group.entries) >= ATLAS_MIN_GROUP_SIZE and group.entries[0].top_level == 1
+        ),
+        size_classes=MappingProxyType({(group.height, group.width): len(group.entries) for group in groups}),
+    )
+
+
+def get_detection_plan(profile_name: str) -> DetectionPlan:
+    """Return the compiled plan for a profile, rebuilding only after invalidation."""
+    revision = storage.get_profile_revision(profile_name)
+    plan = _DETECTION_PLANS.get(profile_name)
+    if plan is None or plan.revision != revision:
+        # Revision is sampled before compiling so a concurrent change forces another rebuild.
+        plan = _compile_detection_plan(profile_name, revision)
+        _DETECTION_PLANS[profile_name] = plan
+    return plan
+
+
+def invalidate_detection_plan(profile_name: str | None = None) -> None:
+    """Force plan recompilation, e.g. after reference files change outside the app."""
+    storage.bump_profile_revision(profile_name)
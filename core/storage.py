@@ -10,6 +10,8 @@ from __future__ import annotations
 import contextlib
 import os
 import sqlite3
+import threading
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -20,6 +22,167 @@ def _db_path() -> Path:
     return Path(os.environ.get("APP_DB_PATH", Path("Data") / "app.db"))
 
 
+# In-memory revision counters for derived per-profile state (compiled detection
+# plans). Every write that changes profile settings, references or ROI keys
+# bumps the owning profile so hot paths can compare revisions instead of
+# re-reading SQLite/filesystem metadata. The counters are per process; the
+# detection worker process is kept in step over its control pipe.
+_REVISION_LOCK = threading.Lock()
+_PROFILE_REVISIONS: dict[str, int] = {}
+_GLOBAL_REVISION = 0
+
+
+def bump_profile_revision(profile_name: str | None = None) -> None:
+    """Invalidate derived state for one profile, or for all profiles when None."""
+    global _GLOBAL_REVISION
+    with _REVISION_LOCK:
+        if profile_name is None:
+            _GLOBAL_REVISION += 1
+        else:
+            _PROFILE_REVISIONS[profile_name] = _PROFILE_REVISIONS.get(profile_name, 0) + 1
+
+
+def get_profile_revision(profile_name: str) -> tuple[int, int]:
+    """Return the current (global, profile) revision pair without touching SQLite."""
+    return _GLOBAL_REVISION, _PROFILE_REVISIONS.get(profile_name, 0)
+
+
+def _profile_from_state_key(key: str) -> str | None:
+    """Return the profile owning a `{profile}:{setting}` app state key."""
+    profile_name, sep, _ = key.partition(":")
+    return profile_name if sep and profile_name else None
+
+
+# Running (count, bytes) totals of debug_entries, seeded from SQLite once per
+# database, adjusted by inserts/evictions and reseeded after deletions, so debug
+# writes never rescan the Debug directory. reconcile_debug_ledger() re-syncs with disk.
+_DEBUG_LEDGER_LOCK = threading.Lock()
+_DEBUG_LEDGER_DB: Path | None = None
+_DEBUG_LEDGER_COUNT = 0
+_DEBUG_LEDGER_BYTES = 0
+# Perceptual hashes of each profile's most recent debug captures, newest last,
+# keyed by profile name (None for captures without a profile). A profile's history
+# is loaded from its own rows on first use after the ledger is seeded; the debug
+# writer appends a hash once its image is written.
+DEBUG_HASH_HISTORY = 64
+_DEBUG_HASHES: dict[str | None, deque[int]] = {}
+# Bumped whenever this process reseeds the ledger (deletions, reconcile), so a
+# detection process can be told to reload its own copy.
+_DEBUG_LEDGER_GENERATION = 0
+
+
+def _seed_debug_ledger_locked() -> None:
+    """Load ledger totals from SQLite if they belong to another database."""
+    global _DEBUG_LEDGER_DB, _DEBUG_LEDGER_COUNT, _DEBUG_LEDGER_BYTES
+    db_path = _db_path()
+    if _DEBUG_LEDGER_DB == db_path:
+        return
+    init_db()
+    with connect() as conn:
+        row = conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM debug_entries").fetchone()
+    _DEBUG_LEDGER_COUNT, _DEBUG_LEDGER_BYTES = int(row[0]), int(row[1])
+    _DEBUG_HASHES.clear()
+    _DEBUG_LEDGER_DB = db_path
+
+
+def _debug_hashes_locked(profile_name: str | None) -> deque[int]:
+    """Return a profile's recent-hash history, loading it from its debug_entries rows once."""
+    _seed_debug_ledger_locked()
+    hashes = _DEBUG_HASHES.get(profile_name)
+    if hashes is not None:
+        return hashes
+    with connect() as conn:
+        if profile_name is None:
+            hash_rows = conn.execute(
+                "SELECT phash FROM debug_entries WHERE phash IS NOT NULL AND profile_id IS NULL"
+                " ORDER BY id DESC LIMIT ?",
+                (DEBUG_HASH_HISTORY,),
+            ).fetchall()
+        else:
+            hash_rows = conn.execute(
+                "SELECT d.phash FROM debug_entries d JOIN profiles p ON p.id = d.profile_id"
+                " WHERE p.name = ? AND d.phash IS NOT NULL ORDER BY d.id DESC LIMIT ?",
+                (profile_name, DEBUG_HASH_HISTORY),
+            ).fetchall()
+    hashes = deque(
+        (_from_sqlite_hash(hash_row["phash"]) for hash_row in reversed(hash_rows)),
+        maxlen=DEBUG_HASH_HISTORY,
+    )
+    _DEBUG_HASHES[profile_name] = hashes
+    return hashes
+
+
+def _to_sqlite_hash(phash: int | None) -> int | None:
+    """Map an unsigned 64-bit hash onto SQLite's signed INTEGER range."""
+    if phash is None:
+        return None
+    return phash - (1 << 64) if phash >= (1 << 63) else phash
+
+
+def _from_sqlite_hash(value: int) -> int:
+    """Inverse of _to_sqlite_hash."""
+    return value + (1 << 64) if value < 0 else value
+
+
+def _adjust_debug_ledger(count_delta: int, bytes_delta: int) -> None:
+    """Apply a debug_entries change to the running totals."""
+    global _DEBUG_LEDGER_COUNT, _DEBUG_LEDGER_BYTES
+    with _DEBUG_LEDGER_LOCK:
+        if _DEBUG_LEDGER_DB != _db_path():
+            return  # not seeded for this database yet; the next read seeds from SQLite
+        _DEBUG_LEDGER_COUNT = max(0, _DEBUG_LEDGER_COUNT + count_delta)
+        _DEBUG_LEDGER_BYTES = max(0, _DEBUG_LEDGER_BYTES + bytes_delta)
+
+
+def _reseed_debug_ledger() -> None:
+    """Force the next ledger read to reload totals and recent hashes from SQLite."""
+    global _DEBUG_LEDGER_DB, _DEBUG_LEDGER_GENERATION
+    with _DEBUG_LEDGER_LOCK:
+        _DEBUG_LEDGER_DB = None
+        _DEBUG_LEDGER_GENERATION += 1
+
+
+def reload_debug_ledger() -> None:
+    """Drop the cached ledger and hash index after another process wrote debug_entries."""
+    _reseed_debug_ledger()
+
+
+def get_debug_ledger_generation() -> int:
+    """Return a counter that changes whenever this process reseeds its ledger."""
+    return _DEBUG_LEDGER_GENERATION
+
+
+def get_debug_ledger() -> tuple[int, int]:
+    """Return (count, bytes) of recorded debug images without touching the filesystem."""
+    with _DEBUG_LEDGER_LOCK:
+        _seed_debug_ledger_locked()
+        return _DEBUG_LEDGER_COUNT, _DEBUG_LEDGER_BYTES
+
+
+def remember_debug_hash(profile_name: str | None, phash: int) -> None:
+    """Add a written capture's hash to its profile's recent-hash index."""
+    with _DEBUG_LEDGER_LOCK:
+        _debug_hashes_locked(profile_name).append(phash)
+
+
+def nearest_debug_hash_distance(profile_name: str | None, phash: int) -> int | None:
+    """Return the smallest Hamming distance from phash to a recent capture of the profile, or None if none."""
+    with _DEBUG_LEDGER_LOCK:
+        hashes = _debug_hashes_locked(profile_name)
+        if not hashes:
+            return None
+        return min((phash ^ known).bit_count() for known in hashes)
+
+
+def reconcile_debug_ledger() -> tuple[int, int]:
+    """Drop rows for missing files and reload ledger totals from SQLite."""
+    prune_missing_debug_entries()
+    _reseed_debug_ledger()
+    with _DEBUG_LEDGER_LOCK:
+        _seed_debug_ledger_locked()
+        return _DEBUG_LEDGER_COUNT, _DEBUG_LEDGER_BYTES
+
+
 @dataclass(frozen=True)
 class ProfileRecord:
     id: int
@@ -81,6 +244,14 @@ def init_db() -> None:
             );
             """
         )
+        debug_columns = {row["name"] for row in conn.execute("PRAGMA table_info(debug_entries)")}
+        if "phash" not in debug_columns:
+            try:
+                conn.execute("ALTER TABLE debug_entries ADD COLUMN phash INTEGER")
+            except sqlite3.OperationalError as exc:
+                # Another process may have migrated the table between PRAGMA and ALTER.
+                if "duplicate column" not in str(exc).lower():
+                    raise
 
 
 @contextlib.contextmanager
@@ -129,6 +300,7 @@ def create_profile(name: str) -> None:
             "INSERT INTO profiles (name, created_at) VALUES (?, ?)",
             (name, _now()),
         )
+    bump_profile_revision(name)
 
 
 def delete_profile(name: str) -> None:
@@ -136,6 +308,7 @@ def delete_profile(name: str) -> None:
     init_db()
     with connect() as conn:
         conn.execute("DELETE FROM profiles WHERE name = ?", (name,))
+    bump_profile_revision(name)
 
 
 def update_profile_fields(
@@ -170,6 +343,7 @@ def update_profile_fields(
             f"UPDATE profiles SET {', '.join(updates)} WHERE name = ?",
             values,
         )
+    bump_profile_revision(name)
 
 
 def add_frame(profile_name: str, name: str, path: str) -> None:
@@ -244,6 +418,7 @@ def add_reference(profile_name: str, name: str, path: str, frame_name: str | Non
             "INSERT INTO reference_entries (profile_id, frame_name, name, path, created_at) VALUES (?, ?, ?, ?, ?)",
             (profile.id, frame_name, name, path, _now()),
         )
+    bump_profile_revision(profile_name)
 
 
 def list_references(profile_name: str) -> list[str]:
@@ -282,6 +457,7 @@ def update_reference_path(profile_name: str, name: str, path: str) -> None:
             "UPDATE reference_entries SET path = ? WHERE profile_id = ? AND name = ?",
             (path, profile.id, name),
         )
+    bump_profile_revision(profile_name)
 
 
 def delete_reference(profile_name: str, name: str) -> None:
@@ -294,6 +470,7 @@ def delete_reference(profile_name: str, name: str) -> None:
             "DELETE FROM reference_entries WHERE profile_id = ? AND name = ?",
             (profile.id, name),
         )
+    bump_profile_revision(profile_name)
 
 
 def get_reference_parent_frame(profile_name: str, ref_name: str) -> str | None:
@@ -314,8 +491,9 @@ def add_debug_entry(
     reference_name: str | None,
     path: str,
     size_bytes: int,
+    phash: int | None = None,
 ) -> None:
-    """Insert debug metadata row."""
+    """Insert debug metadata row, with the capture's 64-bit perceptual hash when known."""
     profile_id = None
     if profile_name:
         profile = get_profile(profile_name)
@@ -323,10 +501,11 @@ def add_debug_entry(
             profile_id = profile.id
     with connect() as conn:
         conn.execute(
-            "INSERT INTO debug_entries (profile_id, reference_name, path, size_bytes, created_at)"
-            " VALUES (?, ?, ?, ?, ?)",
-            (profile_id, reference_name, path, size_bytes, _now()),
+            "INSERT INTO debug_entries (profile_id, reference_name, path, size_bytes, created_at, phash)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (profile_id, reference_name, path, size_bytes, _now(), _to_sqlite_hash(phash)),
         )
+    _adjust_debug_ledger(1, size_bytes)
 
 
 def list_debug_entries(profile_name: str | None) -> list[sqlite3.Row]:
@@ -350,14 +529,16 @@ def list_debug_entries(profile_name: str | None) -> list[sqlite3.Row]:
 def prune_missing_debug_entries() -> None:
     """Remove debug metadata rows for files that no longer exist on disk."""
     with connect() as conn:
-        rows = conn.execute("SELECT id, path FROM debug_entries").fetchall()
-        missing_ids = [row["id"] for row in rows if not os.path.isfile(row["path"])]
-        if not missing_ids:
+        rows = conn.execute("SELECT id, path, size_bytes FROM debug_entries").fetchall()
+        missing = [row for row in rows if not os.path.isfile(row["path"])]
+        if not missing:
             return
         conn.execute(
-            f"DELETE FROM debug_entries WHERE id IN ({','.join('?' for _ in missing_ids)})",
-            missing_ids,
+            f"DELETE FROM debug_entries WHERE id IN ({','.join('?' for _ in missing)})",
+            [row["id"] for row in missing],
         )
+    # Deleted captures must stop suppressing new ones; reload totals and hashes.
+    _reseed_debug_ledger()
 
 
 def sync_debug_entries_with_filesystem() -> None:
@@ -375,11 +556,17 @@ def delete_debug_entries(ids: Iterable[int]) -> None:
             f"DELETE FROM debug_entries WHERE id IN ({','.join('?' for _ in id_list)})",
             id_list,
         )
+    # Deleted captures must stop suppressing new ones; reload totals and hashes.
+    _reseed_debug_ledger()
 
 
 def prune_debug_entries(max_bytes: int, max_count: int) -> list[str]:
     """Evict oldest debug entries to enforce size/count bounds. Returns removed file paths."""
     removed_paths: list[str] = []
+    count, total = get_debug_ledger()
+    if total <= max_bytes and count <= max_count:
+        return removed_paths
+    removed_bytes = 0
     with connect() as conn:
         rows = conn.execute(
             "SELECT id, path, size_bytes FROM debug_entries ORDER BY created_at ASC"
@@ -389,7 +576,9 @@ def prune_debug_entries(max_bytes: int, max_count: int) -> list[str]:
             row = rows.pop(0)
             removed_paths.append(row["path"])
             total_bytes -= row["size_bytes"]
+            removed_bytes += row["size_bytes"]
             conn.execute("DELETE FROM debug_entries WHERE id = ?", (row["id"],))
+    _adjust_debug_ledger(-len(removed_paths), -removed_bytes)
     return removed_paths
 
 
@@ -405,6 +594,9 @@ def set_app_state(key: str, value: str | None) -> None:
                 " ON CONFLICT(key) DO UPDATE SET value = excluded.value",
                 (key, value),
             )
+    profile_name = _profile_from_state_key(key)
+    if profile_name:
+        bump_profile_revision(profile_name)
 
 
 def get_app_state(key: str) -> str | None:
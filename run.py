@@ -1,4 +1,8 @@
+import multiprocessing
+
 from app.main import main
 
 if __name__ == "__main__":
+    # Frozen builds re-enter here when spawning the detector worker process.
+    multiprocessing.freeze_support()
     main()
@@ -116,3 +116,749 @@ class DetectionTests(unittest.TestCase):
         self.assertFalse(result3.event_start)
         self.assertIsNotNone(result3.debug_frame)
         self.assertEqual(save_mock.call_count, 2)
+
+    def test_detection_plan_reused_until_profile_changes(self):
+        """Compiled plan avoids per-frame metadata I/O and rebuilds on profile edits."""
+        import cv2
+        from core import detector
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.5)
+        dirs = profiles.get_profile_dirs("Delta")
+
+        frame = np.zeros((64, 64, 3), dtype=np.uint8)
+        frame[16:32, 16:32] = 255
+        ref_path = Path(dirs["references"]) / "ref_1.png"
+        cv2.imwrite(str(ref_path), frame[16:32, 16:32].copy())
+        storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+
+        plan = detector.get_detection_plan("Delta")
+        self.assertEqual(plan.threshold, 0.5)
+        self.assertEqual([entry.name for entry in plan.templates], ["ref_1.png"])
+
+        state = detector.new_detector_state()
+        with (
+            mock.patch.object(detector.storage, "get_app_state") as app_state_mock,
+            mock.patch.object(detector, "get_detection_threshold") as threshold_mock,
+            mock.patch.object(detector.os, "listdir") as listdir_mock,
+            mock.patch.object(detector, "_save_debug_image_if_allowed"),
+        ):
+            detector.evaluate_frame("Delta", frame, state, selected_reference="ref_1.png")
+            detector.evaluate_frame("Delta", frame, state, selected_reference="ref_1.png")
+        app_state_mock.assert_not_called()
+        threshold_mock.assert_not_called()
+        listdir_mock.assert_not_called()
+        self.assertIs(detector.get_detection_plan("Delta"), plan)
+
+        profiles.update_profile_detection_threshold("Delta", 0.8)
+        storage.set_app_state("Delta:roi_x", "4")
+        storage.set_app_state("Delta:roi_y", "4")
+        storage.set_app_state("Delta:roi_w", "40")
+        storage.set_app_state("Delta:roi_h", "40")
+        rebuilt = detector.get_detection_plan("Delta")
+        self.assertIsNot(rebuilt, plan)
+        self.assertEqual(rebuilt.threshold, 0.8)
+        self.assertEqual(rebuilt.roi, (4, 4, 40, 40))
+
+    def test_fft_engine_matches_opencv_ccoeff_normed(self):
+        """FFT coarse scores agree with cv2.matchTemplate TM_CCOEFF_NORMED."""
+        import cv2
+        from core import detector
+
+        rng = np.random.default_rng(7)
+        noise = cv2.GaussianBlur(rng.integers(0, 255, (270, 480), dtype=np.uint8), (9, 9), 3)
+        image = cv2.Canny(noise, 20, 40)
+        image[200:, :] = 0  # flat region exercises the zero-variance cutoff
+        correlator = detector._FftCorrelator(detector._FrameStats(image))
+        for th, tw in ((12, 12), (60, 120)):
+            template = image[20:20 + th, 30:30 + tw].copy()
+            entry = detector._TemplateCacheEntry("ref.png", template, template, tw, th, tw, th)
+            expected = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+            actual = correlator.match(entry)
+            self.assertEqual(actual.shape, expected.shape)
+            self.assertLess(float(np.abs(actual - expected).max()), 1e-4)
+            self.assertIn(correlator.dft_shape, entry.coarse_spectra)
+
+    def test_shared_ncc_matches_opencv_for_frames_and_windows(self):
+        """Shared-integral NCC agrees with TM_CCOEFF_NORMED on full frames and sub-windows."""
+        import cv2
+        from core import detector
+
+        rng = np.random.default_rng(11)
+        noise = cv2.GaussianBlur(rng.integers(0, 255, (270, 480), dtype=np.uint8), (9, 9), 3)
+        image = cv2.Canny(noise, 20, 40)
+        stats = detector._FrameStats(image)
+        template = image[40:64, 50:90].copy()
+        mean, norm = detector._template_stats(template)
+
+        expected = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        actual = detector._ncc_scores(stats, template, mean, norm)
+        self.assertLess(float(np.abs(actual - expected).max()), 1e-4)
+
+        window = image[30:90, 40:120]
+        expected_window = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+        actual_window = detector._ncc_scores(detector._FrameStats(image), template, mean, norm, 30, 90, 40, 120)
+        self.assertLess(float(np.abs(actual_window - expected_window).max()), 1e-4)
+
+    def test_auto_engine_uses_shared_ncc_only_for_shared_template_sizes(self):
+        """Shared NCC is chosen per size class, never for references whose size nobody else has."""
+        import cv2
+        from core import detector
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.9)
+        dirs = profiles.get_profile_dirs("Delta")
+        rng = np.random.default_rng(13)
+        sizes = [(40, 80)] * 3 + [(44, 88), (52, 100)]
+        for index, (h, w) in enumerate(sizes):
+            patch = cv2.GaussianBlur(rng.integers(0, 255, (h, w), dtype=np.uint8), (5, 5), 1)
+            ref_path = Path(dirs["references"]) / f"ref_{index}.png"
+            cv2.imwrite(str(ref_path), patch)
+            storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+        plan = detector.get_detection_plan("Delta")
+        self.assertEqual(dict(plan.size_classes), {(40, 80): 3, (44, 88): 1, (52, 100): 1})
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3)
+
+        with (
+            mock.patch.object(detector, "MATCH_ENGINE", "auto"),
+            mock.patch.object(detector, "NCC_MIN_REFERENCES", 3),
+            mock.patch.object(detector, "_ncc_scores", wraps=detector._ncc_scores) as ncc,
+        ):
+            detector._find_best_match(plan, frame)
+            shared_sizes = {call.args[1].shape for call in ncc.call_args_list}
+            self.assertEqual(ncc.call_count, 3)
+            self.assertEqual(shared_sizes, {plan.by_name["ref_0.png"].small_edge.shape})
+            ncc.reset_mock()
+            detector._find_best_match(plan, frame, selected_reference="ref_0.png")
+            ncc.assert_not_called()
+
+    def test_atlas_group_maxima_match_per_template_search(self):
+        """Batched same-size group scoring yields the per-template minMaxLoc maxima."""
+        import cv2
+        from core import detector
+
+        rng = np.random.default_rng(5)
+        noise = cv2.GaussianBlur(rng.integers(0, 255, (270, 480), dtype=np.uint8), (9, 9), 3)
+        image = cv2.Canny(noise, 20, 40)
+        entries = []
+        for index, (y, x) in enumerate(((10, 20), (60, 200), (150, 300), (200, 40))):
+            template = image[y:y + 20, x:x + 36].copy()
+            entries.append(detector._TemplateCacheEntry(f"ref_{index}.png", template, template, 36, 20, 36, 20))
+        groups = detector._group_templates(entries)
+        self.assertEqual(len(groups), 1)
+
+        correlator = detector._FftCorrelator(detector._FrameStats(image))
+        workspace = detector._Workspace()
+        maxima = correlator.match_group(groups[0], workspace)
+        buffers = dict(workspace._buffers)
+        self.assertEqual({key[2] for key in buffers}, {np.float32})
+        self.assertEqual(correlator.match_group(groups[0], workspace), maxima)
+        self.assertEqual(workspace._buffers.keys(), buffers.keys())
+        self.assertTrue(all(workspace._buffers[key] is buffer for key, buffer in buffers.items()))
+        for entry in entries:
+            _, expected_val, _, expected_loc = cv2.minMaxLoc(
+                cv2.matchTemplate(image, entry.small_edge, cv2.TM_CCOEFF_NORMED)
+            )
+            actual_val, actual_loc = maxima[entry.name]
+            self.assertAlmostEqual(actual_val, expected_val, places=4)
+            self.assertEqual(actual_loc, expected_loc)
+
+    def test_pyramid_search_finds_large_template_from_top_level(self):
+        """Large templates start at a deeper pyramid level and still land on the true match."""
+        import cv2
+        from core import detector
+
+        rng = np.random.default_rng(11)
+        noise = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (7, 7), 2)
+        frame_e = cv2.Canny(noise, 20, 40)
+        edge = frame_e[200:328, 400:592].copy()
+        scale = detector.FRAME_COARSE_SCALE
+        small_edge = cv2.resize(edge, (int(192 * scale), int(128 * scale)), interpolation=cv2.INTER_AREA)
+        levels = mock.patch.object(detector, "PYRAMID_MAX_LEVELS", 4)
+        levels.start()
+        self.addCleanup(levels.stop)
+        entry = detector._TemplateCacheEntry(
+            "big.png", edge, small_edge, 192, 128, small_edge.shape[1], small_edge.shape[0],
+            pyramid=detector._build_template_pyramid(small_edge),
+        )
+        self.assertGreater(entry.top_level, 1)
+
+        frame_small = cv2.resize(
+            frame_e, (int(960 * scale), int(540 * scale)), interpolation=cv2.INTER_AREA
+        )
+        pyramid = detector._FramePyramid(frame_e, frame_small)
+        thresholds = detector._level_thresholds(0.5, 0.3)
+        score, location = detector._pyramid_coarse_search(entry, pyramid, thresholds)
+        self.assertIsNotNone(location)
+        self.assertGreaterEqual(score, 0.3)
+        self.assertLessEqual(abs(location[0] - int(400 * scale)), 2)
+        self.assertLessEqual(abs(location[1] - int(200 * scale)), 2)
+
+    def test_pyramid_search_matches_flat_search_results(self):
+        """Opting into deeper pyramid levels reports the flat search's matches on dialogue-sized templates."""
+        import cv2
+        from core import detector
+
+        rng = np.random.default_rng(17)
+        patches = [
+            cv2.GaussianBlur(rng.integers(0, 255, (96, 192), dtype=np.uint8), (5, 5), 1) for _ in range(3)
+        ]
+        for name in ("Flat", "Pyramid"):
+            profiles.create_profile(name)
+            profiles.update_profile_detection_threshold(name, 0.6)
+            dirs = profiles.get_profile_dirs(name)
+            for index, patch in enumerate(patches, start=1):
+                ref_path = Path(dirs["references"]) / f"ref_{index}.png"
+                cv2.imwrite(str(ref_path), patch)
+                storage.add_reference(name, ref_path.name, str(ref_path), None)
+
+        frames = []
+        for index, (y, x) in enumerate(((40, 60), (300, 500), (200, 700))):
+            frame = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3)
+            frame[y:y + 96, x:x + 192] = patches[index]
+            frames.append(frame)
+        frames.append(cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3))
+
+        def run(profile):
+            return [
+                detector.evaluate_frame(profile, frame, detector.new_detector_state(), sandbox_mode=True)
+                for frame in frames
+            ]
+
+        flat = run("Flat")
+        self.assertTrue(all(entry.top_level == 1 for entry in detector.get_detection_plan("Flat").templates))
+        with mock.patch.object(detector, "PYRAMID_MAX_LEVELS", 4):
+            deep = run("Pyramid")
+            self.assertTrue(all(entry.top_level > 1 for entry in detector.get_detection_plan("Pyramid").templates))
+        self.assertEqual([r.matched for r in flat], [True, True, True, False])
+        for flat_result, deep_result in zip(flat, deep):
+            self.assertEqual(
+                (deep_result.matched, deep_result.reference, deep_result.bbox),
+                (flat_result.matched, flat_result.reference, flat_result.bbox),
+            )
+            if flat_result.matched:
+                self.assertAlmostEqual(deep_result.confidence, flat_result.confidence, places=4)
+
+    def test_tracking_rechecks_last_bbox_before_full_search(self):
+        """A repeated match is confirmed locally; a moved dialogue falls back to the full search."""
+        import cv2
+        from core import detector
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.6)
+        dirs = profiles.get_profile_dirs("Delta")
+
+        rng = np.random.default_rng(3)
+        patch = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        frame = np.zeros((540, 960), dtype=np.uint8)
+        frame[200:248, 400:496] = patch
+        ref_path = Path(dirs["references"]) / "ref_1.png"
+        cv2.imwrite(str(ref_path), patch)
+        storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+
+        state = detector.new_detector_state()
+        tracking = mock.patch.object(detector, "ENABLE_TRACKING", True)
+        tracking.start()
+        self.addCleanup(tracking.stop)
+        first = detector.evaluate_frame("Delta", frame, state, sandbox_mode=True)
+        self.assertTrue(first.matched)
+        self.assertFalse(state.last_match_tracked)
+
+        with mock.patch.object(detector, "_find_best_match", wraps=detector._find_best_match) as full_search:
+            second = detector.evaluate_frame("Delta", frame, state, sandbox_mode=True)
+            full_search.assert_not_called()
+            self.assertTrue(state.last_match_tracked)
+            self.assertEqual(second.bbox, first.bbox)
+
+            moved = np.zeros_like(frame)
+            moved[40:88, 120:216] = patch
+            third = detector.evaluate_frame("Delta", moved, state, sandbox_mode=True)
+            full_search.assert_called_once()
+        self.assertTrue(third.matched)
+        self.assertFalse(state.last_match_tracked)
+        self.assertEqual(state.tracked_bboxes["ref_1.png"], third.bbox)
+
+    def test_tracking_prefers_best_overlapping_reference(self):
+        """With two tracked references at one bbox, tracking reports the better score, like the full search."""
+        import cv2
+        from core import detector
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.5)
+        dirs = profiles.get_profile_dirs("Delta")
+
+        rng = np.random.default_rng(7)
+        patch_a = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        # Same dialogue box, different text: ref_a still clears the threshold on ref_b's screen.
+        patch_b = patch_a.copy()
+        patch_b[:, 60:] = cv2.GaussianBlur(rng.integers(0, 255, (48, 36), dtype=np.uint8), (5, 5), 1)
+        for name, patch in (("ref_a.png", patch_a), ("ref_b.png", patch_b)):
+            ref_path = Path(dirs["references"]) / name
+            cv2.imwrite(str(ref_path), patch)
+            storage.add_reference("Delta", name, str(ref_path), None)
+        frame_a = np.zeros((540, 960), dtype=np.uint8)
+        frame_a[200:248, 400:496] = patch_a
+        frame_b = np.zeros_like(frame_a)
+        frame_b[200:248, 400:496] = patch_b
+
+        full = detector.evaluate_frame("Delta", frame_b, detector.new_detector_state(), sandbox_mode=True)
+        self.assertEqual(full.reference, "ref_b.png")
+
+        state = detector.new_detector_state()
+        with mock.patch.object(detector, "ENABLE_TRACKING", True):
+            detector.evaluate_frame("Delta", frame_b, state, selected_reference="ref_b.png", sandbox_mode=True)
+            detector.evaluate_frame("Delta", frame_a, state, selected_reference="ref_a.png", sandbox_mode=True)
+            self.assertEqual(set(state.tracked_bboxes), {"ref_a.png", "ref_b.png"})
+            self.assertEqual(state.active_dialogue, "ref_a.png")
+            with mock.patch.object(detector, "_find_best_match", wraps=detector._find_best_match) as full_search:
+                tracked = detector.evaluate_frame("Delta", frame_b, state, sandbox_mode=True)
+                full_search.assert_not_called()
+        self.assertTrue(state.last_match_tracked)
+        self.assertEqual((tracked.reference, tracked.bbox), (full.reference, full.bbox))
+        self.assertAlmostEqual(tracked.confidence, full.confidence, places=4)
+
+    def test_incremental_edges_track_full_recompute_and_find_new_match(self):
+        """Tile-incremental edge maps stay in sync and new matches in dirty tiles are found."""
+        import cv2
+        from core import detector
+
+        rng = np.random.default_rng(9)
+        background = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3)
+        patch = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        edge = cv2.Canny(patch, 80, 160)
+        small = cv2.resize(edge, (48, 24), interpolation=cv2.INTER_AREA)
+        entry = detector._TemplateCacheEntry("ref_1.png", edge, small, 96, 48, 48, 24)
+        plan = detector.DetectionPlan(
+            profile_name="Delta",
+            revision=(0, 0),
+            profile_valid=True,
+            roi=None,
+            threshold=0.5,
+            coarse_threshold=detector._coarse_threshold_for(0.5),
+            coarse_scale=0.5,
+            templates=(entry,),
+            by_name={entry.name: entry},
+            atlas_groups=(),
+        )
+        cache = detector._EdgeCache(tile_size=64)
+        self.assertIsNone(detector._find_best_match(plan, background, edge_cache=cache)[0])
+
+        with mock.patch.object(detector.cv2, "matchTemplate", wraps=cv2.matchTemplate) as match_mock:
+            detector._find_best_match(plan, background, edge_cache=cache)
+        match_mock.assert_not_called()
+
+        frame = background.copy()
+        frame[256:304, 512:608] = patch
+        name, bbox, _ = detector._find_best_match(plan, frame, edge_cache=cache)
+        self.assertEqual(name, "ref_1.png")
+        self.assertEqual(bbox[:2], (512, 256))
+
+        full_edges = cv2.Canny(frame, 80, 160)
+        mismatch = np.count_nonzero(cache.edges != full_edges) / full_edges.size
+        self.assertLess(mismatch, 0.001)
+        expected_small = cv2.resize(cache.edges, (480, 270), interpolation=cv2.INTER_AREA)
+        np.testing.assert_array_equal(cache.small, expected_small)
+
+    def test_debug_writer_persists_in_background_and_drops_oldest(self):
+        """Debug writes happen off-thread, are recorded in storage, and overflow drops the oldest job."""
+        import threading
+
+        from core import debug_writer
+
+        storage.init_db()
+        debug_dir = Path(self.temp_dir.name) / "Data" / "Debug"
+        debug_dir.mkdir(parents=True, exist_ok=True)
+        image = np.zeros((54, 96, 3), dtype=np.uint8)
+        writer = debug_writer.DebugImageWriter(1_000_000, 100, maxsize=2)
+
+        started = threading.Event()
+        gate = threading.Event()
+        original_write = writer._write
+
+        def blocked_write(job):
+            started.set()
+            gate.wait(5)
+            return original_write(job)
+
+        hashes = [0x0F0F_0F0F_0F0F_0F0F, 0xF0F0_F0F0_F0F0_F0F0, 0x00FF_00FF_00FF_00FF, 0xFF00_FF00_FF00_FF00]
+        with mock.patch.object(writer, "_write", side_effect=blocked_write):
+            paths = [str(debug_dir / f"match_{index}.png") for index in range(4)]
+            writer.submit(debug_writer.DebugWriteJob(paths[0], image, None, "ref_1.png", phash=hashes[0]))
+            self.assertTrue(started.wait(5))
+            for path, phash in zip(paths[1:], hashes[1:]):
+                writer.submit(debug_writer.DebugWriteJob(path, image, None, "ref_1.png", phash=phash))
+            self.assertEqual(writer.stats()["debug_writes_dropped"], 1)
+            # Queued captures do not enter the dedup index until they are written.
+            self.assertIsNone(storage.nearest_debug_hash_distance(None, hashes[3]))
+            gate.set()
+            self.assertTrue(writer.flush(timeout=5))
+        writer.stop(timeout=5)
+
+        written = sorted(row["path"] for row in storage.list_debug_entries(None))
+        self.assertEqual(written, [paths[0], paths[2], paths[3]])
+        for phash in (hashes[0], hashes[2], hashes[3]):
+            self.assertEqual(storage.nearest_debug_hash_distance(None, phash), 0)
+        self.assertNotEqual(storage.nearest_debug_hash_distance(None, hashes[1]), 0)
+        self.assertFalse(os.path.exists(paths[1]))
+        self.assertEqual(writer.stats()["debug_queue_depth"], 0)
+
+    def test_debug_writer_reconciles_ledger_while_queue_stays_busy(self):
+        """A writer that never goes idle still reconciles the ledger once the interval has passed."""
+        import time
+
+        from core import debug_writer
+
+        writer = debug_writer.DebugImageWriter(1_000_000, 100, maxsize=64, reconcile_interval=0.1)
+
+        def slow_write(job):
+            time.sleep(0.02)
+            return True
+
+        image = np.zeros((8, 8), dtype=np.uint8)
+        with (
+            mock.patch.object(writer, "_write", side_effect=slow_write),
+            mock.patch.object(debug_writer.storage, "reconcile_debug_ledger") as reconcile,
+        ):
+            for index in range(40):
+                writer.submit(debug_writer.DebugWriteJob(f"match_{index}.png", image, None, "ref_1.png"))
+            self.assertTrue(writer.flush(timeout=5))
+            writer.stop(timeout=5)
+        self.assertEqual(writer.stats()["debug_writes"], 40)
+        self.assertGreaterEqual(reconcile.call_count, 3)
+
+    def test_debug_hash_index_skips_alternating_duplicates_and_persists(self):
+        """Near-duplicates of any recent capture are skipped, and hashes survive a reload from SQLite."""
+        import cv2
+        from core import detector
+
+        rng = np.random.default_rng(21)
+        screen_a = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (31, 31), 10)
+        screen_b = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (31, 31), 10)
+        hash_a = detector._debug_hash(screen_a)
+        hash_b = detector._debug_hash(screen_b)
+        self.assertGreater((hash_a ^ hash_b).bit_count(), detector.DEBUG_HASH_MAX_DISTANCE)
+        noisy_a = cv2.add(screen_a, rng.integers(0, 3, screen_a.shape, dtype=np.uint8))
+        self.assertLessEqual((detector._debug_hash(noisy_a) ^ hash_a).bit_count(), detector.DEBUG_HASH_MAX_DISTANCE)
+
+        self.assertFalse(detector._is_duplicate_debug_capture(None, hash_a))
+        storage.remember_debug_hash(None, hash_a)
+        self.assertFalse(detector._is_duplicate_debug_capture(None, hash_b))
+        storage.remember_debug_hash(None, hash_b)
+        self.assertTrue(detector._is_duplicate_debug_capture(None, detector._debug_hash(noisy_a)))
+
+        path = Path(self.temp_dir.name) / "match_a.png"
+        path.write_bytes(b"x")
+        storage.add_debug_entry(None, "ref_1.png", str(path), 1, hash_a | (1 << 63))
+        storage.reconcile_debug_ledger()
+        self.assertEqual(storage.nearest_debug_hash_distance(None, hash_a | (1 << 63)), 0)
+        self.assertEqual(storage.nearest_debug_hash_distance(None, hash_b), (hash_b ^ (hash_a | (1 << 63))).bit_count())
+
+    def test_debug_hash_index_is_kept_per_profile(self):
+        """A capture saved for one profile never suppresses the same screen for another profile."""
+        import cv2
+        from core import detector
+
+        rng = np.random.default_rng(23)
+        patch = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (31, 31), 10)
+        frame[200:248, 400:496] = patch
+        for name in ("Alpha", "Beta"):
+            profiles.create_profile(name)
+            profiles.update_profile_detection_threshold(name, 0.6)
+            dirs = profiles.get_profile_dirs(name)
+            ref_path = Path(dirs["references"]) / "ref_1.png"
+            cv2.imwrite(str(ref_path), patch)
+            storage.add_reference(name, ref_path.name, str(ref_path), None)
+
+        debug_dir = Path(self.temp_dir.name) / "Data" / "Debug"
+        debug_dir.mkdir(parents=True, exist_ok=True)
+        with mock.patch.object(detector, "get_debug_dir", return_value=str(debug_dir)):
+            for name in ("Alpha", "Beta", "Alpha"):
+                result = detector.evaluate_frame(name, frame, detector.new_detector_state())
+                self.assertTrue(result.event_start)
+                self.assertTrue(detector.flush_debug_writes(timeout=5))
+
+        # The repeated Alpha event is a near-duplicate of Alpha's own capture only.
+        self.assertEqual(len(storage.list_debug_entries("Alpha")), 1)
+        self.assertEqual(len(storage.list_debug_entries("Beta")), 1)
+        phash = detector._debug_hash(frame)
+        storage.reconcile_debug_ledger()
+        profiles.create_profile("Gamma")
+        self.assertEqual(storage.nearest_debug_hash_distance("Alpha", phash), 0)
+        self.assertEqual(storage.nearest_debug_hash_distance("Beta", phash), 0)
+        self.assertIsNone(storage.nearest_debug_hash_distance("Gamma", phash))
+        self.assertIsNone(storage.nearest_debug_hash_distance(None, phash))
+
+    def test_steady_state_frames_reuse_workspace_buffers(self):
+        """After warm-up, per-frame allocations stay constant and far below one frame buffer."""
+        import tracemalloc
+
+        import cv2
+        from core import detector
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.9)
+        dirs = profiles.get_profile_dirs("Delta")
+        rng = np.random.default_rng(1)
+        for index in range(5):
+            # Distinct sizes keep every reference on the per-template OpenCV path.
+            patch = cv2.GaussianBlur(rng.integers(0, 255, (40 + 4 * index, 90 + 6 * index), dtype=np.uint8), (5, 5), 1)
+            ref_path = Path(dirs["references"]) / f"ref_{index}.png"
+            cv2.imwrite(str(ref_path), patch)
+            storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (540, 960, 3), dtype=np.uint8), (9, 9), 3)
+
+        state = detector.new_detector_state()
+        for _ in range(3):
+            detector.evaluate_frame("Delta", frame, state, sandbox_mode=True)
+
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(6):
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                detector.evaluate_frame("Delta", frame, state, sandbox_mode=True)
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+        finally:
+            tracemalloc.stop()
+        self.assertLess(max(peaks), 64 * 1024)
+        self.assertLess(max(peaks[1:]) - min(peaks[1:]), 1024)
+
+    def test_parallel_matching_merges_like_serial_pass(self):
+        """Sharded matching returns the same reference, bbox and score as the serial loop."""
+        import cv2
+        from core import detector
+
+        rng = np.random.default_rng(17)
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (7, 7), 2)
+        edges = cv2.Canny(frame, 80, 160)
+        entries = []
+        for index in range(12):
+            y, x = 30 + 37 * index, 40 + 71 * index
+            h, w = 40 + 2 * (index % 3), 80 + 4 * (index % 4)
+            edge = edges[y:y + h, x:x + w].copy()
+            small = cv2.resize(edge, (w // 2, h // 2), interpolation=cv2.INTER_AREA)
+            entries.append(detector._TemplateCacheEntry(f"ref_{index}.png", edge, small, w, h, w // 2, h // 2))
+        # A duplicate template ties with ref_3; the lower index must win in both modes.
+        twin = entries[3]
+        entries.append(
+            detector._TemplateCacheEntry(
+                "ref_dup.png", twin.edge, twin.small_edge, twin.width, twin.height, twin.small_width, twin.small_height
+            )
+        )
+        plan = detector.DetectionPlan(
+            profile_name="Delta",
+            revision=(0, 0),
+            profile_valid=True,
+            roi=None,
+            threshold=0.5,
+            coarse_threshold=detector._coarse_threshold_for(0.5),
+            coarse_scale=0.5,
+            templates=tuple(entries),
+            by_name={entry.name: entry for entry in entries},
+            atlas_groups=(),
+        )
+
+        with mock.patch.object(detector, "MATCH_WORKERS", 1):
+            serial = detector._find_best_match(plan, frame)
+            serial_selected = detector._find_best_match(plan, frame, selected_reference="ref_dup.png")
+        with mock.patch.object(detector, "MATCH_WORKERS", 4):
+            parallel = detector._find_best_match(plan, frame)
+            parallel_selected = detector._find_best_match(plan, frame, selected_reference="ref_dup.png")
+        self.assertIsNotNone(serial[0])
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel_selected, serial_selected)
+        self.assertEqual(serial_selected[0], "ref_dup.png")
+
+    def test_staged_pipeline_matches_serial_evaluation_in_order(self):
+        """Edges/match/finalize threads yield the same ordered results as evaluate_frame."""
+        import cv2
+        from app.services.detection_pipeline import PIPELINE_STAGES, StagedDetectionPipeline
+        from core import detector
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.6)
+        dirs = profiles.get_profile_dirs("Delta")
+
+        rng = np.random.default_rng(23)
+        patch = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        ref_path = Path(dirs["references"]) / "ref_1.png"
+        cv2.imwrite(str(ref_path), patch)
+        storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+
+        blank = np.zeros((540, 960), dtype=np.uint8)
+        shown = blank.copy()
+        shown[200:248, 400:496] = patch
+        moved = blank.copy()
+        moved[40:88, 120:216] = patch
+        frames = [blank, shown, shown, moved, shown, blank]
+
+        state = detector.new_detector_state()
+        serial = [detector.evaluate_frame("Delta", frame, state, sandbox_mode=True) for frame in frames]
+
+        pipeline = StagedDetectionPipeline("Delta", depth=1, sandbox_mode=True)
+        pipeline.start()
+        staged = []
+        for frame in frames:
+            while not pipeline.submit(frame):
+                staged.extend(pipeline.poll_results(timeout=0.01))
+        pipeline.stop()
+        staged.extend(pipeline.poll_results())
+
+        self.assertEqual(
+            [(r.matched, r.reference, r.bbox, r.event_start) for r in staged],
+            [(r.matched, r.reference, r.bbox, r.event_start) for r in serial],
+        )
+        stats = pipeline.stats()
+        self.assertEqual(stats["pipeline_failed"], 0)
+        for name in PIPELINE_STAGES:
+            self.assertIn(f"pipeline_{name}_occupancy", stats)
+            self.assertIn(f"pipeline_{name}_stall_ms", stats)
+
+    def test_ffmpeg_edge_plane_replaces_canny_after_calibration(self):
+        """Calibration recovers the external edge operator and precomputed edges skip frame Canny."""
+        import cv2
+        from core import detector
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.6)
+        dirs = profiles.get_profile_dirs("Delta")
+
+        rng = np.random.default_rng(29)
+        patch = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        ref_path = Path(dirs["references"]) / "ref_1.png"
+        cv2.imwrite(str(ref_path), patch)
+        storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3)
+        frame[200:248, 400:496] = patch
+
+        external = detector.EdgeOperator(blur=5, low=30, high=75)
+        frame_edges = external.apply(frame)
+        operator, agreement = detector.calibrate_edge_operator([frame], [frame_edges])
+        self.assertEqual(operator, external)
+        self.assertAlmostEqual(agreement, 1.0)
+
+        self.addCleanup(detector.set_template_edge_operator, None)
+        detector.set_template_edge_operator(operator)
+        state = detector.new_detector_state()
+        with mock.patch.object(detector, "_canny", wraps=detector._canny) as canny:
+            result = detector.evaluate_frame("Delta", frame, state, sandbox_mode=True, frame_edges=frame_edges)
+            canny.assert_not_called()
+        self.assertTrue(result.matched)
+        self.assertEqual(result.bbox[:2], (400, 200))
+
+    def test_ffmpeg_coarse_plane_replaces_coarse_resize(self):
+        """An external coarse edge level is used as-is and yields the same match as the resize."""
+        import cv2
+        from core import detector
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.6)
+        dirs = profiles.get_profile_dirs("Delta")
+
+        rng = np.random.default_rng(37)
+        patch = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        ref_path = Path(dirs["references"]) / "ref_1.png"
+        cv2.imwrite(str(ref_path), patch)
+        storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3)
+        frame[200:248, 400:496] = patch
+
+        frame_edges = detector.DEFAULT_EDGE_OPERATOR.apply(frame)
+        # Padded like the FFmpeg plane: coarse pixels on the left of full-width rows.
+        stacked = np.zeros((270, 960), dtype=np.uint8)
+        stacked[:, :480] = cv2.resize(frame_edges, (480, 270), interpolation=cv2.INTER_AREA)
+        frame_edges_small = stacked[:, :480]
+
+        resized = detector.evaluate_frame(
+            "Delta", frame, detector.new_detector_state(), sandbox_mode=True, frame_edges=frame_edges
+        )
+        with mock.patch.object(detector, "_resize_area", wraps=detector._resize_area) as resize:
+            result = detector.evaluate_frame(
+                "Delta",
+                frame,
+                detector.new_detector_state(),
+                sandbox_mode=True,
+                frame_edges=frame_edges,
+                frame_edges_small=frame_edges_small,
+            )
+            resize.assert_not_called()
+        self.assertTrue(result.matched)
+        self.assertEqual(result.bbox, resized.bbox)
+        self.assertAlmostEqual(result.confidence, resized.confidence, places=5)
+
+    def test_roi_cropped_capture_frame_reports_canonical_bbox(self):
+        """A frame FFmpeg already cropped to the ROI matches at the same canonical bbox."""
+        import cv2
+        from core import detector
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.6)
+        dirs = profiles.get_profile_dirs("Delta")
+        for key, value in (("roi_x", 300), ("roi_y", 150), ("roi_w", 400), ("roi_h", 200)):
+            storage.set_app_state(f"Delta:{key}", str(value))
+
+        rng = np.random.default_rng(31)
+        patch = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        ref_path = Path(dirs["references"]) / "ref_1.png"
+        cv2.imwrite(str(ref_path), patch)
+        storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3)
+        frame[200:248, 400:496] = patch
+        roi = detector.get_detection_plan("Delta").roi
+        self.assertEqual(roi, (300, 150, 400, 200))
+
+        full = detector.evaluate_frame("Delta", frame, detector.new_detector_state(), sandbox_mode=True)
+        cropped = frame[150:350, 300:700]
+        state = detector.new_detector_state()
+        with mock.patch.object(detector, "ENABLE_TRACKING", True):
+            first = detector.evaluate_frame("Delta", cropped, state, sandbox_mode=True, frame_roi=roi)
+            tracked = detector.evaluate_frame("Delta", cropped, state, sandbox_mode=True, frame_roi=roi)
+        wider = detector.evaluate_frame(
+            "Delta",
+            frame[100:400, 200:800],
+            detector.new_detector_state(),
+            sandbox_mode=True,
+            frame_roi=(200, 100, 600, 300),
+        )
+
+        self.assertTrue(full.matched)
+        for result in (first, tracked, wider):
+            self.assertTrue(result.matched)
+            self.assertEqual(result.bbox, full.bbox)
+
+    def test_frame_gate_lets_event_exit_before_next_dialogue(self):
+        """A static screen after a dialogue disappears still closes the event, so the next one fires."""
+        import cv2
+        from core import detector
+        from app.services.frame_consumers import FrameChangeGate
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.6)
+        dirs = profiles.get_profile_dirs("Delta")
+        rng = np.random.default_rng(3)
+        patch = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        ref_path = Path(dirs["references"]) / "ref_1.png"
+        cv2.imwrite(str(ref_path), patch)
+        storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+        blank = np.zeros((540, 960), dtype=np.uint8)
+        dialogue = blank.copy()
+        dialogue[200:248, 400:496] = patch
+
+        gate = FrameChangeGate(pixel_delta=6, max_stale_sec=2.0, enabled=True, exit_timeout=detector.EXIT_TIMEOUT)
+        state = detector.new_detector_state()
+        clock = [0.0]
+        starts = []
+        # Dialogue, disappear, static screen well inside max_stale_sec, then the next dialogue.
+        timeline = [(0.0, dialogue), (0.1, blank)] + [(0.1 + 0.2 * step, blank) for step in range(1, 7)] + [(1.7, dialogue)]
+        with mock.patch.object(detector.time, "time", side_effect=lambda: clock[0]):
+            for now, frame in timeline:
+                clock[0] = now
+                if gate.should_evaluate(frame, now=now):
+                    result = detector.evaluate_frame("Delta", frame, state, sandbox_mode=True)
+                    gate.observe(result)
+                    if result.event_start:
+                        starts.append(now)
+        self.assertEqual(starts, [0.0, 1.7])
@@ -75,6 +75,42 @@ class FfmpegToolsTests(unittest.TestCase):
         self.assertEqual(ffmpeg_tools.list_video_devices(force_refresh=True), ["Fresh Cam"])
         enum_mock.assert_called_once()
 
+    def test_build_ffmpeg_capture_command_stacks_edge_plane(self):
+        """Edge-plane mode appends edgedetect below the gray frame and doubles the frame size."""
+        config = ffmpeg_tools.CaptureConfig(width=960, height=540, fps=15, edge_plane=True)
+        with patch("app.services.ffmpeg_tools.resolve_ffmpeg_path", return_value="ffmpeg"):
+            cmd = ffmpeg_tools.build_ffmpeg_capture_command("video=HD Webcam", config)
+        graph = cmd[cmd.index("-vf") + 1]
+        self.assertTrue(graph.startswith("fps=15,scale=960:540:flags=fast_bilinear,format=gray,split[gray][edge];"))
+        self.assertIn("edgedetect=", graph)
+        self.assertTrue(graph.endswith("[gray][edges]vstack"))
+        self.assertEqual(config.frame_bytes, 2 * 960 * 540)
+        self.assertFalse(config.is_equivalent_for_capture(ffmpeg_tools.CaptureConfig(width=960, height=540, fps=15)))
+
+    def test_build_ffmpeg_capture_command_appends_coarse_edge_plane(self):
+        """Coarse mode area-scales the edge map, pads it to frame width and stacks it last."""
+        config = ffmpeg_tools.CaptureConfig(width=960, height=540, fps=15, edge_plane=True, coarse_plane=True)
+        with patch("app.services.ffmpeg_tools.resolve_ffmpeg_path", return_value="ffmpeg"):
+            cmd = ffmpeg_tools.build_ffmpeg_capture_command("video=HD Webcam", config)
+        graph = cmd[cmd.index("-vf") + 1]
+        coarse_w, coarse_h = ffmpeg_tools.coarse_plane_size(960, 540)
+        self.assertIn(f"[coarse_src]scale={coarse_w}:{coarse_h}:flags=area,pad=960:{coarse_h}:0:0[coarse]", graph)
+        self.assertTrue(graph.endswith("[gray][edges][coarse]vstack=inputs=3"))
+        self.assertEqual(config.coarse_size, (coarse_w, coarse_h))
+        self.assertEqual(config.frame_bytes, 960 * (2 * 540 + coarse_h))
+        self.assertIsNone(ffmpeg_tools.CaptureConfig(width=960, height=540, fps=15, coarse_plane=True).coarse_size)
+
+    def test_build_ffmpeg_capture_command_crops_to_roi(self):
+        """ROI mode crops right after scale so only ROI-sized frames reach the pipe."""
+        config = ffmpeg_tools.CaptureConfig(width=960, height=540, fps=15, roi=(300, 150, 400, 200))
+        with patch("app.services.ffmpeg_tools.resolve_ffmpeg_path", return_value="ffmpeg"):
+            cmd = ffmpeg_tools.build_ffmpeg_capture_command("video=HD Webcam", config)
+        graph = cmd[cmd.index("-vf") + 1]
+        self.assertEqual(graph, "fps=15,scale=960:540:flags=fast_bilinear,crop=400:200:300:150,format=gray")
+        self.assertEqual((config.output_width, config.output_height), (400, 200))
+        self.assertEqual(config.frame_bytes, 400 * 200)
+        self.assertFalse(config.is_equivalent_for_capture(ffmpeg_tools.CaptureConfig(width=960, height=540, fps=15)))
+
     @patch(
         "app.services.ffmpeg_tools.list_camera_devices",
         return_value=[CameraDevice(display_name="OBS Virtual Camera", ffmpeg_token="video=OBS Virtual Camera", backend="dshow", is_virtual=True)],
@@ -7,6 +7,7 @@ from unittest import mock
 
 from app.services.capture_constants import CANONICAL_HEIGHT, CANONICAL_WIDTH
 from app.services.ffmpeg_tools import CaptureConfig
+from app.services.frame_bus import FrameBus, FramePacket
 
 
 def _module_importable(module: str) -> bool:
@@ -80,6 +81,19 @@ class DummyCapture:
         return True
 
 
+class SharedDummyCapture(DummyCapture):
+    """DummyCapture accepting the capture event sink and reporting liveness until stopped."""
+
+    def __init__(self, *args, log_sink=None, **kwargs):
+        """Record the event sink alongside the DummyCapture fields."""
+        super().__init__(*args, **kwargs)
+        self.log_sink = log_sink
+
+    def is_alive(self):
+        """Alive until stop() is called."""
+        return self.stop_calls == 0
+
+
 class FailingCapture(DummyCapture):
     def __init__(self, *args, **kwargs):
         """Execute   init  .
@@ -119,8 +133,6 @@ def _reset_globals(monitor_service):
     monitor_service._PREVIEW_LAST_RESTART_AT = 0.0
     monitor_service._PREVIEW_STATIC_FRAME = None
     monitor_service._PREVIEW_LIVE_ENABLED = False
-    monitor_service._ACTIVE_OWNER_PIPELINE = None
-    monitor_service._ACTIVE_CAMERA_TOKEN = None
     monitor_service._LAST_CAMERA_RELEASE_AT = 0.0
 
 
@@ -241,19 +253,108 @@ class MonitorCaptureTests(unittest.TestCase):
             self.assertEqual(reason, "Preview paused while monitoring is active")
 
 
-    def test_preview_blocked_when_monitoring_owns_camera(self):
-        """Execute test preview blocked when monitoring owns camera.
-        
-        Why this exists: this function encapsulates one focused part of the app workflow so callers can reuse
-        the behavior without duplicating logic.
-        """
-        config = CaptureConfig(width=1280, height=720, fps=30)
-        self.monitor_service._ACTIVE_OWNER_PIPELINE = "monitoring"
-        self.monitor_service._ACTIVE_CAMERA_TOKEN = "camera-1"
-        with mock.patch.object(self.monitor_service, "FfmpegCapture", DummyCapture):
-            ok, reason = self.monitor_service._ensure_preview_capture("camera-1", config, allow_input_tuning=False)
-        self.assertFalse(ok)
-        self.assertIn("owned by monitoring", reason)
+    def test_preview_attaches_to_monitoring_capture(self):
+        """Preview rides the camera's running capture instead of being refused or reopening it."""
+        monitoring = CaptureConfig(width=960, height=540, fps=5, input_width=960, input_height=540, input_fps=5)
+        preview = CaptureConfig(width=960, height=540, fps=15)
+        with mock.patch.object(self.monitor_service, "FfmpegCapture", SharedDummyCapture):
+            cap, _ = self.monitor_service._ensure_global_capture("camera-1", monitoring, allow_input_tuning=True)
+            ok, reason = self.monitor_service._ensure_preview_capture("camera-1", preview, allow_input_tuning=False)
+        self.assertTrue(ok, reason)
+        self.assertIs(self.monitor_service._PREVIEW_CAPTURE, cap)
+        self.assertEqual(SharedDummyCapture.created, 1)
+        self.assertEqual(self.monitor_service._GLOBAL_USERS, 2)
+
+    def test_monitoring_start_stop_keeps_preview_capture_open(self):
+        """Monitoring attaches to the live preview capture and leaves it running when it stops."""
+        preview = CaptureConfig(width=960, height=540, fps=15)
+        monitoring = CaptureConfig(width=960, height=540, fps=10, input_width=960, input_height=540, input_fps=10)
+        with mock.patch.object(self.monitor_service, "FfmpegCapture", SharedDummyCapture):
+            ok, _ = self.monitor_service._ensure_preview_capture("camera-1", preview, allow_input_tuning=False, fps=5)
+            self.monitor_service.pause_preview_for_monitoring()
+            cap, bus = self.monitor_service._ensure_global_capture("camera-1", monitoring, allow_input_tuning=True)
+            self.monitor_service._release_global_capture(clear_queue=True)
+            self.monitor_service.resume_preview_after_monitoring()
+            ok_again, _ = self.monitor_service._ensure_preview_capture("camera-1", preview, allow_input_tuning=False, fps=5)
+        self.assertTrue(ok)
+        self.assertTrue(ok_again)
+        self.assertIs(cap, self.monitor_service._PREVIEW_CAPTURE)
+        self.assertEqual(SharedDummyCapture.created, 1)
+        self.assertEqual(cap.stop_calls, 0)
+        self.assertEqual(self.monitor_service._GLOBAL_USERS, 1)
+
+        bus.put(FramePacket(1.0, bytes(960 * 540)))
+        self.monitor_service.set_preview_live_enabled(True)
+        frame = self.monitor_service.get_latest_preview_frame()
+        self.assertEqual(frame[0], 1.0)
+        self.assertEqual(len(frame[1]), 960 * 540)
+
+    def test_preview_geometry_restored_after_roi_monitoring(self):
+        """A capture monitoring reopened ROI-cropped is reopened with the preview's config once monitoring stops."""
+        preview = CaptureConfig(width=960, height=540, fps=15)
+        monitoring = CaptureConfig(width=960, height=540, fps=10, roi=(100, 50, 400, 200))
+        with mock.patch.object(self.monitor_service, "FfmpegCapture", SharedDummyCapture):
+            ok, _ = self.monitor_service._ensure_preview_capture("camera-1", preview, allow_input_tuning=False)
+            self.monitor_service.pause_preview_for_monitoring()
+            cropped, _ = self.monitor_service._ensure_global_capture("camera-1", monitoring)
+            self.assertFalse(self.monitor_service._preview_geometry_matches())
+            self.monitor_service._release_global_capture()
+            self.monitor_service.resume_preview_after_monitoring()
+        self.assertTrue(ok)
+        restored = self.monitor_service._GLOBAL_CAPTURE
+        self.assertIsNot(restored, cropped)
+        self.assertEqual(cropped.stop_calls, 1)
+        self.assertIs(self.monitor_service._PREVIEW_CAPTURE, restored)
+        self.assertEqual(self.monitor_service._GLOBAL_CONFIG, preview)
+        self.assertEqual(self.monitor_service._GLOBAL_USERS, 1)
+        self.assertEqual(SharedDummyCapture.created, 3)
+
+    def test_incompatible_monitoring_config_reopens_once_for_all_users(self):
+        """An edge-plane request replaces the preview stream but keeps the preview's reference."""
+        preview = CaptureConfig(width=960, height=540, fps=15)
+        monitoring = CaptureConfig(width=960, height=540, fps=15, edge_plane=True)
+        with mock.patch.object(self.monitor_service, "FfmpegCapture", SharedDummyCapture):
+            first, bus = self.monitor_service._ensure_global_capture("camera-1", preview, pipeline="preview", attach_any=True)
+            second, same_bus = self.monitor_service._ensure_global_capture("camera-1", monitoring)
+        self.assertIsNot(first, second)
+        self.assertIs(bus, same_bus)
+        self.assertEqual(first.stop_calls, 1)
+        self.assertEqual(self.monitor_service._GLOBAL_USERS, 2)
+
+    def test_monitoring_attach_adds_standby_to_preview_capture(self):
+        """Monitoring attaching to the preview's capture upgrades it to a hot standby that fails over."""
+        import time
+
+        from app.services import ffmpeg_capture_supervisor as supervisor
+
+        scripts = {
+            "primary": "import sys, time\nfor _ in range(20):\n    sys.stdout.buffer.write(bytes([1]) * 8); sys.stdout.flush(); time.sleep(0.03)",
+            "standby": "import sys, time\nwhile True:\n    sys.stdout.buffer.write(bytes([2]) * 8); sys.stdout.flush(); time.sleep(0.03)",
+        }
+        config = CaptureConfig(width=4, height=2, fps=30)
+        with mock.patch.object(
+            supervisor, "build_ffmpeg_capture_command", side_effect=lambda token, *_a, **_k: [sys.executable, "-c", scripts[token]]
+        ):
+            ok, reason = self.monitor_service._ensure_preview_capture("primary", config, allow_input_tuning=False)
+            self.assertTrue(ok, reason)
+            plain = self.monitor_service._PREVIEW_CAPTURE
+            cap, bus = self.monitor_service._ensure_global_capture(
+                "primary", config, standby=SimpleNamespace(token="standby")
+            )
+            self.addCleanup(cap.stop)
+            self.assertIsInstance(cap, supervisor.HotStandbyCapture)
+            self.assertIs(cap.primary, plain)
+            self.assertIs(self.monitor_service._PREVIEW_CAPTURE, cap)
+            self.assertEqual(self.monitor_service._GLOBAL_USERS, 2)
+
+            deadline = time.monotonic() + 15
+            while time.monotonic() < deadline and cap.failovers == 0:
+                time.sleep(0.05)
+            self.assertEqual(cap.failovers, 1)
+            while time.monotonic() < deadline and cap.active.frames_captured == 0:
+                time.sleep(0.05)
+            self.assertTrue(cap.is_alive())
+            self.assertEqual(bus.latest_copy().payload, bytes([2]) * 8)
 
     def test_virtual_preview_uses_single_retry(self):
         """Execute test virtual preview uses single retry.
@@ -296,7 +397,6 @@ class MonitorCaptureTests(unittest.TestCase):
         self.assertIsNone(reason)
         self.assertEqual(self.monitor_service._PREVIEW_CONFIG.width, CANONICAL_WIDTH)
         self.assertEqual(self.monitor_service._PREVIEW_CONFIG.height, CANONICAL_HEIGHT)
-        self.assertIsNone(self.monitor_service._ACTIVE_OWNER_PIPELINE)
 
     def _fail_capture_once(self, input_token, config, *, allow_input_tuning):
         """Execute  fail capture once.
@@ -469,6 +569,47 @@ class MonitorCaptureTests(unittest.TestCase):
 
         self.assertEqual(len(alert_events), 1)
 
+    def test_processing_loop_reports_bus_subscriber_drops_in_metrics(self):
+        """Metrics carry per-subscriber drop counts from the shared capture bus."""
+        import itertools
+
+        service = self.monitor_service.MonitorService()
+        service._monitor_fps = 60
+        bus = FrameBus(capacity=8)
+        preview = bus.subscribe("preview", maxlen=1)
+        payloads = []
+        service.metrics.connect(payloads.append)
+        subscribe = bus.subscribe
+
+        def subscribe_and_publish(*args, **kwargs):
+            subscription = subscribe(*args, **kwargs)
+            for index in range(3):
+                bus.put(FramePacket(float(index), bytes([(index % 2) * 200]) * 4))
+            return subscription
+
+        def evaluate(*args, **kwargs):
+            if payloads or evaluate_mock.call_count >= 3:
+                service._stop_event.set()
+            return SimpleNamespace(confidence=0.5, matched=False, timestamp=0.0, event_start=False, debug_frame=None)
+
+        with (
+            mock.patch.object(bus, "subscribe", side_effect=subscribe_and_publish),
+            mock.patch.object(self.monitor_service.app_state, "selected_reference", "ref"),
+            mock.patch.object(service._metrics, "on_frame"),
+            mock.patch.object(service._detection_consumer, "is_paused", return_value=False),
+            mock.patch.object(self.monitor_service.time, "time", side_effect=itertools.count(0.0, 3.0)),
+            mock.patch.object(self.monitor_service.dect, "evaluate_frame", side_effect=evaluate) as evaluate_mock,
+        ):
+            service._processing_loop("alpha", bus, 2, 2)
+
+        self.assertTrue(payloads)
+        subscribers = payloads[0]["subscribers"]
+        self.assertEqual(set(subscribers), {"preview", "detector"})
+        # The preview never read: its overflow is reported before it is skipped.
+        self.assertEqual(subscribers["preview"], {"dropped": 2, "pending": 1})
+        self.assertEqual(preview.dropped_frames, 0)
+        self.assertEqual(subscribers["detector"]["dropped"], 0)
+
     def test_monitoring_retries_limited_and_reports_failure(self):
         """Execute test monitoring retries limited and reports failure.
         
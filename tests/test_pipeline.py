@@ -1,4 +1,5 @@
 """Pipeline tests for bounded queue behavior."""
+import sys
 import unittest
 
 from app.services.monitor_pipeline import FrameQueue
@@ -28,3 +29,376 @@ class PipelineTests(unittest.TestCase):
         self.assertEqual(queue.size(), 2)
         self.assertEqual(queue.get(), "x")
         self.assertEqual(queue.get(), "y")
+
+    def test_pooled_frames_recycle_once_every_holder_releases(self):
+        """readinto-filled pool buffers return to the pool after queue drops and consumer releases."""
+        import io
+
+        from app.services.ffmpeg_capture_supervisor import FfmpegCaptureSupervisor
+        from app.services.frame_bus import FrameBufferPool, FramePacket
+
+        frame_size = 16
+        stream = io.BytesIO(bytes(range(256)) * 8)
+        pool = FrameBufferPool(frame_size, 5)
+        queue = FrameQueue(maxlen=3)
+        seen = set()
+        for index in range(100):
+            lease = pool.acquire()
+            seen.add(id(lease.buffer))
+            self.assertTrue(FfmpegCaptureSupervisor._read_exact_into(stream, lease.view))
+            queue.put(FramePacket(float(index), lease.view.toreadonly(), lease=lease))
+            if index % 3 == 0:
+                packet = queue.get(timeout=0.01)
+                self.assertEqual(len(packet.payload), frame_size)
+                packet.release()
+
+        snapshot = queue.latest_copy()
+        self.assertIsInstance(snapshot.payload, bytes)
+        held = queue.peek_latest(retain=True)
+        queue.clear()
+        self.assertEqual(bytes(held.payload), snapshot.payload)
+        held.release()
+        self.assertEqual(pool.stats(), {"frame_pool_size": 5, "frame_pool_free": 5, "frame_pool_misses": 0})
+        self.assertLessEqual(len(seen), 5)
+        self.assertFalse(FfmpegCaptureSupervisor._read_exact_into(io.BytesIO(b"abc"), pool.acquire().view))
+
+    def test_frame_bus_fans_out_with_per_subscriber_cursors(self):
+        """Each subscriber reads every frame its policy keeps, shares payloads, and counts its own drops."""
+        from app.services.frame_bus import FrameBufferPool, FrameBus, FramePacket, OverflowPolicy
+
+        pool = FrameBufferPool(4, 12)
+        bus = FrameBus(capacity=4)
+        detector = bus.subscribe("detector", OverflowPolicy.DROP_OLDEST, maxlen=3)
+        preview = bus.subscribe("preview", OverflowPolicy.LAST_ONLY)
+        published = []
+        for index in range(5):
+            lease = pool.acquire()
+            lease.view[:] = bytes([index]) * 4
+            packet = FramePacket(float(index), lease.view.toreadonly(), lease=lease)
+            published.append(packet)
+            bus.put(packet)
+
+        latest = preview.get(timeout=0.01)
+        self.assertIs(latest, published[-1])
+        latest.release()
+        self.assertIsNone(preview.get(timeout=0.01))
+        self.assertEqual(preview.dropped_frames, 4)
+
+        received = []
+        while (packet := detector.get(timeout=0.01)) is not None:
+            received.append(packet.timestamp)
+            packet.release()
+        self.assertEqual(received, [2.0, 3.0, 4.0])
+        self.assertEqual(detector.dropped_frames, 2)
+        self.assertEqual(bus.subscriber_stats()["preview"], {"dropped": 4, "pending": 0})
+
+        # Only the overwritten slot has been recycled; the ring still owns the other four.
+        self.assertEqual(pool.stats()["frame_pool_free"], 8)
+        detector.close()
+        bus.clear()
+        self.assertEqual(pool.stats()["frame_pool_free"], 12)
+        self.assertEqual(list(bus.subscriber_stats()), ["preview"])
+
+    def test_preview_consumer_copies_only_the_gray_plane(self):
+        """The preview samples the gray plane of stacked frames without copying the planes below it."""
+        from unittest import mock
+
+        from app.services.frame_bus import FrameBus, FramePacket
+        from app.services.frame_consumers import PreviewConsumer
+
+        bus = FrameBus(capacity=4)
+        preview = PreviewConsumer(bus, width=4, height=2, fps=1000)
+        bus.put(FramePacket(1.0, bytes([7]) * 8 + bytes([255]) * 16))
+        original_detached = FramePacket.detached
+        with mock.patch.object(FramePacket, "detached", autospec=True, side_effect=original_detached) as detached:
+            packet = preview.latest_copy()
+        self.assertEqual(packet.payload, bytes([7]) * 8)
+        self.assertEqual(detached.call_args.args[1], 8)
+
+    def test_latest_frame_slot_retries_copies_of_recycled_buffers(self):
+        """A copy racing with buffer recycling is detected and retried against the newer frame."""
+        from unittest import mock
+
+        from app.services.frame_bus import FrameBufferPool, FramePacket, LatestFrameSlot
+
+        pool = FrameBufferPool(4, 2)
+        slot = LatestFrameSlot()
+
+        def publish(value: int) -> FramePacket:
+            lease = pool.acquire()
+            lease.view[:] = bytes([value]) * 4
+            packet = FramePacket(float(value), lease.view.toreadonly(), lease=lease)
+            slot.publish(packet)
+            packet.release()  # the slot now holds the only reference
+            return packet
+
+        first = publish(1)
+        original_detached = FramePacket.detached
+
+        def racing_detached(packet, limit=None):
+            copy = original_detached(packet, limit)
+            if packet is first:
+                publish(2)  # the capture thread swaps the slot and recycles frame 1 mid-copy
+            return copy
+
+        with mock.patch.object(FramePacket, "detached", racing_detached):
+            latest = slot.latest_copy()
+        self.assertTrue(first.recycled)
+        self.assertEqual((latest.timestamp, latest.payload), (2.0, bytes([2]) * 4))
+        self.assertEqual(slot.torn_reads, 1)
+        slot.clear()
+        self.assertIsNone(slot.latest_copy())
+        self.assertEqual(pool.stats()["frame_pool_free"], 2)
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "F_SETPIPE_SZ is Linux-only")
+    def test_grown_pipe_delivers_a_frame_per_read(self):
+        """A pipe grown to hold a frame lets the reader fill it in a single readinto."""
+        import os
+
+        from app.services.ffmpeg_capture_supervisor import FfmpegCaptureSupervisor, _grow_pipe
+
+        frame_size = 256 * 1024
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(read_fd, "rb", buffering=0) as reader, os.fdopen(write_fd, "wb", buffering=0) as writer:
+            capacity = _grow_pipe(reader, frame_size)
+            if capacity is None or capacity < frame_size:
+                self.skipTest("pipe-max-size below one test frame")
+            writer.write(bytes(frame_size))
+            view = memoryview(bytearray(frame_size))
+            self.assertEqual(FfmpegCaptureSupervisor._read_exact_into(reader, view), 1)
+
+    def test_frame_change_gate_skips_unchanged_frames_until_stale(self):
+        """FrameChangeGate skips near-identical frames and re-evaluates after max staleness."""
+        import numpy as np
+
+        from app.services.frame_consumers import FrameChangeGate
+
+        gate = FrameChangeGate(pixel_delta=6, max_stale_sec=2.0, enabled=True)
+        frame = np.full((540, 960), 40, dtype=np.uint8)
+        self.assertTrue(gate.should_evaluate(frame, now=0.0))
+        noisy = frame.copy()
+        noisy[::7, ::5] += 3
+        self.assertFalse(gate.should_evaluate(noisy, now=0.5))
+        changed = frame.copy()
+        changed[400:500, 100:400] = 220
+        self.assertTrue(gate.should_evaluate(changed, now=1.0))
+        self.assertFalse(gate.should_evaluate(changed, now=2.5))
+        self.assertTrue(gate.should_evaluate(changed, now=3.1))
+        self.assertEqual(gate.take_counts(), (3, 2))
+        self.assertEqual(gate.take_counts(), (0, 0))
+
+    def test_shared_frame_ring_detects_overwritten_slots(self):
+        """Ring reads return the written frame and reject slots reused by a newer frame."""
+        import numpy as np
+
+        from app.services.detector_worker import SharedFrameRing
+
+        ring = SharedFrameRing(2, (4, 6))
+        try:
+            first = bytes(range(24))
+            slot = ring.write(0, first)
+            self.assertEqual(ring.read(0, slot).tobytes(), first)
+            ring.write(2, bytes(24))
+            self.assertIsNone(ring.read(0, slot))
+            np.testing.assert_array_equal(ring.read(2, slot), np.zeros((4, 6), dtype=np.uint8))
+        finally:
+            ring.close()
+
+    def test_detector_worker_survives_crash_and_keeps_matching(self):
+        """A killed detection process is respawned and keeps answering frames."""
+        import os
+        import tempfile
+        import time
+        from pathlib import Path
+
+        import cv2
+        import numpy as np
+
+        from app.services.detector_worker import DetectorWorker
+        from core import profiles, storage
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        original_cwd = os.getcwd()
+        os.chdir(temp_dir.name)
+        self.addCleanup(os.chdir, original_cwd)
+        os.environ["APP_DB_PATH"] = str(Path(temp_dir.name) / "Data" / "app.db")
+        self.addCleanup(os.environ.pop, "APP_DB_PATH", None)
+
+        profiles.create_profile("Delta")
+        profiles.update_profile_detection_threshold("Delta", 0.6)
+        dirs = profiles.get_profile_dirs("Delta")
+        rng = np.random.default_rng(3)
+        patch = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        frame = np.zeros((540, 960), dtype=np.uint8)
+        frame[200:248, 400:496] = patch
+        ref_path = Path(dirs["references"]) / "ref_1.png"
+        cv2.imwrite(str(ref_path), patch)
+        storage.add_reference("Delta", ref_path.name, str(ref_path), None)
+
+        worker = DetectorWorker("Delta", frame.shape, selected_reference="ref_1.png")
+        worker.start()
+        self.addCleanup(worker.stop)
+
+        def wait_for_result():
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                results = worker.poll_results(timeout=0.2)
+                if results:
+                    return results[-1]
+            self.fail("detector worker produced no result")
+
+        self.assertTrue(worker.submit(frame.tobytes()))
+        first = wait_for_result()
+        self.assertTrue(first.matched)
+        self.assertEqual(first.reference, "ref_1.png")
+
+        # The debug flash is redrawn from the ring rather than pickled back.
+        self.assertEqual(first.debug_frame.shape, frame.shape + (3,))
+        self.assertTrue((first.debug_frame[200, 400:496] == (0, 255, 0)).all())
+
+        worker._process.kill()
+        worker._process.join(5)
+        self.assertTrue(worker.ensure_alive())
+        self.assertEqual(worker.restarts, 1)
+        self.assertEqual(worker.in_flight(), 0)
+        self.assertTrue(worker.submit(frame.tobytes()))
+        self.assertTrue(wait_for_result().matched)
+
+        # Edits made in this process reach the worker's detection plan.
+        profiles.update_profile_detection_threshold("Delta", 0.999)
+        self.assertTrue(worker.submit(frame.tobytes()))
+        self.assertFalse(wait_for_result().matched)
+
+    def test_hot_standby_takes_over_when_primary_stream_ends(self):
+        """The warm standby starts publishing into the same queue right after the primary's EOF."""
+        import time
+        from unittest import mock
+
+        from app.services import ffmpeg_capture_supervisor as supervisor
+        from app.services.ffmpeg_tools import CaptureConfig
+
+        config = CaptureConfig(width=4, height=2, fps=30)
+        scripts = {
+            "primary": "import sys, time\nfor _ in range(3):\n    sys.stdout.buffer.write(bytes([1]) * 8); sys.stdout.flush(); time.sleep(0.03)",
+            "standby": "import sys, time\nwhile True:\n    sys.stdout.buffer.write(bytes([2]) * 8); sys.stdout.flush(); time.sleep(0.03)",
+        }
+
+        def fake_command(token, _config, **_kwargs):
+            return [sys.executable, "-c", scripts[token]]
+
+        patcher = mock.patch.object(supervisor, "build_ffmpeg_capture_command", side_effect=fake_command)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        queue = FrameQueue(maxlen=4)
+        capture = supervisor.HotStandbyCapture("primary", config, queue, standby_token="standby")
+        capture.start()
+        self.addCleanup(capture.stop)
+
+        seen = set()
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline and 2 not in seen:
+            packet = queue.get(timeout=0.2)
+            if packet is not None:
+                seen.add(bytes(packet.payload)[0])
+                packet.release()
+        self.assertEqual(seen, {1, 2})
+        self.assertEqual(capture.failovers, 1)
+        self.assertEqual(capture.input_token, "standby")
+        self.assertTrue(capture.is_alive())
+        stats = capture.failover_stats()
+        self.assertLess(stats["capture_failover_ms"], 1000.0)
+        self.assertGreaterEqual(stats["capture_failover_frames_lost"], 0)
+        self.assertFalse(capture.fail_over("again"))
+
+    def _patch_stall_watchdog(self, supervisor, **overrides):
+        """Shrink the watchdog thresholds so stalls are detected within a test."""
+        from unittest import mock
+
+        settings = {
+            "CAPTURE_STALL_WATCHDOG_ENABLED": True,
+            "CAPTURE_STALL_MIN_SEC": 0.3,
+            "CAPTURE_STALL_STARTUP_SEC": 2.0,
+            "CAPTURE_STALL_BACKOFF_SEC": 0.1,
+            **overrides,
+        }
+        for name, value in settings.items():
+            patcher = mock.patch.object(supervisor, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_stall_watchdog_restarts_ffmpeg_that_stops_writing(self):
+        """A running ffmpeg that stops writing is flagged stale and restarted until frames flow again."""
+        import time
+        from unittest import mock
+
+        from app.services import ffmpeg_capture_supervisor as supervisor
+        from app.services.ffmpeg_tools import CaptureConfig
+
+        self._patch_stall_watchdog(supervisor)
+        scripts = [
+            "import sys, time\nfor _ in range(3):\n    sys.stdout.buffer.write(bytes([1]) * 8); sys.stdout.flush()\ntime.sleep(60)",
+            "import sys, time\nwhile True:\n    sys.stdout.buffer.write(bytes([2]) * 8); sys.stdout.flush(); time.sleep(0.03)",
+        ]
+        commands = iter([sys.executable, "-c", script] for script in scripts)
+        patcher = mock.patch.object(supervisor, "build_ffmpeg_capture_command", side_effect=lambda *a, **k: next(commands))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        queue = FrameQueue(maxlen=4)
+        events = []
+
+        def sink(payload):
+            if "event" in payload:
+                events.append((payload["event"], queue.stale, payload))
+
+        capture = supervisor.FfmpegCaptureSupervisor("cam", CaptureConfig(width=4, height=2, fps=30), queue, log_sink=sink)
+        capture.start()
+        self.addCleanup(capture.stop)
+
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline and not any(name == "capture_recovered" for name, _, _ in events):
+            self.assertTrue(capture.is_alive())
+            time.sleep(0.05)
+        names = [name for name, _, _ in events]
+        self.assertEqual(names, ["capture_stalled", "capture_restart", "capture_recovered"])
+        stalled_stale, stall = events[0][1], events[0][2]
+        self.assertTrue(stalled_stale)
+        self.assertGreaterEqual(stall["stall_ms"], 300)
+        self.assertEqual(stall["expected_interval_ms"], 33)
+        self.assertFalse(queue.stale)
+        self.assertEqual(queue.latest_copy().payload, bytes([2]) * 8)
+        stats = capture.capture_stats()
+        self.assertEqual((stats["capture_stalls"], stats["capture_stall_restarts"], stats["capture_stalled"]), (1, 1, False))
+
+    def test_stall_watchdog_backs_off_then_gives_up(self):
+        """Restarts that never deliver a frame back off exponentially and end with the capture dead."""
+        import time
+        from unittest import mock
+
+        from app.services import ffmpeg_capture_supervisor as supervisor
+        from app.services.ffmpeg_tools import CaptureConfig
+
+        self._patch_stall_watchdog(supervisor, CAPTURE_STALL_STARTUP_SEC=0.3, CAPTURE_STALL_MAX_RESTARTS=2)
+        patcher = mock.patch.object(
+            supervisor,
+            "build_ffmpeg_capture_command",
+            return_value=[sys.executable, "-c", "import time; time.sleep(60)"],
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        events = []
+        capture = supervisor.FfmpegCaptureSupervisor(
+            "cam", CaptureConfig(width=4, height=2, fps=30), FrameQueue(maxlen=2), log_sink=lambda payload: events.append(payload)
+        )
+        capture.start()
+        self.addCleanup(capture.stop)
+
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline and capture.is_alive():
+            time.sleep(0.05)
+        self.assertFalse(capture.is_alive())
+        backoffs = [event["backoff_sec"] for event in events if event.get("event") == "capture_restart"]
+        self.assertEqual(backoffs, [0.1, 0.2])
+        self.assertEqual(events[-1]["event"], "capture_stall_gave_up")
+        self.assertIn("gave up", capture.last_error)
@@ -78,6 +78,35 @@ class StorageTests(unittest.TestCase):
                 os.remove(path)
         self.assertLessEqual(len(storage.list_debug_entries("Gamma")), 2)
 
+    def test_debug_ledger_tracks_add_prune_delete_and_reconcile(self):
+        """Debug ledger follows every debug_entries change and re-syncs with disk on reconcile."""
+        profiles.create_profile("Gamma")
+        debug_dir = Path(profiles.get_debug_dir())
+        self.assertEqual(storage.get_debug_ledger(), (0, 0))
+        for i in range(4):
+            path = debug_dir / f"debug_{i}.png"
+            path.write_bytes(b"x" * 10)
+            storage.add_debug_entry("Gamma", None, str(path), 10)
+        self.assertEqual(storage.get_debug_ledger(), (4, 40))
+
+        removed = storage.prune_debug_entries(max_bytes=1000, max_count=3)
+        self.assertEqual(len(removed), 1)
+        os.remove(removed[0])
+        self.assertEqual(storage.get_debug_ledger(), (3, 30))
+
+        success, freed = profiles.delete_debug_frame("Gamma", "debug_1.png")
+        self.assertTrue(success)
+        self.assertEqual(freed, 10)
+        self.assertEqual(storage.get_debug_ledger(), (2, 20))
+
+        (debug_dir / "debug_2.png").unlink()
+        self.assertEqual(storage.get_debug_ledger(), (2, 20))
+        self.assertEqual(storage.reconcile_debug_ledger(), (1, 10))
+
+        deleted, _ = profiles.delete_all_debug_frames("Gamma")
+        self.assertEqual(deleted, 1)
+        self.assertEqual(storage.get_debug_ledger(), (0, 0))
+
     def test_filesystem_migration(self):
         """Profiles in filesystem migrate into SQLite on list."""
         legacy_dir = Path("Data") / "Profiles" / "Legacy"
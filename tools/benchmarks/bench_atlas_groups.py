@@ -0,0 +1,117 @@
+"""Benchmark batched same-size group scoring against per-template coarse matching.
+
+Runs the coarse pass for groups of 1..N same-sized (48x96) references on a
+synthetic 960x540 edge frame (coarse level 480x270) with per-call
+cv2.matchTemplate, shared-integral NCC, and _FftCorrelator.match_group, which
+transforms the frame once and correlates every template into reused float32
+buffers. The atlas break-even group size tunes DETECTOR_ATLAS_MIN_GROUP.
+
+Usage:
+    python tools/benchmarks/bench_atlas_groups.py [--max-group 32] [--repeats 20]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+# Importing the detector touches Data/; keep benchmark artifacts out of the repo.
+os.chdir(tempfile.mkdtemp(prefix="frametrace-bench-"))
+os.environ.setdefault("APP_DB_PATH", os.path.join(os.getcwd(), "app.db"))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from core import detector  # noqa: E402
+
+
+def _synthetic_frame(seed: int = 3):
+    """Return the coarse edge map of a frame resembling a UI capture."""
+    rng = np.random.default_rng(seed)
+    gray = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3)
+    frame_e = cv2.Canny(gray, 20, 40)
+    return frame_e, cv2.resize(frame_e, (480, 270), interpolation=cv2.INTER_AREA)
+
+
+def _entries(frame_e, count: int, size=(48, 96)):
+    """Cut `count` same-sized templates out of the frame."""
+    th, tw = size
+    entries = []
+    for i in range(count):
+        y = (i * 37) % (frame_e.shape[0] - th)
+        x = (i * 53) % (frame_e.shape[1] - tw)
+        edge = frame_e[y:y + th, x:x + tw].copy()
+        small = cv2.resize(edge, (tw // 2, th // 2), interpolation=cv2.INTER_AREA)
+        entries.append(detector._TemplateCacheEntry(f"ref_{i}.png", edge, small, tw, th, tw // 2, th // 2))
+    return entries
+
+
+def _run_opencv(frame_small, entries, group, workspace):
+    """Coarse pass with cv2.matchTemplate per template."""
+    for entry in entries:
+        cv2.minMaxLoc(detector._match(frame_small, entry.small_edge, workspace))
+
+
+def _run_ncc(frame_small, entries, group, workspace):
+    """Coarse pass with integral images computed once per frame."""
+    stats = detector._FrameStats(frame_small)
+    for entry in entries:
+        cv2.minMaxLoc(detector._ncc_scores(stats, entry.small_edge, entry.small_mean, entry.small_norm))
+
+
+def _run_atlas(frame_small, entries, group, workspace):
+    """Coarse pass through one per-frame correlator (frame transform included)."""
+    detector._FftCorrelator(detector._FrameStats(frame_small)).match_group(group, workspace)
+
+
+def _time_ms(fn, repeats: int) -> float:
+    """Return median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return float(np.median(samples))
+
+
+def main() -> int:
+    """Print a per-group-size table and the observed atlas break-even point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-group", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    frame_e, frame_small = _synthetic_frame()
+    all_entries = _entries(frame_e, args.max_group)
+    sizes = sorted({1, 2, 3, 4, 6, 8, 12, 16, 24, 32, args.max_group} & set(range(1, args.max_group + 1)))
+    workspace = detector._Workspace()
+
+    break_even = None
+    print(f"{'group':>6} {'opencv ms':>10} {'ncc ms':>10} {'atlas ms':>10} {'speedup':>8}")
+    for size in sizes:
+        entries = all_entries[:size]
+        group = detector._group_templates(entries)[0]
+        # Template spectra are cached per plan in production; warm them outside the timing.
+        _run_atlas(frame_small, entries, group, workspace)
+        inputs = (frame_small, entries, group, workspace)
+        opencv_ms = _time_ms(lambda: _run_opencv(*inputs), args.repeats)
+        ncc_ms = _time_ms(lambda: _run_ncc(*inputs), args.repeats)
+        atlas_ms = _time_ms(lambda: _run_atlas(*inputs), args.repeats)
+        if break_even is None and atlas_ms < opencv_ms:
+            break_even = size
+        print(f"{size:>6} {opencv_ms:>10.2f} {ncc_ms:>10.2f} {atlas_ms:>10.2f} {opencv_ms / max(atlas_ms, 1e-9):>7.2f}x")
+
+    if break_even is None:
+        print("Group scoring never beat the per-template OpenCV path in this range.")
+    else:
+        print(f"Break-even at a group of {break_even}; DETECTOR_ATLAS_MIN_GROUP={detector.ATLAS_MIN_GROUP_SIZE}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
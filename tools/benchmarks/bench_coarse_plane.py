@@ -0,0 +1,124 @@
+"""Benchmark building the detector's two edge levels in Python versus reading them from FFmpeg.
+
+Compares, per canonical frame:
+  * python      — Canny on the gray frame plus the INTER_AREA coarse resize (`_frame_edges`);
+  * edge plane  — FFmpeg's edge map, coarse level still resized in Python (`MONITOR_FFMPEG_EDGES=1`);
+  * edge+coarse — both levels taken from the rawvideo frame (`MONITOR_FFMPEG_COARSE=1`).
+The extra pipe bytes of each layout are priced with a plain memory copy, a lower
+bound for what the capture reader pays to move them.
+
+Usage:
+    python tools/benchmarks/bench_coarse_plane.py [--frames 200]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+# Importing the detector touches Data/; keep benchmark artifacts out of the repo.
+os.chdir(tempfile.mkdtemp(prefix="frametrace-bench-"))
+os.environ.setdefault("APP_DB_PATH", os.path.join(os.getcwd(), "app.db"))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from app.services.capture_constants import CANONICAL_HEIGHT, CANONICAL_WIDTH  # noqa: E402
+from app.services.ffmpeg_tools import CaptureConfig  # noqa: E402
+from core import detector  # noqa: E402
+
+
+def _plan():
+    """Build an empty in-memory plan; only the coarse scale matters here."""
+    return detector.DetectionPlan(
+        profile_name="bench",
+        revision=(0, 0),
+        profile_valid=True,
+        roi=None,
+        threshold=0.8,
+        coarse_threshold=detector._coarse_threshold_for(0.8),
+        coarse_scale=detector.FRAME_COARSE_SCALE,
+        templates=(),
+        by_name={},
+        atlas_groups=(),
+    )
+
+
+def _stacked_frames(count: int, config: CaptureConfig, seed: int = 5):
+    """Return rawvideo payloads laid out like the FFmpeg edge+coarse capture."""
+    rng = np.random.default_rng(seed)
+    coarse_w, coarse_h = config.coarse_size
+    frames = []
+    for _ in range(count):
+        gray = cv2.GaussianBlur(rng.integers(0, 255, (CANONICAL_HEIGHT, CANONICAL_WIDTH), dtype=np.uint8), (9, 9), 3)
+        edges = detector.DEFAULT_EDGE_OPERATOR.apply(gray)
+        stacked = np.zeros((config.frame_rows, CANONICAL_WIDTH), dtype=np.uint8)
+        stacked[:CANONICAL_HEIGHT] = gray
+        stacked[CANONICAL_HEIGHT:2 * CANONICAL_HEIGHT] = edges
+        stacked[2 * CANONICAL_HEIGHT:, :coarse_w] = cv2.resize(edges, (coarse_w, coarse_h), interpolation=cv2.INTER_AREA)
+        frames.append(stacked)
+    return frames
+
+
+def _median_ms(func, frames) -> float:
+    """Median wall time of func(frame) in milliseconds, skipping the warm-up frame."""
+    samples = []
+    for frame in frames:
+        started = time.perf_counter()
+        func(frame)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return float(np.median(samples[1:]))
+
+
+def _copy_ms(size: int, repeats: int = 200) -> float:
+    """Median time to copy size bytes into a preallocated buffer."""
+    source = np.ones(size, dtype=np.uint8)
+    target = np.empty_like(source)
+    return _median_ms(lambda _: np.copyto(target, source), range(repeats))
+
+
+def main() -> int:
+    """Print per-frame edge-level cost and pipe bytes for each capture layout."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    plan = _plan()
+    workspace = detector._Workspace()
+    full = detector._FULL_FRAME
+    config = CaptureConfig(CANONICAL_WIDTH, CANONICAL_HEIGHT, 15, edge_plane=True, coarse_plane=True)
+    coarse_w = config.coarse_size[0]
+    height = CANONICAL_HEIGHT
+    frames = _stacked_frames(args.frames, config)
+    shape = (height, CANONICAL_WIDTH)
+
+    def python_path(stacked):
+        detector._frame_edges(plan, stacked[:height], None, workspace)
+
+    def edge_plane(stacked):
+        detector._precomputed_edges(plan, stacked[height:2 * height], shape, full, workspace)
+
+    def edge_and_coarse(stacked):
+        detector._precomputed_edges(
+            plan, stacked[height:2 * height], shape, full, workspace, stacked[2 * height:, :coarse_w]
+        )
+
+    layouts = (
+        ("python", python_path, CaptureConfig(CANONICAL_WIDTH, CANONICAL_HEIGHT, 15)),
+        ("edge plane", edge_plane, CaptureConfig(CANONICAL_WIDTH, CANONICAL_HEIGHT, 15, edge_plane=True)),
+        ("edge+coarse", edge_and_coarse, config),
+    )
+    print(f"{'layout':>12} {'levels ms':>10} {'pipe bytes':>11} {'copy ms':>8} {'total ms':>9}")
+    for label, func, layout in layouts:
+        levels = _median_ms(func, frames)
+        copy = _copy_ms(layout.frame_bytes)
+        print(f"{label:>12} {levels:10.3f} {layout.frame_bytes:11d} {copy:8.3f} {levels + copy:9.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
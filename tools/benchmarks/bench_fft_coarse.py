@@ -0,0 +1,140 @@
+"""Benchmark the FFT coarse engine against per-call cv2.matchTemplate.
+
+Runs 1..N large references against a synthetic 960x540 frame (coarse level
+480x270) and reports, per template size, the coarse pass alone and the whole
+_find_best_match call with DETECTOR_MATCH_ENGINE=spatial and =fft. The FFT
+engine transforms the frame once and reuses its spectrum across templates,
+but forcing it also moves the fine pass to shared NCC. It is opt-in; use the
+per-frame columns to decide whether forcing it pays off on a machine.
+
+Usage:
+    python tools/benchmarks/bench_fft_coarse.py [--max-refs 8] [--repeats 20]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+# Importing the detector touches Data/; keep benchmark artifacts out of the repo.
+os.chdir(tempfile.mkdtemp(prefix="frametrace-bench-"))
+os.environ.setdefault("APP_DB_PATH", os.path.join(os.getcwd(), "app.db"))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from core import detector  # noqa: E402
+
+# Full-resolution (height, width) of the references; coarse templates are half that.
+TEMPLATE_SIZES = ((100, 200), (200, 400), (300, 600))
+
+
+def _synthetic_frame(seed: int = 3):
+    """Return a (gray, frame_e, frame_small) triple resembling a UI capture."""
+    rng = np.random.default_rng(seed)
+    gray = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (7, 7), 2)
+    frame_e = cv2.Canny(gray, 80, 160)
+    frame_small = cv2.resize(frame_e, (480, 270), interpolation=cv2.INTER_AREA)
+    return gray, frame_e, frame_small
+
+
+def _plan(entries):
+    """Wrap templates in a DetectionPlan whose coarse threshold lets every one reach the fine pass."""
+    return detector.DetectionPlan(
+        profile_name="bench",
+        revision=(0, 0),
+        profile_valid=True,
+        roi=None,
+        threshold=0.99,
+        coarse_threshold=0.3,
+        coarse_scale=0.5,
+        templates=tuple(entries),
+        by_name={entry.name: entry for entry in entries},
+        atlas_groups=(),
+    )
+
+
+def _entries(frame_e, count: int, size):
+    """Cut `count` templates of one size out of the frame."""
+    th, tw = size
+    entries = []
+    for i in range(count):
+        y = (i * 37) % (frame_e.shape[0] - th)
+        x = (i * 53) % (frame_e.shape[1] - tw)
+        edge = frame_e[y:y + th, x:x + tw].copy()
+        small = cv2.resize(edge, (tw // 2, th // 2), interpolation=cv2.INTER_AREA)
+        entries.append(detector._TemplateCacheEntry(f"ref_{i}.png", edge, small, tw, th, tw // 2, th // 2))
+    return entries
+
+
+def _run_opencv(frame_small, entries):
+    """Coarse full-frame pass with cv2.matchTemplate per template."""
+    for entry in entries:
+        cv2.minMaxLoc(cv2.matchTemplate(frame_small, entry.small_edge, cv2.TM_CCOEFF_NORMED))
+
+
+def _run_fft(frame_small, entries):
+    """Same pass through one per-frame _FftCorrelator (frame transform included)."""
+    correlator = detector._FftCorrelator(detector._FrameStats(frame_small))
+    for entry in entries:
+        cv2.minMaxLoc(correlator.match(entry))
+
+
+def _run_frame(plan, gray, engine: str):
+    """One _find_best_match call with the given DETECTOR_MATCH_ENGINE."""
+    detector.MATCH_ENGINE = engine
+    detector._find_best_match(plan, gray)
+
+
+def _time_ms(fn, repeats: int) -> float:
+    """Return median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return float(np.median(samples))
+
+
+def main() -> int:
+    """Print a per-size, per-reference-count table of coarse pass and per-frame timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-refs", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    gray, frame_e, frame_small = _synthetic_frame()
+    counts = sorted({1, 2, 3, 4, args.max_refs} & set(range(1, args.max_refs + 1)))
+
+    print(
+        f"{'coarse size':>12} {'refs':>5} {'coarse cv':>10} {'coarse fft':>11}"
+        f" {'frame spatial':>14} {'frame fft':>10} {'frame speedup':>14}"
+    )
+    for size in TEMPLATE_SIZES:
+        all_entries = _entries(frame_e, args.max_refs, size)
+        for entry in all_entries:
+            # Template spectra are cached per plan in production; warm them outside the timing.
+            detector._FftCorrelator(detector._FrameStats(frame_small))._template_spectrum(entry)
+        label = f"{size[0] // 2}x{size[1] // 2}"
+        for count in counts:
+            entries = all_entries[:count]
+            plan = _plan(entries)
+            opencv_ms = _time_ms(lambda: _run_opencv(frame_small, entries), args.repeats)
+            fft_ms = _time_ms(lambda: _run_fft(frame_small, entries), args.repeats)
+            spatial_frame_ms = _time_ms(lambda: _run_frame(plan, gray, "spatial"), args.repeats)
+            fft_frame_ms = _time_ms(lambda: _run_frame(plan, gray, "fft"), args.repeats)
+            print(
+                f"{label:>12} {count:>5} {opencv_ms:>10.2f} {fft_ms:>11.2f}"
+                f" {spatial_frame_ms:>14.2f} {fft_frame_ms:>10.2f}"
+                f" {spatial_frame_ms / max(fft_frame_ms, 1e-9):>13.2f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
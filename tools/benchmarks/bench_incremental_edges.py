@@ -0,0 +1,96 @@
+"""Benchmark tile-incremental edge maps against a full Canny recompute per frame.
+
+Feeds a synthetic 960x540 UI-like sequence in which only a small region changes
+per frame (a ticking clock and a moving sprite) through both edge modes and
+reports the median per-frame cost of `_find_best_match` for a set of references.
+
+Usage:
+    python tools/benchmarks/bench_incremental_edges.py [--frames 120] [--refs 8]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+# Importing the detector touches Data/; keep benchmark artifacts out of the repo.
+os.chdir(tempfile.mkdtemp(prefix="frametrace-bench-"))
+os.environ.setdefault("APP_DB_PATH", os.path.join(os.getcwd(), "app.db"))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from core import detector  # noqa: E402
+
+
+def _frames(count: int, seed: int = 7):
+    """Yield gray frames of a static background with a clock and a moving sprite."""
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3)
+    sprite = cv2.GaussianBlur(rng.integers(0, 255, (40, 40), dtype=np.uint8), (3, 3), 1)
+    for index in range(count):
+        frame = background.copy()
+        cv2.putText(frame, f"{index:05d}", (820, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 255, 2)
+        x = 100 + (index * 3) % 300
+        frame[300:340, x:x + 40] = sprite
+        yield frame
+
+
+def _plan(background, count: int):
+    """Build an in-memory plan with templates that do not occur in the sequence."""
+    rng = np.random.default_rng(11)
+    entries = []
+    for i in range(count):
+        gray = cv2.GaussianBlur(rng.integers(0, 255, (48, 96), dtype=np.uint8), (5, 5), 1)
+        edge = cv2.Canny(gray, 80, 160)
+        small = cv2.resize(edge, (48, 24), interpolation=cv2.INTER_AREA)
+        entries.append(detector._TemplateCacheEntry(f"ref_{i}.png", edge, small, 96, 48, 48, 24))
+    return detector.DetectionPlan(
+        profile_name="bench",
+        revision=(0, 0),
+        profile_valid=True,
+        roi=None,
+        threshold=0.8,
+        coarse_threshold=detector._coarse_threshold_for(0.8),
+        coarse_scale=detector.FRAME_COARSE_SCALE,
+        templates=tuple(entries),
+        by_name={entry.name: entry for entry in entries},
+        atlas_groups=(),
+    )
+
+
+def _median_ms(plan, frames, edge_cache) -> float:
+    """Return the median per-frame matching time in milliseconds."""
+    samples = []
+    for frame in frames:
+        started = time.perf_counter()
+        detector._find_best_match(plan, frame, edge_cache=edge_cache)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return float(np.median(samples[1:]))
+
+
+def main() -> int:
+    """Print median per-frame cost for the full and incremental edge modes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--refs", type=int, default=8)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    frames = list(_frames(args.frames))
+    plan = _plan(frames[0], args.refs)
+    full_ms = _median_ms(plan, frames, None)
+    incremental_ms = _median_ms(plan, frames, detector._EdgeCache())
+    print(f"{'mode':>12} {'ms/frame':>9}")
+    print(f"{'full':>12} {full_ms:>9.2f}")
+    print(f"{'incremental':>12} {incremental_ms:>9.2f}")
+    print(f"speedup {full_ms / max(incremental_ms, 1e-9):.2f}x (tile={detector.EDGE_TILE_SIZE})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
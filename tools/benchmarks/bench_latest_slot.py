@@ -0,0 +1,113 @@
+"""Benchmark preview sampling through the queue lock versus the lock-free latest-frame slot.
+
+A producer thread publishes pooled canonical frames into a FrameQueue at
+--fps while N reader threads sample the newest frame in a tight loop, either
+under the queue's Condition (peek_latest(retain=True) + copy) or through
+`FrameQueue.latest`. Reports producer put() latency and reader sample latency.
+
+Usage:
+    python tools/benchmarks/bench_latest_slot.py [--seconds 3] [--fps 60] [--readers 1 2 4]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+from app.services.capture_constants import CANONICAL_HEIGHT, CANONICAL_WIDTH  # noqa: E402
+from app.services.frame_bus import FrameBufferPool, FramePacket, FrameQueue  # noqa: E402
+
+
+def _locked_copy(queue: FrameQueue):
+    """Sample the newest frame the pre-slot way: retain under the queue lock, copy, release."""
+    packet = queue.peek_latest(retain=True)
+    if packet is None:
+        return None
+    try:
+        return packet.detached()
+    finally:
+        packet.release()
+
+
+def _percentile(values, fraction: float) -> float:
+    """Return the value at fraction of the sorted sample, in microseconds."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1e6
+
+
+def _run(seconds: float, fps: int, readers: int, mode: str) -> tuple[list, list, int]:
+    """Return (producer put latencies, reader sample latencies, torn reads)."""
+    size = CANONICAL_WIDTH * CANONICAL_HEIGHT
+    queue = FrameQueue(maxlen=3)
+    pool = FrameBufferPool(size, queue.maxlen + readers + 3)
+    stop = threading.Event()
+    put_latencies: list[float] = []
+    sample_latencies: list[list[float]] = [[] for _ in range(readers)]
+    sample = queue.latest_copy if mode == "slot" else (lambda: _locked_copy(queue))
+
+    def producer():
+        interval = 1.0 / fps
+        next_at = time.perf_counter()
+        index = 0
+        while not stop.is_set():
+            lease = pool.acquire()
+            lease.view[:8] = index.to_bytes(8, "little")
+            packet = FramePacket(time.time(), lease.view.toreadonly(), lease=lease)
+            started = time.perf_counter()
+            queue.put(packet)
+            put_latencies.append(time.perf_counter() - started)
+            index += 1
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def reader(slot: int):
+        latencies = sample_latencies[slot]
+        while not stop.is_set():
+            started = time.perf_counter()
+            sample()
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=producer)] + [
+        threading.Thread(target=reader, args=(slot,)) for slot in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    samples = [value for latencies in sample_latencies for value in latencies]
+    return put_latencies, samples, queue.latest.torn_reads
+
+
+def main() -> None:
+    """Print put/sample latency percentiles for each reader count and mode."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(f"{'readers':>7} {'mode':>6} {'put p50':>9} {'put p99':>9} {'put max':>9} {'sample p50':>11} {'samples/s':>10} {'torn':>5}")
+    for readers in args.readers:
+        for mode in ("locked", "slot"):
+            puts, samples, torn = _run(args.seconds, args.fps, readers, mode)
+            print(
+                f"{readers:>7} {mode:>6} {_percentile(puts, 0.5):8.1f}u {_percentile(puts, 0.99):8.1f}u "
+                f"{max(puts, default=0) * 1e6:8.1f}u {statistics.median(samples) * 1e6 if samples else 0:10.1f}u "
+                f"{len(samples) / args.seconds:10.0f} {torn:>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark shared-integral NCC against per-call cv2.matchTemplate normalization.
+
+Times the coarse and fine matching stages separately for 1..N references on a
+synthetic 960x540 edge frame, once with every reference the same size (48x96)
+and once with every reference a different size. Window statistics are only
+shared within one size, so the same-size coarse break-even is the number of
+same-sized references DETECTOR_NCC_MIN_REFS should require; the mixed-size
+rows show what a profile of distinct sizes would pay for using NCC anyway.
+
+Usage:
+    python tools/benchmarks/bench_ncc_shared.py [--max-refs 40] [--repeats 20]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+# Importing the detector touches Data/; keep benchmark artifacts out of the repo.
+os.chdir(tempfile.mkdtemp(prefix="frametrace-bench-"))
+os.environ.setdefault("APP_DB_PATH", os.path.join(os.getcwd(), "app.db"))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from core import detector  # noqa: E402
+
+
+def _synthetic_frame(seed: int = 3):
+    """Return a (frame_e, frame_small) edge pair resembling a UI capture."""
+    rng = np.random.default_rng(seed)
+    gray = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (9, 9), 3)
+    frame_e = cv2.Canny(gray, 20, 40)
+    frame_small = cv2.resize(frame_e, (480, 270), interpolation=cv2.INTER_AREA)
+    return frame_e, frame_small
+
+
+def _entries(frame_e, count: int, mixed: bool = False):
+    """Cut `count` templates out of the frame: all 48x96, or each a different size when mixed.
+
+    Returns (entries, windows), windows being each template's (y0, y1, x0, x1)
+    fine search window around its source position.
+    """
+    entries = []
+    windows = []
+    for i in range(count):
+        th, tw = (40 + 2 * (i % 8), 80 + 4 * (i // 8)) if mixed else (48, 96)
+        y = (i * 37) % (frame_e.shape[0] - th)
+        x = (i * 53) % (frame_e.shape[1] - tw)
+        edge = frame_e[y:y + th, x:x + tw].copy()
+        small = cv2.resize(edge, (tw // 2, th // 2), interpolation=cv2.INTER_AREA)
+        entries.append(detector._TemplateCacheEntry(f"ref_{i}.png", edge, small, tw, th, tw // 2, th // 2))
+        y0, x0 = max(0, y - th // 2), max(0, x - tw // 2)
+        windows.append((y0, min(frame_e.shape[0], y0 + th * 2), x0, min(frame_e.shape[1], x0 + tw * 2)))
+    return entries, windows
+
+
+def _coarse_opencv(frame_e, frame_small, entries, windows):
+    """Coarse full-frame pass with per-call normalization."""
+    for entry in entries:
+        cv2.minMaxLoc(cv2.matchTemplate(frame_small, entry.small_edge, cv2.TM_CCOEFF_NORMED))
+
+
+def _coarse_shared(frame_e, frame_small, entries, windows):
+    """Coarse pass with integral images computed once per frame."""
+    stats = detector._FrameStats(frame_small)
+    for entry in entries:
+        cv2.minMaxLoc(detector._ncc_scores(stats, entry.small_edge, entry.small_mean, entry.small_norm))
+
+
+def _fine_opencv(frame_e, frame_small, entries, windows):
+    """Fine window pass with per-call normalization."""
+    for entry, (y0, y1, x0, x1) in zip(entries, windows):
+        cv2.minMaxLoc(cv2.matchTemplate(frame_e[y0:y1, x0:x1], entry.edge, cv2.TM_CCOEFF_NORMED))
+
+
+def _fine_shared(frame_e, frame_small, entries, windows):
+    """Fine window pass with integral images computed once per frame."""
+    stats = detector._FrameStats(frame_e)
+    for entry, (y0, y1, x0, x1) in zip(entries, windows):
+        cv2.minMaxLoc(detector._ncc_scores(stats, entry.edge, entry.mean, entry.norm, y0, y1, x0, x1))
+
+
+def _time_ms(fn, repeats: int) -> float:
+    """Return median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return float(np.median(samples))
+
+
+def main() -> int:
+    """Print per-stage tables for same-size and mixed-size references and the observed break-even points."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-refs", type=int, default=40)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+    frame_e, frame_small = _synthetic_frame()
+    counts = sorted({1, 2, 3, 4, 6, 8, 12, 16, 24, 32, args.max_refs} & set(range(1, args.max_refs + 1)))
+    stages = (("coarse", _coarse_opencv, _coarse_shared), ("fine", _fine_opencv, _fine_shared))
+
+    print(f"{'sizes':>6} {'stage':>6} {'refs':>5} {'opencv ms':>10} {'shared ms':>10} {'speedup':>8}")
+    for mixed in (False, True):
+        all_entries, all_windows = _entries(frame_e, args.max_refs, mixed)
+        label = "mixed" if mixed else "same"
+        for stage, run_opencv, run_shared in stages:
+            break_even = None
+            for count in counts:
+                inputs = (frame_e, frame_small, all_entries[:count], all_windows[:count])
+                opencv_ms = _time_ms(lambda: run_opencv(*inputs), args.repeats)
+                shared_ms = _time_ms(lambda: run_shared(*inputs), args.repeats)
+                if break_even is None and shared_ms < opencv_ms:
+                    break_even = count
+                print(f"{label:>6} {stage:>6} {count:>5} {opencv_ms:>10.2f} {shared_ms:>10.2f} {opencv_ms / max(shared_ms, 1e-9):>7.2f}x")
+            if break_even is None:
+                print(f"{label} {stage}: shared NCC never beat the OpenCV path in this range.")
+            else:
+                print(f"{label} {stage}: break-even at {break_even} reference(s)")
+    print(f"DETECTOR_NCC_MIN_REFS={detector.NCC_MIN_REFERENCES} (same-sized references, coarse pass only)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Benchmark thread-pool fan-out of reference matching from 1 to N workers.
+
+Matches a synthetic 960x540 frame against many differently sized references
+(kept off the batched atlas path) with DETECTOR_MATCH_WORKERS-style pools of
+increasing size and reports median per-frame time and speedup over one worker.
+
+Usage:
+    python tools/benchmarks/bench_parallel_match.py [--refs 30] [--max-workers N] [--repeats 20]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+# Importing the detector touches Data/; keep benchmark artifacts out of the repo.
+os.chdir(tempfile.mkdtemp(prefix="frametrace-bench-"))
+os.environ.setdefault("APP_DB_PATH", os.path.join(os.getcwd(), "app.db"))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+
+from core import detector  # noqa: E402
+
+
+def _scene(ref_count: int, seed: int = 5):
+    """Return (gray frame, plan) with references cut from the frame edges."""
+    rng = np.random.default_rng(seed)
+    gray = cv2.GaussianBlur(rng.integers(0, 255, (540, 960), dtype=np.uint8), (7, 7), 2)
+    edges = cv2.Canny(gray, 80, 160)
+    entries = []
+    for index in range(ref_count):
+        h, w = 36 + 2 * (index % 7), 72 + 4 * (index % 5)
+        y = (index * 41) % (540 - h)
+        x = (index * 67) % (960 - w)
+        edge = edges[y:y + h, x:x + w].copy()
+        small = cv2.resize(edge, (w // 2, h // 2), interpolation=cv2.INTER_AREA)
+        entries.append(detector._TemplateCacheEntry(f"ref_{index}.png", edge, small, w, h, w // 2, h // 2))
+    plan = detector.DetectionPlan(
+        profile_name="bench",
+        revision=(0, 0),
+        profile_valid=True,
+        roi=None,
+        threshold=0.99,
+        coarse_threshold=0.3,
+        coarse_scale=0.5,
+        templates=tuple(entries),
+        by_name={entry.name: entry for entry in entries},
+        atlas_groups=(),
+    )
+    return gray, plan
+
+
+def _median_ms(plan, gray, repeats: int) -> float:
+    """Return the median wall time of one _find_best_match call in milliseconds."""
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        detector._find_best_match(plan, gray)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return float(np.median(samples))
+
+
+def _set_workers(count: int) -> None:
+    """Swap the detector pool for one with `count` workers."""
+    if detector._MATCH_POOL is not None:
+        detector._MATCH_POOL.shutdown(wait=True)
+        detector._MATCH_POOL = None
+    detector.MATCH_WORKERS = count
+
+
+def main() -> int:
+    """Print a per-worker-count scaling table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--refs", type=int, default=30)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    gray, plan = _scene(args.refs)
+    baseline = None
+    print(f"{'workers':>7} {'ms/frame':>9} {'speedup':>8}")
+    for workers in range(1, max(1, args.max_workers) + 1):
+        _set_workers(workers)
+        _median_ms(plan, gray, 3)  # warm the pool and per-thread workspaces
+        elapsed = _median_ms(plan, gray, args.repeats)
+        baseline = baseline or elapsed
+        print(f"{workers:>7} {elapsed:>9.2f} {baseline / max(elapsed, 1e-9):>7.2f}x")
+    _set_workers(1)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+"""Benchmark rawvideo pipe reads with the default and an enlarged pipe buffer.
+
+A local fake-ffmpeg producer (a Python child process) writes canonical gray
+frames to stdout as fast as the pipe accepts them, the way ffmpeg's rawvideo
+muxer does. The reader fills pooled frame buffers with the supervisor's
+`_read_exact_into` and reports reads per frame and throughput for each pipe size.
+
+Usage:
+    python tools/benchmarks/bench_pipe_reads.py [--frames 600] [--pipe-frames 2]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, ROOT)
+
+from app.services.capture_constants import CANONICAL_HEIGHT, CANONICAL_WIDTH  # noqa: E402
+from app.services.ffmpeg_capture_supervisor import FfmpegCaptureSupervisor, _grow_pipe  # noqa: E402
+from app.services.frame_bus import FrameBufferPool  # noqa: E402
+
+_PRODUCER = """
+import sys
+frame = bytes(range(256)) * ({size} // 256) + bytes({size} % 256)
+out = sys.stdout.buffer
+for _ in range({frames}):
+    out.write(frame)
+out.flush()
+"""
+
+
+def _run(frames: int, pipe_bytes: int | None) -> tuple[float, float, int | None]:
+    """Read frames from a fake producer; returns (reads per frame, MB/s, pipe capacity)."""
+    size = CANONICAL_WIDTH * CANONICAL_HEIGHT
+    process = subprocess.Popen(
+        [sys.executable, "-c", _PRODUCER.format(size=size, frames=frames)],
+        stdout=subprocess.PIPE,
+        bufsize=0,
+    )
+    capacity = _grow_pipe(process.stdout, pipe_bytes) if pipe_bytes else None
+    pool = FrameBufferPool(size, 4)
+    reads = 0
+    started = time.perf_counter()
+    for _ in range(frames):
+        lease = pool.acquire()
+        count = FfmpegCaptureSupervisor._read_exact_into(process.stdout, lease.view)
+        lease.release()
+        if not count:
+            break
+        reads += count
+    elapsed = time.perf_counter() - started
+    process.wait()
+    return reads / frames, frames * size / elapsed / 1e6, capacity
+
+
+def main() -> None:
+    """Compare the default pipe with one sized for --pipe-frames frames."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--pipe-frames", type=int, default=2)
+    args = parser.parse_args()
+
+    size = CANONICAL_WIDTH * CANONICAL_HEIGHT
+    for label, pipe_bytes in (("default pipe", None), (f"{args.pipe_frames}-frame pipe", size * args.pipe_frames)):
+        reads, rate, capacity = _run(args.frames, pipe_bytes)
+        capacity_text = f"{capacity} B" if capacity else "os default"
+        print(f"{label:>14}: {reads:6.1f} reads/frame  {rate:8.1f} MB/s  capacity={capacity_text}")
+
+
+if __name__ == "__main__":
+    main()